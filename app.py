@@ -1,3 +1,5 @@
+import threading
+
 import streamlit as st
 
 st.set_page_config(
@@ -33,6 +35,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Ressources partagées préparées en arrière-plan, une seule fois par processus :
+# le premier visiteur n'attend ni les imports ni le chargement du planning
+@st.cache_resource(show_spinner=False)
+def lancer_prechauffage():
+    def prechauffer():
+        from planning.prechauffage import prechauffer
+        prechauffer()
+
+    thread = threading.Thread(target=prechauffer, name="prechauffage", daemon=True)
+    thread.start()
+    return thread
+
+lancer_prechauffage()
+
 # Créer la navigation personnalisée
 accueil = st.Page("pages/0_🏠_Accueil.py", title="Accueil", icon="🏠")
 calendrier = st.Page("pages/1_📅_Calendrier.py", title="Calendrier", icon="📅")
@@ -0,0 +1,17 @@
+"""Mesures de performance sur des données synthétiques
+
+Usage depuis la racine du dépôt :
+
+    python -m bench --membres 500 --entrainements 40 --tournois 20 --saisons 3
+    python -m bench --reference bench/resultats.json --sortie bench/nouveaux.json
+    python -m bench --sans-pages --budget --repetitions 3
+    python -m bench --saisons 6 --format mois
+    python -m bench --terrains 6 --sans-pages
+
+Les résultats sont écrits en JSON ; avec ``--reference``, chaque mesure est
+comparée à un fichier précédent et les régressions sont signalées. Avec
+``--budget``, le premier affichage de chaque page est mesuré dans un processus
+neuf et la commande échoue si une page dépasse son budget (``bench/demarrage.py``).
+Avec ``--terrains``, les mesures portent sur un club d'autant de terrains
+(configuration générée, passée par ``BNR_CONFIG``).
+"""
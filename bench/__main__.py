@@ -0,0 +1,268 @@
+"""Lance les mesures de performance (voir ``bench/__init__.py``)"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from bench.demarrage import mesures_demarrage, verifier_budget  # noqa: E402
+from bench.donnees import generer  # noqa: E402
+from planning.cache import CacheEvenements  # noqa: E402
+from planning.config import DEFAUTS, charger_config  # noqa: E402
+from planning.evenements import VUE_MOIS, plage_visible  # noqa: E402
+from planning.grille import NB_CRENEAUX, TERRAINS, heure_creneau  # noqa: E402
+from planning.inscription import etat_creneau, inscrire  # noqa: E402
+from planning.partage import GrillePartagee  # noqa: E402
+from planning.programmation import ajouter_entrainement, bloquer_tournoi, colonnes_terrains  # noqa: E402
+from planning.regles import JOURS_SEMAINE  # noqa: E402
+from planning.stockage import StockageFichiers, StockageSQLite  # noqa: E402
+from planning.store import FORMATS, convertir_instantane, load_responsables, save_responsables  # noqa: E402
+
+# Ralentissement toléré par rapport à la référence avant de signaler une régression
+SEUIL_REGRESSION = 0.25
+
+
+def mesurer(fonction, repetitions, preparer=None):
+    """Durées (ms) de ``repetitions`` appels ; ``preparer(i)`` fournit les arguments de l'appel i"""
+    durees = []
+    for i in range(repetitions):
+        arguments = preparer(i) if preparer else ()
+        debut = time.perf_counter()
+        fonction(*arguments)
+        durees.append((time.perf_counter() - debut) * 1000)
+    return {
+        "mediane_ms": round(statistics.median(durees), 3),
+        "min_ms": round(min(durees), 3),
+        "repetitions": repetitions,
+    }
+
+
+def _stockage(dossier, type_stockage):
+    data = os.path.join(dossier, "data")
+    fichiers = StockageFichiers(
+        os.path.join(data, "responsables.json"),
+        {nom: os.path.join(data, f"{nom}.csv") for nom in ("entrainements", "tournois", "membres")},
+    )
+    if type_stockage == "sqlite":
+        return StockageSQLite(os.path.join(data, "club.sqlite"), import_depuis=fichiers)
+    return fichiers
+
+
+def mesures_planning(dossier, type_stockage, repetitions, debut):
+    """Chargement, calendrier, ajout d'entraînement et de tournoi sur le stockage choisi"""
+    stockage = _stockage(dossier, type_stockage)
+    responsables_file = os.path.join(dossier, "data", "responsables.json")
+    resultats = {}
+
+    resultats["load_responsables"] = mesurer(lambda: load_responsables(responsables_file), repetitions)
+    responsables = load_responsables(responsables_file)
+    copie = os.path.join(dossier, "copie.json")
+    resultats["save_responsables"] = mesurer(lambda: save_responsables(responsables, copie), repetitions)
+
+    # Calendrier : un mois affiché (grille de la période, événements sans puis avec cache)
+    mois = [date(debut.year, 1 + (i % 12), 15) for i in range(repetitions)]
+
+    def plage(i):
+        return plage_visible(mois[i], VUE_MOIS)
+
+    resultats["charger_grille_mois"] = mesurer(stockage.charger_grille, repetitions, plage)
+    grilles = [stockage.charger_grille(*plage(i)) for i in range(repetitions)]
+    resultats["evenements_mois_sans_cache"] = mesurer(
+        lambda grille, d, f: CacheEvenements().evenements_plage(grille, d, f),
+        repetitions, lambda i: (grilles[i],) + plage(i),
+    )
+    cache = CacheEvenements()
+    for i in range(repetitions):
+        cache.evenements_plage(grilles[i], *plage(i))
+    resultats["evenements_mois_avec_cache"] = mesurer(
+        cache.evenements_plage, repetitions, lambda i: (grilles[i],) + plage(i)
+    )
+
+    # Grille partagée : chargement complet, puis lecture d'une grille à jour (contrôle de version)
+    resultats["grille_partagee_chargement"] = mesurer(lambda: GrillePartagee(stockage).grille(), repetitions)
+    partagee = GrillePartagee(stockage)
+    partagee.grille()
+    resultats["grille_partagee_lecture"] = mesurer(partagee.grille, repetitions)
+
+    # Inscription rapide : un membre pas encore inscrit, sur un créneau non complet différent à chaque appel
+    fin_saison = date(debut.year + 1, 1, 1)
+    grille = stockage.charger_grille(debut, fin_saison)
+    noms = stockage.annuaire_membres().noms
+    inscriptions = []
+    for jour, creneau, _ in grille.places_libres(debut, fin_saison)[:repetitions]:
+        responsables, joueurs, _, _ = etat_creneau(grille, jour, creneau)
+        nom = next(nom for nom in noms if nom not in joueurs and nom not in responsables)
+        inscriptions.append((stockage, jour, creneau, nom))
+    if len(inscriptions) == repetitions:
+        resultats["inscription_rapide"] = mesurer(inscrire, repetitions, lambda i: inscriptions[i])
+
+    # Ajouts réussis : une saison vide après les données, un créneau différent à chaque appel
+    saison_libre = date(debut.year + 50, 1, 1)
+
+    def entrainement(i):
+        return (stockage, {
+            "jour": JOURS_SEMAINE[i % 7],
+            "heure_debut": heure_creneau(i // 7 % NB_CRENEAUX), "heure_fin": heure_creneau(i // 7 % NB_CRENEAUX + 1),
+            "coach": "Bench", "niveau": "Avancé", "genre": "Mixte", **colonnes_terrains([0]),
+            "date_debut": saison_libre.isoformat(), "date_fin": date(saison_libre.year, 12, 31).isoformat(),
+        })
+
+    resultats["ajouter_entrainement"] = mesurer(ajouter_entrainement, repetitions, entrainement)
+    resultats["bloquer_tournoi"] = mesurer(
+        bloquer_tournoi, repetitions,
+        lambda i: (stockage, saison_libre + timedelta(days=400 + i), "09:00", "18:00", "S1", "Mixte", list(range(len(TERRAINS)))),
+    )
+    return resultats
+
+
+def mesures_pages(dossier, type_stockage, repetitions, jour):
+    """Affichage complet du calendrier et de la page jour avec AppTest"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return {}
+    # Les pages utilisent des chemins relatifs ("data/...") : on les exécute depuis le jeu généré
+    repertoire = os.getcwd()
+    os.environ["BNR_STOCKAGE"] = type_stockage
+    os.chdir(dossier)
+    try:
+        page = os.path.join(RACINE, "pages", "1_📅_Calendrier.py")
+
+        def rendu_calendrier():
+            AppTest.from_file(page, default_timeout=120).run()
+
+        def rendu_jour():
+            at = AppTest.from_file(page, default_timeout=120)
+            at.query_params["date"] = jour.isoformat()
+            at.run()
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+
+        return {
+            "rendu_calendrier": mesurer(rendu_calendrier, repetitions),
+            "rendu_page_jour": mesurer(rendu_jour, repetitions),
+        }
+    finally:
+        os.chdir(repertoire)
+
+
+def comparer(resultats, reference, seuil=SEUIL_REGRESSION):
+    """Affiche l'écart de chaque mesure avec la référence ; retourne les régressions"""
+    regressions = []
+    # Les références antérieures aux options --format et --terrains ont été mesurées
+    # au format compact, avec le nombre de terrains par défaut
+    for cle, defaut in (("stockage", None), ("format", "compact"), ("terrains", DEFAUTS["terrains"]), ("parametres", None)):
+        if reference.get(cle, defaut) != resultats[cle]:
+            print(f"Attention : {cle} différents de la référence ({reference.get(cle, defaut)} / {resultats[cle]})")
+    print(f"{'mesure':32} {'référence':>12} {'actuel':>12} {'écart':>8}")
+    for nom, mesure in resultats["mesures"].items():
+        ancienne = reference.get("mesures", {}).get(nom)
+        if ancienne is None:
+            print(f"{nom:32} {'-':>12} {mesure['mediane_ms']:>12.3f}")
+            continue
+        ecart = mesure["mediane_ms"] / ancienne["mediane_ms"] - 1 if ancienne["mediane_ms"] else 0.0
+        alerte = "  << régression" if ecart > seuil else ""
+        print(f"{nom:32} {ancienne['mediane_ms']:>12.3f} {mesure['mediane_ms']:>12.3f} {ecart:>+8.0%}{alerte}")
+        if ecart > seuil:
+            regressions.append(nom)
+    return regressions
+
+
+def relancer(arguments, terrains):
+    """Relance le bench dans un nouveau processus, pour un club de ``terrains`` terrains
+
+    Le nombre de terrains est fixé à l'import de ``planning`` : la configuration
+    actuelle du club, avec ce nombre de terrains, est écrite dans un fichier
+    temporaire passé au nouveau processus par ``BNR_CONFIG`` (hérité par les
+    pages mesurées). Retourne le code de sortie du nouveau processus.
+    """
+    descripteur, config = tempfile.mkstemp(prefix="bench_club_", suffix=".json")
+    try:
+        with os.fdopen(descripteur, "w", encoding="utf-8") as f:
+            json.dump(dict(charger_config(), terrains=terrains), f, ensure_ascii=False, indent=2)
+        commande = [sys.executable, "-m", "bench"] + list(sys.argv[1:] if arguments is None else arguments)
+        return subprocess.run(commande, cwd=RACINE, env=dict(os.environ, BNR_CONFIG=config)).returncode
+    finally:
+        os.remove(config)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Mesures de performance du planning")
+    parser.add_argument("--membres", type=int, default=200)
+    parser.add_argument("--entrainements", type=int, default=20)
+    parser.add_argument("--tournois", type=int, default=10)
+    parser.add_argument("--saisons", type=int, default=2)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument(
+        "--terrains", type=int,
+        help="nombre de terrains du club (par défaut celui de la configuration, voir planning/config.py)",
+    )
+    parser.add_argument("--stockage", choices=("fichiers", "sqlite"), default="fichiers")
+    parser.add_argument(
+        "--format", choices=FORMATS, default="compact",
+        help="format de l'instantané des créneaux pour le stockage fichiers (voir planning/store.py)",
+    )
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--sans-pages", action="store_true", help="ne pas mesurer l'affichage des pages (AppTest)")
+    parser.add_argument(
+        "--budget", action="store_true",
+        help="mesurer le démarrage à froid des pages et échouer s'il dépasse le budget (bench/demarrage.py)",
+    )
+    parser.add_argument("--sortie", default=os.path.join(RACINE, "bench", "resultats.json"))
+    parser.add_argument("--reference", help="résultats précédents à comparer")
+    parser.add_argument("--seuil", type=float, default=SEUIL_REGRESSION)
+    options = parser.parse_args(arguments)
+    if options.terrains is not None and options.terrains < 1:
+        parser.error("il faut au moins un terrain")
+    if options.terrains and options.terrains != len(TERRAINS):
+        return relancer(arguments, options.terrains)
+
+    debut = date(2026, 1, 1)
+    dossier = tempfile.mkdtemp(prefix="bench_planning_")
+    try:
+        parametres = generer(
+            dossier, options.membres, options.entrainements, options.tournois, options.saisons,
+            options.graine, debut, len(TERRAINS),
+        )
+        if options.format != "compact":
+            convertir_instantane(os.path.join(dossier, "data", "responsables.json"), options.format)
+        mesures = mesures_planning(dossier, options.stockage, options.repetitions, debut)
+        if not options.sans_pages:
+            mesures.update(mesures_pages(dossier, options.stockage, options.repetitions, debut + timedelta(days=40)))
+        if options.budget:
+            mesures.update(mesures_demarrage(dossier, options.stockage, options.repetitions, debut + timedelta(days=40)))
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+    resultats = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "stockage": options.stockage,
+        "format": options.format,
+        "terrains": len(TERRAINS),
+        "parametres": parametres,
+        "mesures": mesures,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(options.sortie)), exist_ok=True)
+    with open(options.sortie, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+
+    echec = bool(options.budget and verifier_budget(mesures))
+    if options.reference:
+        with open(options.reference, "r", encoding="utf-8") as f:
+            regressions = comparer(resultats, json.load(f), options.seuil)
+        return 1 if regressions or echec else 0
+    for nom, mesure in mesures.items():
+        print(f"{nom:32} {mesure['mediane_ms']:>10.3f} ms")
+    return 1 if echec else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Temps de démarrage à froid des pages, chacun mesuré dans un nouveau processus
+
+Chaque mesure lance un interpréteur neuf (comme après un redéploiement),
+importe Streamlit (déjà chargé par le serveur avant la première visite) puis
+chronomètre le premier affichage de la page avec AppTest. Les modules lourds
+importés par la page sont relevés au passage.
+
+    python -m bench.demarrage calendrier
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fichier lancé pour chaque page mesurée (la page jour est le calendrier ouvert avec ?date=)
+PAGES = {
+    "accueil": "app.py",
+    "calendrier": os.path.join("pages", "1_📅_Calendrier.py"),
+    "jour": os.path.join("pages", "1_📅_Calendrier.py"),
+    "entrainements": os.path.join("pages", "2_🏐_Entrainements.py"),
+    "membres": os.path.join("pages", "3_👥_Membres.py"),
+}
+
+# Budget du premier affichage de chaque page dans un processus neuf (ms)
+BUDGET_MS = {
+    "accueil": 600,
+    "calendrier": 1100,
+    "jour": 700,
+    "entrainements": 1300,
+    "membres": 1000,
+}
+
+# Modules dont l'import est relevé
+MODULES_LOURDS = ("pandas", "streamlit_calendar")
+
+
+def mesurer_page(page, jour=None):
+    """Durée (ms) du premier affichage de la page dans le processus courant et modules lourds importés"""
+    from streamlit.testing.v1 import AppTest
+
+    debut = time.perf_counter()
+    at = AppTest.from_file(os.path.join(RACINE, PAGES[page]), default_timeout=120)
+    if jour is not None:
+        at.query_params["date"] = jour.isoformat()
+    at.run()
+    duree = (time.perf_counter() - debut) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return duree, [module for module in MODULES_LOURDS if module in sys.modules]
+
+
+def mesures_demarrage(dossier, type_stockage, repetitions, jour):
+    """Premier affichage de chaque page, ``repetitions`` processus neufs par page"""
+    env = dict(os.environ, BNR_STOCKAGE=type_stockage, PYTHONPATH=RACINE)
+    resultats = {}
+    for page in PAGES:
+        durees = []
+        for _ in range(repetitions):
+            commande = [sys.executable, "-m", "bench.demarrage", page]
+            if page == "jour":
+                commande += ["--jour", jour.isoformat()]
+            # Les pages utilisent des chemins relatifs ("data/...") : on les exécute depuis le jeu généré
+            sortie = subprocess.run(commande, cwd=dossier, env=env, capture_output=True, text=True, check=True)
+            mesure = json.loads(sortie.stdout.strip().splitlines()[-1])
+            durees.append(mesure["ms"])
+        resultats[f"demarrage_{page}"] = {
+            "mediane_ms": round(statistics.median(durees), 3),
+            "min_ms": round(min(durees), 3),
+            "repetitions": repetitions,
+            "modules": mesure["modules"],
+        }
+    return resultats
+
+
+def verifier_budget(mesures, budget=None):
+    """Affiche chaque démarrage face à son budget ; retourne les pages hors budget"""
+    budget = budget or BUDGET_MS
+    depassements = []
+    for page, limite in budget.items():
+        mesure = mesures.get(f"demarrage_{page}")
+        if mesure is None:
+            continue
+        alerte = "  << hors budget" if mesure["mediane_ms"] > limite else ""
+        print(f"démarrage {page:20} {mesure['mediane_ms']:>10.1f} ms / {limite} ms{alerte}")
+        if alerte:
+            depassements.append(page)
+    return depassements
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog="python -m bench.demarrage")
+    parser.add_argument("page", choices=sorted(PAGES))
+    parser.add_argument("--jour", type=date.fromisoformat)
+    options = parser.parse_args(arguments)
+
+    import streamlit  # noqa: F401  (chargé par le serveur avant toute page)
+
+    duree, modules = mesurer_page(options.page, options.jour)
+    print(json.dumps({"ms": round(duree, 3), "modules": modules}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Génération d'un jeu de données synthétique de taille paramétrable
+
+Le jeu est écrit dans ``<dossier>/data`` avec la même disposition que
+l'application (instantané JSON des créneaux, CSV des membres, des
+entraînements et des tournois) : les pages peuvent tourner dessus telles quelles.
+"""
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+from planning.entites import libelle_tournoi
+from planning.grille import NB_CRENEAUX, TERRAINS, Grille, creneaux_horaires, heure_creneau
+from planning.programmation import colonnes_terrains
+from planning.regles import JOURS_SEMAINE
+from planning.stockage import COLONNES
+from planning.store import save_responsables
+
+PRENOMS = ["Jean", "Marie", "Thomas", "Emma", "Lucas", "Léa", "Hugo", "Chloé", "Louis", "Manon",
+           "Nathan", "Camille", "Paul", "Sarah", "Jules", "Inès", "Arthur", "Zoé", "Bastien", "Claire"]
+NOMS = ["Dupont", "Martin", "Lefevre", "Laurent", "Moreau", "Simon", "Michel", "Garcia", "David", "Bertrand",
+        "Roux", "Vincent", "Fournier", "Morel", "Girard", "Andre", "Mercier", "Blanc", "Guerin", "Fleuret"]
+NIVEAUX = ["Débutant", "Intermédiaire", "Avancé", "Compétition"]
+GENRES = ["Mixte", "Féminin", "Masculin"]
+
+# Part des jours de saison où des staffers ouvrent des créneaux libres
+TAUX_JOURS_OUVERTS = 0.5
+
+
+def _ecrire_csv(fichier, colonnes, lignes):
+    with open(fichier, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=colonnes, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(lignes)
+
+
+def _membres(rng, nb):
+    lignes = []
+    for i in range(nb):
+        prenom = PRENOMS[i % len(PRENOMS)]
+        nom = NOMS[(i // len(PRENOMS)) % len(NOMS)]
+        if i >= len(PRENOMS) * len(NOMS):
+            nom = f"{nom}{i // (len(PRENOMS) * len(NOMS))}"
+        lignes.append({
+            "prenom": prenom,
+            "nom": nom,
+            "numero_licence": 10000 + i,
+            "niveau": rng.choice(NIVEAUX),
+            "joueur": "Oui",
+            "coach": "Oui" if rng.random() < 0.1 else "Non",
+            "staffer": "Oui" if rng.random() < 0.25 else "Non",
+        })
+    return lignes
+
+
+def generer(dossier, membres=50, entrainements=3, tournois=1, saisons=1, graine=0, debut=date(2026, 1, 1), terrains=None):
+    """Écrit un jeu de données dans ``dossier``/data et retourne les paramètres utilisés
+
+    Chaque saison dure un an à partir de ``debut``. Les entraînements sont
+    répartis sur les saisons, les tournois tirés sur des dates libres, et
+    la moitié des jours de saison ont des créneaux ouverts par des staffers
+    avec des joueurs inscrits. Les données occupent ``terrains`` terrains
+    (par défaut tous ceux de la configuration du club).
+
+    Lève ValueError si la configuration a moins de ``terrains`` terrains.
+    """
+    terrains = terrains or len(TERRAINS)
+    if terrains > len(TERRAINS):
+        raise ValueError(
+            f"{terrains} terrains demandés, la configuration du club n'en a que {len(TERRAINS)} (voir BNR_CONFIG)"
+        )
+    rng = random.Random(graine)
+    data = os.path.join(dossier, "data")
+    os.makedirs(data, exist_ok=True)
+
+    lignes_membres = _membres(rng, membres)
+    noms = [f"{m['prenom']} {m['nom']}" for m in lignes_membres]
+    coachs = [n for n, m in zip(noms, lignes_membres) if m["coach"] == "Oui"] or noms[:1]
+    staffers = [n for n, m in zip(noms, lignes_membres) if m["staffer"] == "Oui"] or noms[:1]
+    _ecrire_csv(os.path.join(data, "membres.csv"), COLONNES["membres"], lignes_membres)
+
+    bornes = [
+        (date(debut.year + k, debut.month, debut.day), date(debut.year + k + 1, debut.month, debut.day) - timedelta(days=1))
+        for k in range(saisons)
+    ]
+
+    # Entraînements : des soirées de semaine, sur des créneaux distincts tant que possible
+    soir = creneaux_horaires("17:00", "18:00")[0]
+    combinaisons = [(j, h, t) for j in range(7) for h in range(soir, NB_CRENEAUX - 1) for t in range(terrains)]
+    rng.shuffle(combinaisons)
+    lignes_entrainements = []
+    for i in range(entrainements):
+        jour, creneau, terrain = combinaisons[i % len(combinaisons)]
+        saison_debut, saison_fin = bornes[i % saisons]
+        lignes_entrainements.append({
+            "id": i + 1,
+            "jour": JOURS_SEMAINE[jour],
+            "heure_debut": heure_creneau(creneau),
+            "heure_fin": heure_creneau(creneau + 2),
+            "coach": rng.choice(coachs),
+            "niveau": rng.choice(NIVEAUX),
+            "genre": rng.choice(GENRES),
+            **colonnes_terrains([terrain]),
+            "date_debut": saison_debut.isoformat(),
+            "date_fin": saison_fin.isoformat(),
+            "exceptions": "",
+        })
+    _ecrire_csv(os.path.join(data, "entrainements.csv"), COLONNES["entrainements"], lignes_entrainements)
+
+    grille = Grille()
+    premier, dernier = bornes[0][0].toordinal(), bornes[-1][1].toordinal()
+
+    # Tournois : une journée sur tous les terrains, à des dates distinctes
+    lignes_tournois = []
+    dates_tournois = rng.sample(range(premier, dernier + 1), min(tournois, dernier - premier + 1))
+    for o in sorted(dates_tournois):
+        niveau, genre = rng.choice(["S1", "S2", "S3", "Loisir"]), rng.choice(GENRES)
+        grille.remplir([o], creneaux_horaires("09:00", "18:00"), list(range(terrains)), libelle_tournoi(niveau, genre))
+        lignes_tournois.append({
+            "id": len(lignes_tournois) + 1,
+            "date": date.fromordinal(o).isoformat(),
+            "heure_debut": "09:00",
+            "heure_fin": "18:00",
+            "niveau": niveau,
+            "genre": genre,
+            **colonnes_terrains(range(terrains)),
+        })
+    _ecrire_csv(os.path.join(data, "tournois.csv"), COLONNES["tournois"], lignes_tournois)
+
+    # Créneaux ouverts par les staffers, avec joueurs et parfois une capacité réduite
+    for o in range(premier, dernier + 1):
+        if rng.random() >= TAUX_JOURS_OUVERTS:
+            continue
+        jour = date.fromordinal(o)
+        for creneau in rng.sample(range(NB_CRENEAUX), rng.randint(1, 4)):
+            if grille.get(jour, creneau, 0):
+                continue
+            grille.set(jour, creneau, 0, rng.choice(staffers))
+            grille.set_joueurs(jour, creneau, rng.sample(noms, min(len(noms), rng.randint(1, 7))))
+            if rng.random() < 0.2:
+                grille.set_capacite(jour, creneau, rng.randint(4, 8))
+    save_responsables(grille.to_dict(), os.path.join(data, "responsables.json"))
+
+    return {
+        "membres": membres,
+        "entrainements": entrainements,
+        "tournois": len(lignes_tournois),
+        "saisons": saisons,
+        "graine": graine,
+        "debut": debut.isoformat(),
+    }
@@ -1,384 +1,58 @@
 import streamlit as st
-from streamlit_calendar import calendar
-from datetime import datetime, timedelta
-import pandas as pd
-import json
-import os
+from streamlit.errors import StreamlitAPIException
+from datetime import date, timedelta
+from planning import (
+    CAPACITE_TERRAIN,
+    DUREE_CRENEAU,
+    NB_CRENEAUX,
+    PREFIXE_ENTRAINEMENT,
+    PREFIXE_TOURNOI,
+    TERRAINS,
+    heure_creneau,
+)
+from planning.cache import get_cache_evenements
+from planning.evenements import VUE_MOIS, VUE_SEMAINE, decaler_ancre, plage_visible
+from planning.inscription import COMPLET, DEJA_INSCRIT, ENCOMBRE, FERME, INSCRIT, etat_creneau, inscrire
+from planning.partage import VueGrille, get_grille_partagee
+from planning.profilage import Profileur, profilage_demande
+from planning.stockage import get_stockage
 
 # ---------------------------
-# Fonctions de persistance
+# Initialisation session
 # ---------------------------
-RESPONSABLES_FILE = "data/responsables.json"
+# Période affichée par le calendrier (date d'ancrage + type de vue)
+if "calendrier_ancre" not in st.session_state:
+    st.session_state.calendrier_ancre = date.today()
+if "calendrier_vue" not in st.session_state:
+    st.session_state.calendrier_vue = VUE_MOIS
 
-def load_responsables():
-    """Charge les responsables depuis le fichier JSON"""
-    if os.path.exists(RESPONSABLES_FILE):
-        try:
-            with open(RESPONSABLES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_responsables(responsables):
-    """Sauvegarde les responsables dans le fichier JSON"""
-    os.makedirs("data", exist_ok=True)
-    with open(RESPONSABLES_FILE, "w", encoding="utf-8") as f:
-        json.dump(responsables, f, ensure_ascii=False, indent=2)
+stockage = get_stockage()
 
-# ---------------------------
-# Initialisation session
-# ---------------------------
-if "selected_day" not in st.session_state:
-    st.session_state.selected_day = None
+# Grille commune à toutes les sessions : chaque session n'en garde que ses modifications en cours
+partage = get_grille_partagee()
 
-# Toujours recharger les responsables depuis le fichier pour détecter les changements
-# faits depuis d'autres pages (comme les entraînements)
-st.session_state.responsables = load_responsables()
+# Durée et mémoire de chaque phase de l'affichage, avec ?debug=1 ou BNR_PROFILAGE=1
+profil = Profileur(profilage_demande(st.query_params.get("debug")), page="calendrier")
 
 # ---------------------------
 # Configuration du calendrier
 # ---------------------------
-def get_calendar_events():
-    """Génère les événements pour le calendrier"""
-    events = []
-    responsables = st.session_state.responsables
-    
-    # Boucler sur toutes les dates des 12 derniers/prochains mois
-    now = datetime.now()
-    for month_offset in range(-6, 7):
-        check_date = now + timedelta(days=30*month_offset)
-        year = check_date.year
-        month = check_date.month
-        
-        # Boucler sur chaque jour du mois
-        for day in range(1, 32):
-            try:
-                current_day = datetime(year, month, day)
-            except ValueError:
-                continue
-            
-            # Tracker pour marquer les heures déjà traitées pour chaque terrain
-            heures_traitees_terrain1 = set()
-            heures_traitees_terrain2 = set()
-            
-            # Boucler sur chaque créneau horaire
-            for hour in range(14):
-                key_terrain1 = f"{year}-{month}-{day}-{hour}-terrain1"
-                key_terrain2 = f"{year}-{month}-{day}-{hour}-terrain2"
-                
-                responsable1 = responsables.get(key_terrain1, "")
-                responsable2 = responsables.get(key_terrain2, "")
-                
-                # Vérifier si c'est un entraînement ou un tournoi
-                is_entrainement1 = responsable1.startswith("ENTRAINEMENT|") if responsable1 else False
-                is_entrainement2 = responsable2.startswith("ENTRAINEMENT|") if responsable2 else False
-                is_tournoi1 = responsable1.startswith("TOURNOI|") if responsable1 else False
-                is_tournoi2 = responsable2.startswith("TOURNOI|") if responsable2 else False
-                
-                # Si c'est le même entraînement sur les deux terrains, créer un seul événement
-                if is_entrainement1 and is_entrainement2 and responsable1 == responsable2 and hour not in heures_traitees_terrain1:
-                    entrainement_info = responsable1
-                    
-                    # Trouver toutes les heures consécutives avec le même entraînement
-                    heure_debut_event = hour
-                    heure_fin_event = hour + 1
-                    
-                    for next_hour in range(hour + 1, 14):
-                        next_key1 = f"{year}-{month}-{day}-{next_hour}-terrain1"
-                        next_key2 = f"{year}-{month}-{day}-{next_hour}-terrain2"
-                        next_resp1 = responsables.get(next_key1, "")
-                        next_resp2 = responsables.get(next_key2, "")
-                        if next_resp1 == entrainement_info and next_resp2 == entrainement_info:
-                            heure_fin_event = next_hour + 1
-                            heures_traitees_terrain1.add(next_hour)
-                            heures_traitees_terrain2.add(next_hour)
-                        else:
-                            break
-                    
-                    # Parser les infos de l'entraînement
-                    parts = entrainement_info.split("|")
-                    if len(parts) == 4:
-                        coach = parts[1]
-                        genre = parts[2]
-                        niveau = parts[3]
-                        title = f"🏐 Entrainement {genre} - {niveau}"
-                    else:
-                        title = "🏐 Entrainement"
-                    
-                    # Créer l'événement pour toute la plage
-                    start_datetime = datetime(year, month, day, 8 + heure_debut_event, 0)
-                    end_datetime = datetime(year, month, day, 8 + heure_fin_event, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": "#E9D5FF",  # Lavande pastel pour les entraînements
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-                    continue
-                
-                # Traiter les entraînements du terrain 1
-                if is_entrainement1 and hour not in heures_traitees_terrain1:
-                    entrainement_info = responsable1
-                    
-                    # Trouver toutes les heures consécutives avec le même entraînement
-                    heure_debut_event = hour
-                    heure_fin_event = hour + 1
-                    
-                    for next_hour in range(hour + 1, 14):
-                        next_key = f"{year}-{month}-{day}-{next_hour}-terrain1"
-                        next_resp = responsables.get(next_key, "")
-                        if next_resp == entrainement_info:
-                            heure_fin_event = next_hour + 1
-                            heures_traitees_terrain1.add(next_hour)
-                        else:
-                            break
-                    
-                    # Parser les infos de l'entraînement
-                    parts = entrainement_info.split("|")
-                    if len(parts) == 4:
-                        coach = parts[1]
-                        genre = parts[2]
-                        niveau = parts[3]
-                        title = f"🏐 T1: {genre} - {niveau}"
-                    else:
-                        title = "🏐 Terrain 1"
-                    
-                    # Créer l'événement pour toute la plage
-                    start_datetime = datetime(year, month, day, 8 + heure_debut_event, 0)
-                    end_datetime = datetime(year, month, day, 8 + heure_fin_event, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": "#E9D5FF",  # Lavande pastel pour les entraînements
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-                
-                # Traiter les entraînements du terrain 2
-                if is_entrainement2 and hour not in heures_traitees_terrain2:
-                    entrainement_info = responsable2
-                    
-                    # Trouver toutes les heures consécutives avec le même entraînement
-                    heure_debut_event = hour
-                    heure_fin_event = hour + 1
-                    
-                    for next_hour in range(hour + 1, 14):
-                        next_key = f"{year}-{month}-{day}-{next_hour}-terrain2"
-                        next_resp = responsables.get(next_key, "")
-                        if next_resp == entrainement_info:
-                            heure_fin_event = next_hour + 1
-                            heures_traitees_terrain2.add(next_hour)
-                        else:
-                            break
-                    
-                    # Parser les infos de l'entraînement
-                    parts = entrainement_info.split("|")
-                    if len(parts) == 4:
-                        coach = parts[1]
-                        genre = parts[2]
-                        niveau = parts[3]
-                        title = f"🏐 T2: {genre} - {niveau}"
-                    else:
-                        title = "🏐 Terrain 2"
-                    
-                    # Créer l'événement pour toute la plage
-                    start_datetime = datetime(year, month, day, 8 + heure_debut_event, 0)
-                    end_datetime = datetime(year, month, day, 8 + heure_fin_event, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": "#E9D5FF",  # Lavande pastel pour les entraînements
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-                
-                # Si c'est le même tournoi sur les deux terrains, créer un seul événement
-                if is_tournoi1 and is_tournoi2 and responsable1 == responsable2 and hour not in heures_traitees_terrain1:
-                    tournoi_info = responsable1
-                    
-                    # Trouver toutes les heures consécutives avec le même tournoi
-                    heure_debut_event = hour
-                    heure_fin_event = hour + 1
-                    
-                    for next_hour in range(hour + 1, 14):
-                        next_key1 = f"{year}-{month}-{day}-{next_hour}-terrain1"
-                        next_key2 = f"{year}-{month}-{day}-{next_hour}-terrain2"
-                        next_resp1 = responsables.get(next_key1, "")
-                        next_resp2 = responsables.get(next_key2, "")
-                        if next_resp1 == tournoi_info and next_resp2 == tournoi_info:
-                            heure_fin_event = next_hour + 1
-                            heures_traitees_terrain1.add(next_hour)
-                            heures_traitees_terrain2.add(next_hour)
-                        else:
-                            break
-                    
-                    # Parser les infos du tournoi
-                    parts = tournoi_info.split("|")
-                    if len(parts) == 3:
-                        niveau = parts[1]
-                        genre = parts[2]
-                        title = f"🏆 Tournoi {niveau} - {genre}"
-                    else:
-                        title = "🏆 Tournoi"
-                    
-                    # Créer l'événement pour toute la plage
-                    start_datetime = datetime(year, month, day, 8 + heure_debut_event, 0)
-                    end_datetime = datetime(year, month, day, 8 + heure_fin_event, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": "#FED7AA",  # Pêche pastel pour les tournois
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-                    continue
-                
-                # Traiter les tournois du terrain 1
-                if is_tournoi1 and hour not in heures_traitees_terrain1:
-                    tournoi_info = responsable1
-                    
-                    # Trouver toutes les heures consécutives avec le même tournoi
-                    heure_debut_event = hour
-                    heure_fin_event = hour + 1
-                    
-                    for next_hour in range(hour + 1, 14):
-                        next_key = f"{year}-{month}-{day}-{next_hour}-terrain1"
-                        next_resp = responsables.get(next_key, "")
-                        if next_resp == tournoi_info:
-                            heure_fin_event = next_hour + 1
-                            heures_traitees_terrain1.add(next_hour)
-                        else:
-                            break
-                    
-                    # Parser les infos du tournoi
-                    parts = tournoi_info.split("|")
-                    if len(parts) == 3:
-                        niveau = parts[1]
-                        genre = parts[2]
-                        title = f"🏆 T1: {niveau} - {genre}"
-                    else:
-                        title = "🏆 Terrain 1"
-                    
-                    # Créer l'événement pour toute la plage
-                    start_datetime = datetime(year, month, day, 8 + heure_debut_event, 0)
-                    end_datetime = datetime(year, month, day, 8 + heure_fin_event, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": "#FED7AA",  # Pêche pastel pour les tournois
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-                
-                # Traiter les tournois du terrain 2
-                if is_tournoi2 and hour not in heures_traitees_terrain2:
-                    tournoi_info = responsable2
-                    
-                    # Trouver toutes les heures consécutives avec le même tournoi
-                    heure_debut_event = hour
-                    heure_fin_event = hour + 1
-                    
-                    for next_hour in range(hour + 1, 14):
-                        next_key = f"{year}-{month}-{day}-{next_hour}-terrain2"
-                        next_resp = responsables.get(next_key, "")
-                        if next_resp == tournoi_info:
-                            heure_fin_event = next_hour + 1
-                            heures_traitees_terrain2.add(next_hour)
-                        else:
-                            break
-                    
-                    # Parser les infos du tournoi
-                    parts = tournoi_info.split("|")
-                    if len(parts) == 3:
-                        niveau = parts[1]
-                        genre = parts[2]
-                        title = f"🏆 T2: {niveau} - {genre}"
-                    else:
-                        title = "🏆 Terrain 2"
-                    
-                    # Créer l'événement pour toute la plage
-                    start_datetime = datetime(year, month, day, 8 + heure_debut_event, 0)
-                    end_datetime = datetime(year, month, day, 8 + heure_fin_event, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": "#FED7AA",  # Pêche pastel pour les tournois
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-                
-                # Si c'est un entraînement ou tournoi, ne pas traiter comme créneau ouvert
-                if is_entrainement1 or is_entrainement2 or is_tournoi1 or is_tournoi2:
-                    continue
-                
-                terrains_ouverts = 0
-                responsables_count = 0
-                if responsable1:
-                    terrains_ouverts += 1
-                    responsables_count += 1
-                if responsable2:
-                    terrains_ouverts += 1
-                    if responsable2 != responsable1:
-                        responsables_count += 1
-                
-                # Créer un événement si ce créneau est ouvert
-                if terrains_ouverts > 0:
-                    key_max_places = f"{year}-{month}-{day}-{hour}-max_places"
-                    capacite_max = terrains_ouverts * 8
-                    places_totales_creneau = responsables.get(key_max_places, capacite_max)
-                    places_totales_creneau = max(responsables_count, min(places_totales_creneau, capacite_max))
-                    key_joueurs = f"{year}-{month}-{day}-{hour}-joueurs"
-                    joueurs_count = len(responsables.get(key_joueurs, []))
-                    places_occupees_creneau = responsables_count + joueurs_count
-                    pourcentage_creneau = (places_occupees_creneau / places_totales_creneau * 100) if places_totales_creneau > 0 else 0
-                    
-                    # Horaire du créneau
-                    heure_debut = 8 + hour
-                    heure_fin = heure_debut + 1
-                    title = f"({places_occupees_creneau}/{places_totales_creneau})"
-                    
-                    # Déterminer la couleur en fonction du remplissage
-                    if pourcentage_creneau >= 100:
-                        color = "#D1D5DB"  # Gris clair - plein
-                    elif pourcentage_creneau <= 25:
-                        color = "#BBF7D0"  # Vert menthe pastel
-                    elif pourcentage_creneau < 50:
-                        color = "#FEF3C7"  # Jaune pastel
-                    elif pourcentage_creneau < 75:
-                        color = "#FDBA74"  # Orange pastel
-                    else:
-                        color = "#FECACA"  # Rose pastel
-                    
-                    # Créer l'heure de début et fin spécifique pour ce créneau
-                    start_datetime = datetime(year, month, day, heure_debut, 0)
-                    end_datetime = datetime(year, month, day, heure_fin, 0)
-                    
-                    events.append({
-                        "title": title,
-                        "start": start_datetime.isoformat(),
-                        "end": end_datetime.isoformat(),
-                        "color": color,
-                        "textColor": "#1f2937"  # Texte noir
-                    })
-    
-    return events
+def get_calendar_events(grille, debut, fin):
+    """Génère les événements pour la plage affichée par le calendrier"""
+    return get_cache_evenements().evenements_plage(grille, debut, fin)
 
-def get_calendar_options():
+
+def get_calendar_options(ancre, vue):
     """Retourne les options de configuration pour le calendrier"""
     return {
+        # La navigation est gérée par les boutons Streamlit pour connaître la plage affichée
         "headerToolbar": {
-            "left": "prev,next today",
+            "left": "",
             "center": "title",
-            "right": "dayGridMonth,timeGridWeek"
+            "right": ""
         },
+        "initialView": vue,
+        "initialDate": ancre.isoformat(),
         "locale": "fr",
         "timeZone": "Europe/Paris",  # Utiliser le fuseau horaire français
         "firstDay": 1,  # Commence le lundi (0=dimanche, 1=lundi)
@@ -395,88 +69,467 @@ def get_calendar_options():
         "height": "auto",
     }
 
+def synchroniser_widget(widget_key, valeur_stockee, valeur_widget=None):
+    """Réaligne un widget sur la valeur stockée si une autre session l'a modifiée
+
+    Si l'utilisateur avait aussi changé ce widget, sa modification est
+    abandonnée et signalée (conflit). Retourne True si le widget a été réinitialisé.
+    """
+    affichees = st.session_state.setdefault("valeurs_affichees", {})
+    if widget_key not in affichees or widget_key not in st.session_state:
+        return False
+    affichee = affichees[widget_key]
+    if affichee == valeur_stockee:
+        return False
+    if valeur_widget is None:
+        valeur_widget = st.session_state[widget_key]
+    if valeur_widget != affichee:
+        st.session_state.setdefault("conflits_jour", []).append(widget_key)
+    del st.session_state[widget_key]
+    return True
+
+def noter_valeur_affichee(widget_key, valeur):
+    """Mémorise la valeur stockée correspondant à l'affichage du widget"""
+    st.session_state.setdefault("valeurs_affichees", {})[widget_key] = valeur
+
+def lire_jour(day):
+    """Grille à jour du jour ; tant que la grille partagée n'est pas chargée
+    (lien direct au démarrage), seul le jour est lu"""
+    return partage.grille(day, day + timedelta(days=1), attendre=False)
+
+def enregistrer_creneau(grille, zone_conflits, key_creneau):
+    """Enregistre les cellules modifiées du créneau et signale les modifications rejetées"""
+    with profil.phase("enregistrement"):
+        rejetes = partage.enregistrer(grille)
+    if rejetes:
+        # Cellules modifiées entre-temps par une autre session : réafficher leur valeur actuelle
+        for jour_rejete, creneau_rejete, champ_rejete in rejetes:
+            cle_rejetee = f"{jour_rejete.year}-{jour_rejete.month}-{jour_rejete.day}-{creneau_rejete}-{champ_rejete}"
+            widget_key = {"max_places": "capacite_", "joueurs": "joueurs_"}.get(champ_rejete, f"responsable_{champ_rejete}_") + cle_rejetee
+            st.session_state.pop(widget_key, None)
+            st.session_state.setdefault("conflits_jour", []).append(widget_key)
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # Le fragment s'exécute dans un affichage complet de la page
+            st.rerun()
+    
+    conflits = [k for k in st.session_state.get("conflits_jour", []) if f"_{key_creneau}-" in k]
+    if conflits:
+        st.session_state.conflits_jour = [k for k in st.session_state.conflits_jour if k not in conflits]
+        with zone_conflits:
+            st.warning(
+                f"⚠️ {len(conflits)} modification(s) n'ont pas été enregistrées : "
+                "ce créneau a été modifié entre-temps par quelqu'un d'autre. "
+                "Les valeurs actuelles sont affichées ci-dessous."
+            )
+
+@st.fragment
+def afficher_creneau(day, i, grille_jour, rendu, staffers, membres_disponibles, noms_membres):
+    """Un créneau de la page jour, réexécuté seul quand un de ses widgets change
+
+    Le fragment ne lit et n'écrit que les cellules de son créneau : une
+    inscription ne redessine pas toute la journée. ``grille_jour`` est la
+    grille lue une fois par la page pour tous les créneaux ; ``rendu`` numérote
+    l'affichage de la page qui l'a lue.
+    """
+    # Réexécuté seul, le fragment reçoit les arguments de l'affichage de la page :
+    # la grille est relue pour voir les écritures faites depuis
+    cle_rendu = f"rendu_creneau_{i}"
+    if st.session_state.get(cle_rendu) == rendu:
+        grille_jour = lire_jour(day)
+    st.session_state[cle_rendu] = rendu
+    grille = VueGrille(grille_jour)
+    libelles = grille.libelles_jour(day)
+    
+    # Avertissement affiché en haut du créneau si une modification a été rejetée
+    zone_conflits = st.container()
+    
+    # Préfixe des clés de widgets pour ce créneau
+    key_creneau = f"{day.year}-{day.month}-{day.day}-{i}"
+    
+    # Déterminer l'emoji selon le remplissage du créneau (résumé tenu à jour par la grille)
+    emoji_creneau = ""
+    places_occupees_creneau, places_totales_creneau = grille.places(day, i)
+    if places_totales_creneau > 0:
+        pourcentage_creneau = places_occupees_creneau / places_totales_creneau * 100
+        
+        if pourcentage_creneau <= 25:
+            emoji_creneau = "🟢"  # Vert
+        elif pourcentage_creneau < 50:
+            emoji_creneau = "🟡"  # Jaune
+        elif pourcentage_creneau < 75:
+            emoji_creneau = "🟠"  # Orange
+        else:
+            emoji_creneau = "🔴"  # Rouge
+    
+    st.write(f"🕒 {heure_creneau(i)} - {heure_creneau(i + 1)} {emoji_creneau}")
+    
+    # Responsable de chaque terrain, sauf les terrains bloqués (entraînement ou tournoi)
+    responsables = []
+    for t, champ in enumerate(TERRAINS):
+        current_resp = libelles[i][t]
+        st.write(f"**Terrain {t + 1}**")
+        if current_resp.startswith(PREFIXE_ENTRAINEMENT):
+            # Décomposer les infos de l'entraînement
+            parts = current_resp.split("|")
+            coach = parts[1] if len(parts) > 1 else ""
+            genre = parts[2] if len(parts) > 2 else ""
+            niveau = parts[3] if len(parts) > 3 else ""
+            st.info(f"🏐 Entraînement {genre} - {niveau}\n\nCoach: {coach}")
+            st.caption("⚠️ Créneau bloqué pour entraînement")
+        elif current_resp.startswith(PREFIXE_TOURNOI):
+            # Décomposer les infos du tournoi
+            parts = current_resp.split("|")
+            niveau = parts[1] if len(parts) > 1 else ""
+            genre = parts[2] if len(parts) > 2 else ""
+            st.warning(f"🏆 Tournoi {niveau} - {genre}")
+            st.caption("⚠️ Créneau bloqué pour tournoi")
+        else:
+            widget_key = f"responsable_{champ}_{key_creneau}-{champ}"
+            synchroniser_widget(widget_key, current_resp)
+            responsable = st.selectbox(
+                "Responsable",
+                staffers,
+                index=staffers.index(current_resp) if current_resp in staffers else 0,
+                key=widget_key,
+                label_visibility="collapsed"
+            )
+            grille.set(day, i, t, responsable)
+            noter_valeur_affichee(widget_key, responsable)
+            responsables.append((responsable or "").strip())
+    
+    # Déterminer si les terrains sont ouverts et le max de joueurs
+    # Ne pas permettre l'ajout de joueurs si c'est un entraînement ou un tournoi
+    responsables = [r for r in responsables if r]
+    terrains_ouverts = len(responsables)
+    
+    # Ajouter les joueurs si au moins un terrain est ouvert
+    if terrains_ouverts > 0:
+        # Créer la liste des responsables obligatoires (un même responsable compte une fois)
+        responsables_joueurs = []
+        for responsable in responsables:
+            if responsable.lower() not in [r.lower() for r in responsables_joueurs]:
+                responsables_joueurs.append(responsable)
+
+        min_capacite = len(responsables_joueurs)
+        capacite_max = terrains_ouverts * CAPACITE_TERRAIN
+        key_max_places = f"{key_creneau}-max_places"
+        capacite_courante = grille.get_capacite(day, i, capacite_max)
+        capacite_totale = max(min_capacite, min(capacite_courante, capacite_max))
+
+        widget_key = f"capacite_{key_max_places}"
+        synchroniser_widget(widget_key, capacite_totale)
+        capacite_totale = st.selectbox(
+            "Capacité totale du créneau (staffers inclus)",
+            options=list(range(min_capacite, capacite_max + 1)),
+            index=capacite_totale - min_capacite,
+            key=widget_key
+        )
+        # N'enregistrer la capacité que si elle diffère de la valeur effective
+        if capacite_totale != capacite_courante:
+            grille.set_capacite(day, i, capacite_totale)
+        noter_valeur_affichee(widget_key, capacite_totale)
+        
+        key_joueurs = f"{key_creneau}-joueurs"
+        current_joueurs = grille.get_joueurs(day, i)
+        
+        # Joueurs courants valides (hors responsables)
+        joueurs_valides = [j for j in current_joueurs if j in noms_membres and j not in responsables_joueurs]
+        joueurs_possibles = max(0, capacite_totale - len(responsables_joueurs))
+        if len(joueurs_valides) > joueurs_possibles:
+            joueurs_valides = joueurs_valides[:joueurs_possibles]
+
+        # Préselectionner les responsables + joueurs
+        selection_par_defaut = responsables_joueurs + [j for j in joueurs_valides if j not in responsables_joueurs]
+        widget_key = f"joueurs_{key_joueurs}"
+        signature_key = f"{widget_key}_staff_signature"
+        staff_signature = "|".join(sorted([r.strip().lower() for r in responsables_joueurs]))
+        
+        # Joueurs modifiés par une autre session depuis le dernier affichage
+        if widget_key in st.session_state:
+            selection_widget = [j for j in st.session_state[widget_key] if j not in responsables_joueurs]
+            synchroniser_widget(widget_key, list(current_joueurs), selection_widget)
+
+        # Si les staffers changent (ou 1er affichage), resynchroniser la sélection affichée
+        if st.session_state.get(signature_key) != staff_signature or widget_key not in st.session_state:
+            selection_affichee = [j for j in selection_par_defaut if j in noms_membres]
+            selection_affichee = selection_affichee[:capacite_totale]
+            st.session_state[widget_key] = selection_affichee
+            st.session_state[signature_key] = staff_signature
+        
+        selection_complete = st.multiselect(
+            f"Joueurs inscrits (max {joueurs_possibles})",
+            membres_disponibles,
+            default=selection_par_defaut,
+            max_selections=capacite_totale,
+            placeholder="Selection des joueurs",
+            key=widget_key,
+            label_visibility="collapsed"
+        )
+
+        # Inclure automatiquement les responsables, même si décochés dans la liste
+        joueurs_selectionnes = [j for j in selection_complete if j not in responsables_joueurs]
+        joueurs_selectionnes = joueurs_selectionnes[:joueurs_possibles]
+        
+        # Combiner responsables + joueurs sélectionnés pour la sauvegarde
+        tous_les_joueurs = responsables_joueurs + joueurs_selectionnes
+        grille.set_joueurs(day, i, joueurs_selectionnes)
+        noter_valeur_affichee(widget_key, joueurs_selectionnes)
+        
+        st.write(f"**{len(tous_les_joueurs)}/{capacite_totale} places** (dont {len(responsables_joueurs)} responsable{'s' if len(responsables_joueurs) > 1 else ''} + max {joueurs_possibles} joueur{'s' if joueurs_possibles > 1 else ''})")
+    
+    st.divider()
+    
+    enregistrer_creneau(grille, zone_conflits, f"{day.year}-{day.month}-{day.day}-{i}")
+
+def afficher_profilage(details=None):
+    """Panneau de profilage dans la barre latérale, et ajout au journal de métriques"""
+    if not profil.actif:
+        return
+    with st.sidebar.expander("⏱️ Profilage de l'affichage", expanded=True):
+        st.caption(f"Total : {profil.total_ms():.0f} ms")
+        st.dataframe(profil.resume(), hide_index=True, use_container_width=True)
+        if not profil.pics_fiables:
+            st.caption("⚠️ Pics mémoire faussés : un autre affichage profilé s'exécutait en même temps.")
+        if details:
+            st.json(details)
+    profil.enregistrer()
+
+def libelle_duree(minutes):
+    """Durée d'un créneau pour l'affichage (ex. 1h ou 30 min)"""
+    if minutes % 60:
+        return f"{minutes} min"
+    return f"{minutes // 60}h"
+
+def jour_demande():
+    """Jour choisi dans l'adresse de la page (?date=AAAA-MM-JJ), None pour le calendrier
+
+    L'adresse d'une page jour peut ainsi être partagée ou rechargée.
+    """
+    valeur = st.query_params.get("date")
+    if not valeur:
+        return None
+    try:
+        return date.fromisoformat(valeur)
+    except ValueError:
+        st.warning(f"Date invalide dans l'adresse : {valeur} (attendu : AAAA-MM-JJ).")
+        return None
+
+def creneau_demande():
+    """Créneau choisi dans l'adresse (?creneau=N) pour l'inscription rapide, None pour la page jour"""
+    valeur = st.query_params.get("creneau")
+    if valeur is None:
+        return None
+    if valeur.isdigit() and int(valeur) < NB_CRENEAUX:
+        return int(valeur)
+    st.warning(f"Créneau invalide dans l'adresse : {valeur}.")
+    return None
+
+def ouvrir_jour(jour_iso, creneau=None):
+    """Affiche la page du jour (partie date AAAA-MM-JJ d'un événement ou d'un clic), ou l'inscription à un créneau"""
+    # Uniquement la partie date, sans tenir compte du fuseau horaire
+    st.query_params["date"] = jour_iso.split("T")[0]
+    if creneau is None:
+        st.query_params.pop("creneau", None)
+    else:
+        st.query_params["creneau"] = str(creneau)
+    st.rerun()
+
+def retour_calendrier():
+    """Quitte la page jour ou l'inscription rapide (bouton de retour)"""
+    st.query_params.pop("date", None)
+    st.query_params.pop("creneau", None)
+
+def voir_journee():
+    """Passe de l'inscription rapide à la page du jour complète"""
+    st.query_params.pop("creneau", None)
+
+def titre_jour(day):
+    """Date en toutes lettres, en français (ex. Lundi 15 juin 2026)"""
+    jours_fr = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+    mois_fr = ["", "janvier", "février", "mars", "avril", "mai", "juin", 
+               "juillet", "août", "septembre", "octobre", "novembre", "décembre"]
+    return f"{jours_fr[day.weekday()].capitalize()} {day.day} {mois_fr[day.month]} {day.year}"
+
+# Message affiché après une inscription rapide, selon son résultat
+MESSAGES_INSCRIPTION = {
+    INSCRIT: ("success", "✅ {nom} est inscrit(e) sur ce créneau !"),
+    DEJA_INSCRIT: ("info", "{nom} est déjà inscrit(e) sur ce créneau."),
+    COMPLET: ("error", "Ce créneau est complet."),
+    FERME: ("error", "Ce créneau n'est plus ouvert aux inscriptions."),
+    ENCOMBRE: ("warning", "Trop d'inscriptions simultanées sur ce créneau, réessayez dans un instant."),
+}
+
+def inscription_rapide(day, creneau):
+    """Inscrit le membre choisi (bouton du formulaire d'inscription rapide)"""
+    nom = st.session_state.get("inscription_nom")
+    if not nom:
+        st.session_state.inscription_message = ("warning", "Choisissez votre nom dans la liste.")
+        return
+    statut = inscrire(stockage, day, creneau, nom)
+    niveau, message = MESSAGES_INSCRIPTION[statut]
+    st.session_state.inscription_message = (niveau, message.format(nom=nom))
+
+def afficher_inscription(day, creneau):
+    """Inscription rapide à un seul créneau : ni page jour, ni calendrier"""
+    st.button("⬅️ Retour au calendrier", key="retour_inscription", on_click=retour_calendrier)
+    st.title(f"📝 {titre_jour(day)}, {heure_creneau(creneau)} - {heure_creneau(creneau + 1)}")
+    
+    # Résultat de l'inscription demandée juste avant cet affichage
+    if "inscription_message" in st.session_state:
+        niveau, message = st.session_state.pop("inscription_message")
+        getattr(st, niveau)(message)
+    
+    # Le créneau seul, relu après l'inscription (la grille partagée suit la version du stockage)
+    with profil.phase("lecture créneau"):
+        grille = lire_jour(day)
+        responsables, joueurs, occupees, totales = etat_creneau(grille, day, creneau)
+    
+    if not totales:
+        st.info("Ce créneau n'est pas ouvert aux inscriptions (pas de responsable, entraînement ou tournoi).")
+    else:
+        # Un même responsable sur plusieurs terrains n'est nommé qu'une fois
+        responsables = list(dict.fromkeys(responsables))
+        st.write(f"**{occupees}/{totales} places** · Responsable{'s' if len(responsables) > 1 else ''} : {', '.join(responsables)}")
+        if joueurs:
+            st.caption("Inscrits : " + ", ".join(joueurs))
+        try:
+            with profil.phase("lecture membres"):
+                noms = stockage.annuaire_membres().noms
+        except FileNotFoundError:
+            noms = []
+            st.error("Fichier membres.csv introuvable.")
+        with st.form("inscription_rapide"):
+            st.selectbox("Votre nom", noms, index=None, placeholder="Choisissez votre nom", key="inscription_nom")
+            st.form_submit_button(
+                "S'inscrire" if occupees < totales else "Complet",
+                disabled=occupees >= totales,
+                on_click=inscription_rapide, args=(day, creneau),
+            )
+    
+    st.button("Voir toute la journée", key="voir_journee", on_click=voir_journee)
+    afficher_profilage()
+
+def naviguer(pas):
+    """Passe à la période précédente/suivante, ou revient à aujourd'hui (pas=0)"""
+    if pas == 0:
+        st.session_state.calendrier_ancre = date.today()
+    else:
+        st.session_state.calendrier_ancre = decaler_ancre(
+            st.session_state.calendrier_ancre, st.session_state.calendrier_vue, pas
+        )
+
 # ---------------------------
 # Affichage calendrier ou page jour
 # ---------------------------
-if st.session_state.selected_day is None:
+# Un jour dans l'adresse affiche directement sa page : ni grille complète, ni événements, ni composant ;
+# avec un créneau, seule son inscription rapide est affichée
+day = jour_demande()
+creneau_choisi = creneau_demande() if day is not None else None
+
+if day is None:
     st.title("📅 Calendrier du club")
     
     st.markdown("""
     Pour vous ajouter sur une session (hors entrainements/tournois), cliquez sur un créneau horaire vert/jaune/orange/rouge, puis sélectionnez votre nom dans la liste déroulante.\n
     Pour les staffers, pour ajouter une session de jeu, cliquez sur le jour souhaité, puis utilisez les menus déroulants pour assigner un responsable à chaque terrain. Vous pouvez aussi indiquer le nombre de joueurs inscrits pour chaque créneau.""")
     
-    # Récupérer les événements
-    events = get_calendar_events()
-    calendar_options = get_calendar_options()
+    # Navigation entre les périodes
+    col_prec, col_auj, col_suiv, _, col_vue = st.columns([1, 2, 1, 4, 3])
+    with col_prec:
+        st.button("◀", key="calendrier_prec", on_click=naviguer, args=(-1,), use_container_width=True)
+    with col_auj:
+        st.button("Aujourd'hui", key="calendrier_auj", on_click=naviguer, args=(0,), use_container_width=True)
+    with col_suiv:
+        st.button("▶", key="calendrier_suiv", on_click=naviguer, args=(1,), use_container_width=True)
+    with col_vue:
+        # Clé de widget distincte : la vue choisie est conservée pendant l'affichage d'un jour
+        st.session_state.calendrier_vue = st.radio(
+            "Vue",
+            [VUE_MOIS, VUE_SEMAINE],
+            index=[VUE_MOIS, VUE_SEMAINE].index(st.session_state.calendrier_vue),
+            format_func={VUE_MOIS: "Mois", VUE_SEMAINE: "Semaine"}.get,
+            key="calendrier_vue_choix",
+            horizontal=True,
+            label_visibility="collapsed"
+        )
     
-    # Afficher le calendrier
-    calendar_events = calendar(
-        events=events,
-        options=calendar_options,
-        key="beach_calendar"
-    )
+    ancre = st.session_state.calendrier_ancre
+    vue = st.session_state.calendrier_vue
+    debut, fin = plage_visible(ancre, vue)
+    
+    # Grille partagée, mise à jour seulement si les créneaux ou les entraînements
+    # ont changé depuis (autre processus, page des entraînements) ; les périodes
+    # voisines sont préparées pour une navigation instantanée
+    with profil.phase("chargement grille"):
+        grille = partage.grille(
+            plage_visible(decaler_ancre(ancre, vue, -1), vue)[0],
+            plage_visible(decaler_ancre(ancre, vue, 1), vue)[1]
+        )
+    
+    # Récupérer uniquement les événements de la plage affichée
+    with profil.phase("événements"):
+        events = get_calendar_events(grille, debut, fin)
+    calendar_options = get_calendar_options(ancre, vue)
+    
+    # Afficher le calendrier (la clé change avec la période pour repositionner la vue) ;
+    # le composant n'est importé que par la vue calendrier, pas par la page jour
+    with profil.phase("composant calendrier"):
+        from streamlit_calendar import calendar
+        calendar_events = calendar(
+            events=events,
+            options=calendar_options,
+            key=f"beach_calendar_{vue}_{debut.isoformat()}"
+        )
+    
+    # Préparer les périodes voisines pour une navigation instantanée
+    cache = get_cache_evenements()
+    with profil.phase("préchargement voisins"):
+        for pas in (-1, 1):
+            cache.prechauffer(grille, *plage_visible(decaler_ancre(ancre, vue, pas), vue))
+    
+    # Compteurs du cache et taille des données envoyées au composant, visibles avec ?debug=1
+    afficher_profilage({
+        "cache": cache.stats(),
+        "evenements": len(events),
+    })
     
     # Gérer la sélection d'une date via eventClick ou dateClick (clic sur un jour)
     if calendar_events:
         if calendar_events.get("callback") == "eventClick":
+            # Créneau ouvert : inscription rapide ; entraînement ou tournoi : page du jour
             event = calendar_events["eventClick"]["event"]
-            start_str = event["start"]
-            # Extraire uniquement la partie date (YYYY-MM-DD) sans tenir compte du fuseau horaire
-            date_part = start_str.split("T")[0]
-            year, month, day = map(int, date_part.split("-"))
-            selected_datetime = datetime(year, month, day)
-            st.session_state.selected_day = selected_datetime
-            st.rerun()
+            ouvrir_jour(event["start"], event.get("extendedProps", {}).get("creneau"))
         elif calendar_events.get("callback") == "dateClick":
             # Clic sur un jour (même sans événement)
-            date_str = calendar_events["dateClick"]["date"]
-            # Extraire uniquement la partie date (YYYY-MM-DD) sans tenir compte du fuseau horaire
-            date_part = date_str.split("T")[0]
-            year, month, day = map(int, date_part.split("-"))
-            selected_datetime = datetime(year, month, day)
-            st.session_state.selected_day = selected_datetime
-            st.rerun()
+            ouvrir_jour(calendar_events["dateClick"]["date"])
+
+elif creneau_choisi is not None:
+    afficher_inscription(day, creneau_choisi)
 
 else:
     # ---------------------------
     # Page jour
     # ---------------------------
-    # Bouton de retour au calendrier en haut
-    if st.button("⬅️ Retour au calendrier", key="retour_haut"):
-        st.session_state.selected_day = None
-        save_responsables(st.session_state.responsables)
-        st.rerun()
+    # Bouton de retour au calendrier en haut (chaque créneau enregistre ses modifications)
+    st.button("⬅️ Retour au calendrier", key="retour_haut", on_click=retour_calendrier)
     
-    day = st.session_state.selected_day
+    st.title(f"📅 {titre_jour(day)}")
     
-    # Traduire le jour et le mois en français
-    jours_fr = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
-    mois_fr = ["", "janvier", "février", "mars", "avril", "mai", "juin", 
-               "juillet", "août", "septembre", "octobre", "novembre", "décembre"]
-    
-    jour_semaine = jours_fr[day.weekday()]
-    nom_mois = mois_fr[day.month]
-    titre_jour = f"{jour_semaine.capitalize()} {day.day} {nom_mois} {day.year}"
-    
-    st.title(f"📅 {titre_jour}")
-
-    st.write("### Créneaux horaires (1h)")
+    st.write(f"### Créneaux horaires ({libelle_duree(DUREE_CRENEAU)})")
     
-    # Charger les membres
+    # Charger les membres (annuaire partagé, relu seulement quand la table change)
     try:
-        df_membres = pd.read_csv("data/membres.csv")
-        # Listes de membres
-        membres = df_membres["prenom"].str.cat(df_membres["nom"], sep=" ").tolist()
-        membres = [""] + membres  # Ajouter option vide
-        
-        # Filtrer les staffers pour les responsables de terrain
-        staffers_df = df_membres[df_membres["staffer"] == "Oui"]
-        staffers = staffers_df["prenom"].str.cat(
-            staffers_df["nom"], sep=" "
-        ).tolist()
-        staffers = [""] + staffers  # Ajouter option vide
+        with profil.phase("lecture membres"):
+            annuaire = stockage.annuaire_membres()
+        membres_disponibles = annuaire.noms
+        noms_membres = annuaire.ensemble_noms
+        # Staffers pour les responsables de terrain
+        staffers = [""] + annuaire.staffers  # Ajouter option vide
     except FileNotFoundError:
-        membres = [""]
+        membres_disponibles = []
+        noms_membres = set()
         staffers = [""]
         st.error("Fichier membres.csv introuvable.")
 
@@ -493,211 +546,28 @@ else:
         </style>
     """, unsafe_allow_html=True)
     
-    start_time = datetime(day.year, day.month, day.day, 8)
-    
+    # Grille du jour lue une fois pour tous les créneaux de cet affichage
+    with profil.phase("lecture grille"):
+        grille_jour = lire_jour(day)
+    st.session_state.rendu_jour = st.session_state.get("rendu_jour", 0) + 1
+
     # Afficher les créneaux par paires (2 par ligne)
-    for row in range(7):  # 7 lignes pour 14 créneaux
-        cols = st.columns(2)
-        
-        for col_idx in range(2):
-            i = row * 2 + col_idx  # Index du créneau (0 à 13)
+    with profil.phase("rendu créneaux"):
+        for row in range((NB_CRENEAUX + 1) // 2):
+            cols = st.columns(2)
             
-            with cols[col_idx]:
-                heure_debut = start_time + timedelta(hours=i)
-                heure_fin = heure_debut + timedelta(hours=1)
-                
-                # Clés pour les terrains
-                key_terrain1 = f"{day.year}-{day.month}-{day.day}-{i}-terrain1"
-                key_terrain2 = f"{day.year}-{day.month}-{day.day}-{i}-terrain2"
-                
-                # Calculer le pourcentage de remplissage pour ce créneau
-                responsable1 = st.session_state.responsables.get(key_terrain1, "")
-                responsable2 = st.session_state.responsables.get(key_terrain2, "")
-                
-                terrains_ouverts_creneau = 0
-                responsables_count_creneau = 0
-                if responsable1:
-                    terrains_ouverts_creneau += 1
-                    responsables_count_creneau += 1
-                if responsable2:
-                    terrains_ouverts_creneau += 1
-                    if responsable2 != responsable1:
-                        responsables_count_creneau += 1
+            for col_idx in range(2):
+                i = row * 2 + col_idx  # Index du créneau
+                if i >= NB_CRENEAUX:
+                    break
                 
-                # Déterminer l'emoji selon le remplissage du créneau
-                emoji_creneau = ""
-                if terrains_ouverts_creneau > 0:
-                    key_max_places = f"{day.year}-{day.month}-{day.day}-{i}-max_places"
-                    capacite_max = terrains_ouverts_creneau * 8
-                    places_totales_creneau = st.session_state.responsables.get(key_max_places, capacite_max)
-                    places_totales_creneau = max(responsables_count_creneau, min(places_totales_creneau, capacite_max))
-                    key_joueurs = f"{day.year}-{day.month}-{day.day}-{i}-joueurs"
-                    joueurs_count = len(st.session_state.responsables.get(key_joueurs, []))
-                    places_occupees_creneau = responsables_count_creneau + joueurs_count
-                    pourcentage_creneau = (places_occupees_creneau / places_totales_creneau * 100) if places_totales_creneau > 0 else 0
-                    
-                    if pourcentage_creneau <= 25:
-                        emoji_creneau = "🟢"  # Vert
-                    elif pourcentage_creneau < 50:
-                        emoji_creneau = "🟡"  # Jaune
-                    elif pourcentage_creneau < 75:
-                        emoji_creneau = "🟠"  # Orange
-                    else:
-                        emoji_creneau = "🔴"  # Rouge
-                
-                st.write(f"🕒 {heure_debut.strftime('%H:%M')} - {heure_fin.strftime('%H:%M')} {emoji_creneau}")
-                
-                # Vérifier si c'est un entraînement ou un tournoi
-                current_resp1 = st.session_state.responsables.get(key_terrain1, "")
-                current_resp2 = st.session_state.responsables.get(key_terrain2, "")
-                
-                is_entrainement1 = current_resp1.startswith("ENTRAINEMENT|") if current_resp1 else False
-                is_entrainement2 = current_resp2.startswith("ENTRAINEMENT|") if current_resp2 else False
-                is_tournoi1 = current_resp1.startswith("TOURNOI|") if current_resp1 else False
-                is_tournoi2 = current_resp2.startswith("TOURNOI|") if current_resp2 else False
-                
-                # Terrain 1
-                st.write("**Terrain 1**")
-                if is_entrainement1:
-                    # Décomposer les infos de l'entraînement
-                    parts = current_resp1.split("|")
-                    coach = parts[1] if len(parts) > 1 else ""
-                    genre = parts[2] if len(parts) > 2 else ""
-                    niveau = parts[3] if len(parts) > 3 else ""
-                    st.info(f"🏐 Entraînement {genre} - {niveau}\n\nCoach: {coach}")
-                    st.caption("⚠️ Créneau bloqué pour entraînement")
-                elif is_tournoi1:
-                    # Décomposer les infos du tournoi
-                    parts = current_resp1.split("|")
-                    niveau = parts[1] if len(parts) > 1 else ""
-                    genre = parts[2] if len(parts) > 2 else ""
-                    st.warning(f"🏆 Tournoi {niveau} - {genre}")
-                    st.caption("⚠️ Créneau bloqué pour tournoi")
-                else:
-                    responsable1 = st.selectbox(
-                        "Responsable",
-                        staffers,
-                        index=staffers.index(current_resp1) if current_resp1 in staffers else 0,
-                        key=f"responsable_terrain1_{key_terrain1}",
-                        label_visibility="collapsed"
-                    )
-                    st.session_state.responsables[key_terrain1] = responsable1
-                
-                # Terrain 2
-                st.write("**Terrain 2**")
-                if is_entrainement2:
-                    # Décomposer les infos de l'entraînement
-                    parts = current_resp2.split("|")
-                    coach = parts[1] if len(parts) > 1 else ""
-                    genre = parts[2] if len(parts) > 2 else ""
-                    niveau = parts[3] if len(parts) > 3 else ""
-                    st.info(f"🏐 Entraînement {genre} - {niveau}\n\nCoach: {coach}")
-                    st.caption("⚠️ Créneau bloqué pour entraînement")
-                elif is_tournoi2:
-                    # Décomposer les infos du tournoi
-                    parts = current_resp2.split("|")
-                    niveau = parts[1] if len(parts) > 1 else ""
-                    genre = parts[2] if len(parts) > 2 else ""
-                    st.warning(f"🏆 Tournoi {niveau} - {genre}")
-                    st.caption("⚠️ Créneau bloqué pour tournoi")
-                else:
-                    responsable2 = st.selectbox(
-                        "Responsable",
-                        staffers,
-                        index=staffers.index(current_resp2) if current_resp2 in staffers else 0,
-                        key=f"responsable_terrain2_{key_terrain2}",
-                        label_visibility="collapsed"
-                    )
-                    st.session_state.responsables[key_terrain2] = responsable2
-                
-                # Déterminer si les terrains sont ouverts et le max de joueurs
-                # Ne pas permettre l'ajout de joueurs si c'est un entraînement ou un tournoi
-                terrains_ouverts = 0
-                responsable1 = st.session_state.responsables.get(key_terrain1, "") if not is_entrainement1 and not is_tournoi1 else ""
-                responsable2 = st.session_state.responsables.get(key_terrain2, "") if not is_entrainement2 and not is_tournoi2 else ""
-                responsable1 = responsable1.strip() if isinstance(responsable1, str) else ""
-                responsable2 = responsable2.strip() if isinstance(responsable2, str) else ""
-                
-                if responsable1:
-                    terrains_ouverts += 1
-                if responsable2:
-                    terrains_ouverts += 1
-                
-                # Ajouter les joueurs si au moins un terrain est ouvert
-                if terrains_ouverts > 0:
-                    # Créer la liste des responsables obligatoires
-                    responsables_joueurs = []
-                    if responsable1:
-                        responsables_joueurs.append(responsable1)
-                    if responsable2 and responsable2.strip().lower() != responsable1.strip().lower():
-                        responsables_joueurs.append(responsable2)
-
-                    min_capacite = len(responsables_joueurs)
-                    capacite_max = terrains_ouverts * 8
-                    key_max_places = f"{day.year}-{day.month}-{day.day}-{i}-max_places"
-                    capacite_courante = st.session_state.responsables.get(key_max_places, capacite_max)
-                    capacite_totale = max(min_capacite, min(capacite_courante, capacite_max))
-
-                    capacite_totale = st.selectbox(
-                        "Capacité totale du créneau (staffers inclus)",
-                        options=list(range(min_capacite, capacite_max + 1)),
-                        index=capacite_totale - min_capacite,
-                        key=f"capacite_{key_max_places}"
-                    )
-                    st.session_state.responsables[key_max_places] = capacite_totale
-                    
-                    # Tous les membres (hors option vide) pour inclure aussi les responsables dans la sélection
-                    membres_disponibles = membres[1:]
-                    
-                    key_joueurs = f"{day.year}-{day.month}-{day.day}-{i}-joueurs"
-                    current_joueurs = st.session_state.responsables.get(key_joueurs, [])
-                    
-                    # Joueurs courants valides (hors responsables)
-                    joueurs_valides = [j for j in current_joueurs if j in membres_disponibles and j not in responsables_joueurs]
-                    joueurs_possibles = max(0, capacite_totale - len(responsables_joueurs))
-                    if len(joueurs_valides) > joueurs_possibles:
-                        joueurs_valides = joueurs_valides[:joueurs_possibles]
-
-                    # Préselectionner les responsables + joueurs
-                    selection_par_defaut = responsables_joueurs + [j for j in joueurs_valides if j not in responsables_joueurs]
-                    widget_key = f"joueurs_{key_joueurs}"
-                    signature_key = f"{widget_key}_staff_signature"
-                    staff_signature = "|".join(sorted([r.strip().lower() for r in responsables_joueurs]))
-
-                    # Si les staffers changent (ou 1er affichage), resynchroniser la sélection affichée
-                    if st.session_state.get(signature_key) != staff_signature or widget_key not in st.session_state:
-                        selection_affichee = [j for j in selection_par_defaut if j in membres_disponibles]
-                        selection_affichee = selection_affichee[:capacite_totale]
-                        st.session_state[widget_key] = selection_affichee
-                        st.session_state[signature_key] = staff_signature
-                    
-                    selection_complete = st.multiselect(
-                        f"Joueurs inscrits (max {joueurs_possibles})",
-                        membres_disponibles,
-                        default=selection_par_defaut,
-                        max_selections=capacite_totale,
-                        placeholder="Selection des joueurs",
-                        key=widget_key,
-                        label_visibility="collapsed"
+                with cols[col_idx]:
+                    afficher_creneau(
+                        day, i, grille_jour, st.session_state.rendu_jour,
+                        staffers, membres_disponibles, noms_membres,
                     )
 
-                    # Inclure automatiquement les responsables, même si décochés dans la liste
-                    joueurs_selectionnes = [j for j in selection_complete if j not in responsables_joueurs]
-                    joueurs_selectionnes = joueurs_selectionnes[:joueurs_possibles]
-                    
-                    # Combiner responsables + joueurs sélectionnés pour la sauvegarde
-                    tous_les_joueurs = responsables_joueurs + joueurs_selectionnes
-                    st.session_state.responsables[key_joueurs] = joueurs_selectionnes
-                    
-                    st.write(f"**{len(tous_les_joueurs)}/{capacite_totale} places** (dont {len(responsables_joueurs)} responsable{'s' if len(responsables_joueurs) > 1 else ''} + max {joueurs_possibles} joueur{'s' if joueurs_possibles > 1 else ''})")
-                
-                st.divider()
+    afficher_profilage()
 
-    # Sauvegarder les données après les modifications
-    save_responsables(st.session_state.responsables)
-    
     st.divider()
-    if st.button("⬅️ Retour au calendrier"):
-        st.session_state.selected_day = None
-        save_responsables(st.session_state.responsables)
-        st.rerun()
+    st.button("⬅️ Retour au calendrier", on_click=retour_calendrier)
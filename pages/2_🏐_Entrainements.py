@@ -1,170 +1,242 @@
 import streamlit as st
 import pandas as pd
-import json
-import os
-from datetime import datetime, timedelta
+from datetime import date, datetime
+
+from planning import TERRAINS, libelle_heure
+from planning.lot import APPLIQUE, CONFLIT, DEJA_APPLIQUE
+from planning.programmation import (
+    ajouter_entrainement,
+    appliquer_demandes,
+    bloquer_tournoi,
+    colonnes_terrains,
+    demande_entrainement,
+    demande_tournoi,
+    modifier_entrainement,
+    modifier_tournoi,
+    supprimer_entrainement,
+    supprimer_tournoi,
+    terrains_selectionnes,
+)
+from planning.regles import (
+    JOURS_SEMAINE,
+    SAISON_DEFAUT,
+    SEPARATEUR_EXCEPTIONS,
+    dematerialiser,
+    format_exceptions,
+    saison_courante,
+    terrains_ligne,
+)
+from planning.stockage import COLONNES, get_stockage
 
 st.title("🏐 Planning des Entraînements et Tournois")
 
-# Chemin des fichiers
-ENTRAINEMENTS_FILE = "data/entrainements.csv"
-TOURNOIS_FILE = "data/tournois.csv"
-RESPONSABLES_FILE = "data/responsables.json"
-MEMBRES_FILE = "data/membres.csv"
+# Stockage des créneaux, entraînements, tournois et membres
+stockage = get_stockage()
 
 # Charger la liste des coachs
 def get_coachs():
-    """Retourne la liste des coachs depuis le fichier membres.csv"""
+    """Retourne la liste des coachs depuis l'annuaire des membres"""
     try:
-        df_membres = pd.read_csv(MEMBRES_FILE)
-        coachs_df = df_membres[df_membres["coach"] == "Oui"]
-        coachs = coachs_df["prenom"].str.cat(coachs_df["nom"], sep=" ").tolist()
-        return coachs
+        return stockage.annuaire_membres().coachs
     except FileNotFoundError:
         st.error("Fichier membres.csv introuvable.")
         return []
     except Exception as e:
         st.error(f"Erreur lors du chargement des coachs: {e}")
         return []
-def load_responsables():
-    """Charge les responsables depuis le fichier JSON"""
-    if os.path.exists(RESPONSABLES_FILE):
-        try:
-            with open(RESPONSABLES_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_responsables(responsables):
-    """Sauvegarde les responsables dans le fichier JSON"""
-    os.makedirs("data", exist_ok=True)
-    with open(RESPONSABLES_FILE, "w", encoding="utf-8") as f:
-        json.dump(responsables, f, ensure_ascii=False, indent=2)
-
-def appliquer_entrainement_annee(jour_semaine, heure_debut, heure_fin, coach, terrain1, terrain2):
-    """Applique un entraînement récurrent sur toute l'année avec vérification de conflits"""
-    responsables = load_responsables()
-    
-    # Mapping des jours en français vers les indices (0=lundi, 6=dimanche)
-    jours_mapping = {
-        "lundi": 0, "mardi": 1, "mercredi": 2, "jeudi": 3,
-        "vendredi": 4, "samedi": 5, "dimanche": 6
-    }
-    
-    jour_idx = jours_mapping.get(jour_semaine.lower())
-    if jour_idx is None:
-        return False, []
-    
-    # Calculer les créneaux horaires concernés (commence à 8h)
-    heure_debut_int = int(heure_debut.split(":")[0])
-    heure_fin_int = int(heure_fin.split(":")[0])
-    creneaux = list(range(heure_debut_int - 8, heure_fin_int - 8))
-    
-    # Vérifier les conflits potentiels
-    conflits = []
-    start_date = datetime(2026, 1, 1)
-    end_date = datetime(2026, 12, 31)
-    current_date = start_date
-    
-    while current_date <= end_date:
-        if current_date.weekday() == jour_idx:
-            year = current_date.year
-            month = current_date.month
-            day = current_date.day
-            
-            for creneau in creneaux:
-                if terrain1:
-                    key = f"{year}-{month}-{day}-{creneau}-terrain1"
-                    if responsables.get(key):  # Vérifier si terrain1 est déjà occupé
-                        conflits.append(f"{day}/{month}/{year} - Terrain 1 - {8+creneau}h")
-                if terrain2:
-                    key = f"{year}-{month}-{day}-{creneau}-terrain2"
-                    if responsables.get(key):  # Vérifier si terrain2 est déjà occupé
-                        conflits.append(f"{day}/{month}/{year} - Terrain 2 - {8+creneau}h")
-        
-        current_date += timedelta(days=1)
-    
-    # Si des conflits existent, retourner les informations sans appliquer
-    if conflits:
-        return False, conflits
-    
-    # Sinon, appliquer l'entraînement
-    current_date = start_date
-    count = 0
-    while current_date <= end_date:
-        # Vérifier si c'est le bon jour de la semaine
-        if current_date.weekday() == jour_idx:
-            year = current_date.year
-            month = current_date.month
-            day = current_date.day
-            
-            # Bloquer les créneaux avec le coach
-            for creneau in creneaux:
-                if terrain1:
-                    key = f"{year}-{month}-{day}-{creneau}-terrain1"
-                    responsables[key] = coach
-                if terrain2:
-                    key = f"{year}-{month}-{day}-{creneau}-terrain2"
-                    responsables[key] = coach
-            
-            count += 1
-        
-        current_date += timedelta(days=1)
-    
-    save_responsables(responsables)
-    return True, []
 
-def bloquer_tournoi(date, heure_debut, heure_fin, niveau, genre, terrain1, terrain2):
-    """Bloque les créneaux pour un tournoi à une date spécifique avec vérification de conflits"""
-    responsables = load_responsables()
-    
-    # Calculer les créneaux horaires concernés (commence à 8h)
-    heure_debut_int = int(heure_debut.split(":")[0])
-    heure_fin_int = int(heure_fin.split(":")[0])
-    creneaux = list(range(heure_debut_int - 8, heure_fin_int - 8))
-    
-    year = date.year
-    month = date.month
-    day = date.day
-    
-    # Vérifier les conflits
-    conflits = []
-    for creneau in creneaux:
-        if terrain1:
-            key = f"{year}-{month}-{day}-{creneau}-terrain1"
-            if responsables.get(key):
-                conflits.append(f"{day}/{month}/{year} - Terrain 1 - {8+creneau}h")
-        if terrain2:
-            key = f"{year}-{month}-{day}-{creneau}-terrain2"
-            if responsables.get(key):
-                conflits.append(f"{day}/{month}/{year} - Terrain 2 - {8+creneau}h")
-    
-    # Si des conflits existent, retourner sans appliquer
-    if conflits:
-        return False, conflits
-    
-    # Créer l'identifiant du tournoi
-    tournoi_info = f"TOURNOI|{niveau}|{genre}"
-    
-    # Bloquer les créneaux
+def _format_heures(creneaux):
+    """Plages horaires des créneaux, ex. "18h-20h" pour les créneaux 10 et 11"""
+    plages = []
     for creneau in creneaux:
-        if terrain1:
-            key = f"{year}-{month}-{day}-{creneau}-terrain1"
-            responsables[key] = tournoi_info
-        if terrain2:
-            key = f"{year}-{month}-{day}-{creneau}-terrain2"
-            responsables[key] = tournoi_info
-    
-    save_responsables(responsables)
-    return True, []  # Retourner succès
+        if plages and plages[-1][1] == creneau:
+            plages[-1][1] = creneau + 1
+        else:
+            plages.append([creneau, creneau + 1])
+    return ", ".join(f"{libelle_heure(c0)}-{libelle_heure(c1)}" for c0, c1 in plages)
+
+def cases_terrains(cle, defaut):
+    """Une case à cocher par terrain, côte à côte ; retourne les indices des terrains cochés"""
+    colonnes = st.columns(len(TERRAINS))
+    coches = []
+    for t, champ in enumerate(TERRAINS):
+        with colonnes[t]:
+            coches.append(st.checkbox(f"Terrain {t + 1}", value=defaut(t), key=f"{champ}_{cle}"))
+    return terrains_selectionnes(coches)
+
+def _texte(valeur, defaut=""):
+    """Valeur texte d'une cellule de table (défaut si vide ou manquante)"""
+    return valeur.strip() if isinstance(valeur, str) and valeur.strip() else defaut
+
+def _heure(valeur, defaut):
+    return datetime.strptime(_texte(valeur, defaut), "%H:%M").time()
+
+def _choix(label, options, valeur, cle):
+    """Liste déroulante positionnée sur la valeur actuelle (ajoutée aux options si besoin)"""
+    if valeur and valeur not in options:
+        options = options + [valeur]
+    return st.selectbox(label, options, index=options.index(valeur) if valeur in options else 0, key=cle)
+
+def champs_entrainement(cle, ligne=None):
+    """Champs d'un entraînement, préremplis avec une ligne existante
+
+    Retourne la ligne saisie et le message d'erreur (None si elle est valide).
+    """
+    ligne = ligne or {}
+    col1, col2 = st.columns(2)
+
+    with col1:
+        jour = _choix("Jour de la semaine", list(JOURS_SEMAINE), _texte(ligne.get("jour")), f"jour_{cle}")
+        heure_debut = st.time_input("Heure de début", value=_heure(ligne.get("heure_debut"), "18:00"), key=f"debut_{cle}")
+        heure_fin = st.time_input("Heure de fin", value=_heure(ligne.get("heure_fin"), "20:00"), key=f"fin_{cle}")
+
+    with col2:
+        coachs = get_coachs()
+        if not coachs and not ligne:
+            st.warning("Aucun coach disponible. Ajoutez des membres avec le rôle 'coach' dans la page Membres.")
+            coach = ""
+        else:
+            coach = _choix("Coach", coachs, _texte(ligne.get("coach")), f"coach_{cle}")
+        niveau = _choix("Niveau", ["Débutant", "Intermédiaire", "Avancé", "Compétition"],
+                        _texte(ligne.get("niveau")), f"niveau_{cle}")
+        genre = _choix("Genre", ["Mixte", "Féminin", "Masculin"], _texte(ligne.get("genre")), f"genre_{cle}")
+        # Premier terrain coché par défaut
+        actuels = terrains_ligne(ligne) if ligne else [0]
+        terrains = cases_terrains(cle, lambda t: t in actuels)
+
+    # Saison et dates sans entraînement (vacances, jours fériés...) ; une ligne
+    # enregistrée sans saison garde celle que lui donnent les règles
+    debut_saison_defaut, fin_saison_defaut = SAISON_DEFAUT if ligne else saison_courante()
+    col_s1, col_s2 = st.columns(2)
+    with col_s1:
+        debut_saison = st.date_input(
+            "Début de la saison",
+            value=date.fromisoformat(_texte(ligne.get("date_debut"), debut_saison_defaut.isoformat())),
+            key=f"saison_debut_{cle}"
+        )
+    with col_s2:
+        fin_saison = st.date_input(
+            "Fin de la saison",
+            value=date.fromisoformat(_texte(ligne.get("date_fin"), fin_saison_defaut.isoformat())),
+            key=f"saison_fin_{cle}"
+        )
+    dates_exclues = st.text_input(
+        "Dates sans entraînement (JJ/MM/AAAA, séparées par des virgules)",
+        value=", ".join(
+            date.fromisoformat(d.strip()).strftime("%d/%m/%Y")
+            for d in _texte(ligne.get("exceptions")).split(SEPARATEUR_EXCEPTIONS) if d.strip()
+        ),
+        placeholder="25/12/2026, 01/01/2027",
+        key=f"exceptions_{cle}"
+    )
+
+    try:
+        exceptions = [
+            datetime.strptime(d.strip(), "%d/%m/%Y").date()
+            for d in dates_exclues.split(",") if d.strip()
+        ]
+    except ValueError:
+        exceptions = None
+
+    erreur = None
+    if not coach:
+        erreur = "Veuillez entrer le nom du coach"
+    elif not terrains:
+        erreur = "Veuillez sélectionner au moins un terrain"
+    elif fin_saison < debut_saison:
+        erreur = "La fin de la saison doit être après son début"
+    elif exceptions is None:
+        erreur = "Dates sans entraînement invalides (format attendu : JJ/MM/AAAA)"
+    return {
+        "jour": jour,
+        "heure_debut": heure_debut.strftime("%H:%M"),
+        "heure_fin": heure_fin.strftime("%H:%M"),
+        "coach": coach,
+        "niveau": niveau,
+        "genre": genre,
+        **colonnes_terrains(terrains),
+        "date_debut": debut_saison.isoformat(),
+        "date_fin": fin_saison.isoformat(),
+        "exceptions": format_exceptions(exceptions or [])
+    }, erreur
+
+def champs_tournoi(cle, ligne=None):
+    """Champs d'un tournoi, préremplis avec une ligne existante
+
+    Retourne la ligne saisie et le message d'erreur (None si elle est valide).
+    """
+    ligne = ligne or {}
+    col1, col2 = st.columns(2)
+
+    with col1:
+        date_tournoi = st.date_input(
+            "Date du tournoi",
+            value=date.fromisoformat(_texte(ligne.get("date"), date.today().isoformat())),
+            key=f"date_{cle}"
+        )
+        heure_debut_tournoi = st.time_input("Heure de début", value=_heure(ligne.get("heure_debut"), "09:00"), key=f"debut_{cle}")
+        heure_fin_tournoi = st.time_input("Heure de fin", value=_heure(ligne.get("heure_fin"), "18:00"), key=f"fin_{cle}")
+
+    with col2:
+        niveau_tournoi = _choix("Niveau", ["S1", "S2", "S3", "Loisir"], _texte(ligne.get("niveau")), f"niveau_{cle}")
+        genre_tournoi = _choix("Genre", ["Mixte", "Féminin", "Masculin"], _texte(ligne.get("genre")), f"genre_{cle}")
+        # Tous les terrains cochés par défaut
+        actuels = terrains_ligne(ligne) if ligne else range(len(TERRAINS))
+        terrains_tournoi = cases_terrains(cle, lambda t: t in actuels)
+
+    erreur = None if terrains_tournoi else "Veuillez sélectionner au moins un terrain"
+    return {
+        "date": date_tournoi.strftime("%Y-%m-%d"),
+        "heure_debut": heure_debut_tournoi.strftime("%H:%M"),
+        "heure_fin": heure_fin_tournoi.strftime("%H:%M"),
+        "niveau": niveau_tournoi,
+        "genre": genre_tournoi,
+        **colonnes_terrains(terrains_tournoi)
+    }, erreur
+
+def _decrire_entrainement(ligne):
+    return f"{ligne['jour']} {ligne['heure_debut']}-{ligne['heure_fin']} - {ligne['coach']} ({ligne['niveau']}, {ligne['genre']})"
+
+def _decrire_tournoi(ligne):
+    return f"{ligne['date']} {ligne['heure_debut']}-{ligne['heure_fin']} - {ligne['niveau']} {ligne['genre']}"
+
+def _afficher_conflits(conflits, objet):
+    st.error(f"❌ **ATTENTION : Impossible d'enregistrer {objet} !**")
+    st.error("Les créneaux suivants sont déjà occupés sur le terrain sélectionné :")
+    with st.expander("📋 Voir la liste complète des conflits", expanded=True):
+        for conflit in _format_conflits(conflits):
+            st.write(f"• {conflit}")
+
+def _format_conflits(plages):
+    """Met en forme les plages de conflits (voir regrouper_conflits) pour l'affichage"""
+    lignes = []
+    for terrain, creneaux, premier, dernier, nb in plages:
+        if nb == 1:
+            dates = premier.strftime("%d/%m/%Y")
+        else:
+            dates = f"du {premier.strftime('%d/%m/%Y')} au {dernier.strftime('%d/%m/%Y')} ({nb} dates)"
+        lignes.append(f"Terrain {terrain + 1} - {_format_heures(creneaux)} - {dates}")
+    return lignes
+
+def _afficher_rapport(demandes, rapport):
+    """Tableau ligne par ligne du résultat d'un lot"""
+    st.dataframe(
+        pd.DataFrame({
+            "Ligne": range(1, len(demandes) + 1),
+            "Libellé": [libelle.replace("|", " - ") for _, _, _, libelle in demandes],
+            "Statut": [statut for statut, _ in rapport],
+            "Conflits": ["; ".join(_format_conflits(conflits)) for _, conflits in rapport],
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
 
 
 # Afficher les entraînements existants
 st.header("📋 Entraînements récurrents")
 
 try:
-    df_entrainements = pd.read_csv(ENTRAINEMENTS_FILE)
+    df_entrainements = stockage.lire_table("entrainements")
     
     # Trier par ordre de jour de la semaine puis par heure de début
     jours_ordre = {
@@ -175,9 +247,9 @@ try:
     df_entrainements = df_entrainements.sort_values(by=['_ordre_jour', 'heure_debut'])
     df_entrainements = df_entrainements.drop(columns=['_ordre_jour'])
     
-    st.dataframe(df_entrainements, use_container_width=True, hide_index=True)
+    st.dataframe(df_entrainements.drop(columns=["id"]), use_container_width=True, hide_index=True)
 except FileNotFoundError:
-    df_entrainements = pd.DataFrame(columns=["jour", "heure_debut", "heure_fin", "coach", "niveau", "genre", "terrain1", "terrain2"])
+    df_entrainements = pd.DataFrame(columns=COLONNES["entrainements"])
     st.info("Aucun entraînement récurrent pour le moment.")
 
 st.divider()
@@ -186,14 +258,14 @@ st.divider()
 st.header("🏆 Tournois programmés")
 
 try:
-    df_tournois = pd.read_csv(TOURNOIS_FILE)
+    df_tournois = stockage.lire_table("tournois")
     
     # Trier par date puis par heure de début
     df_tournois = df_tournois.sort_values(by=['date', 'heure_debut'])
     
-    st.dataframe(df_tournois, use_container_width=True, hide_index=True)
+    st.dataframe(df_tournois.drop(columns=["id"]), use_container_width=True, hide_index=True)
 except FileNotFoundError:
-    df_tournois = pd.DataFrame(columns=["date", "heure_debut", "heure_fin", "niveau", "genre", "terrain1", "terrain2"])
+    df_tournois = pd.DataFrame(columns=COLONNES["tournois"])
     st.info("Aucun tournoi programmé pour le moment.")
 
 st.divider()
@@ -201,175 +273,125 @@ st.divider()
 # Formulaire d'ajout d'entraînement dans un expander
 with st.expander("➕ Ajouter un entraînement récurrent", expanded=False):
     with st.form("ajout_entrainement"):
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            jour = st.selectbox(
-                "Jour de la semaine",
-                ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
-            )
-            
-            heure_debut = st.time_input(
-                "Heure de début",
-                value=datetime.strptime("18:00", "%H:%M").time()
-            )
-            heure_fin = st.time_input(
-                "Heure de fin",
-                value=datetime.strptime("20:00", "%H:%M").time()
-            )
-        
-        with col2:
-            coachs = get_coachs()
-            if not coachs:
-                st.warning("Aucun coach disponible. Ajoutez des membres avec le rôle 'coach' dans la page Membres.")
-                coach = ""
-            else:
-                coach = st.selectbox("Coach", coachs)
-            
-            niveau = st.selectbox(
-                "Niveau",
-                ["Débutant", "Intermédiaire", "Avancé", "Compétition"]
-            )
-            
-            genre = st.selectbox(
-                "Genre",
-                ["Mixte", "Féminin", "Masculin"]
-            )
-            
-            col_t1, col_t2 = st.columns(2)
-            with col_t1:
-                terrain1 = st.checkbox("Terrain 1", value=True)
-            with col_t2:
-                terrain2 = st.checkbox("Terrain 2", value=False)
-        
+        ligne_entrainement, erreur = champs_entrainement("entrainement")
         submitted = st.form_submit_button("Ajouter l'entraînement", use_container_width=True)
         
         if submitted:
-            if not coach:
-                st.error("Veuillez entrer le nom du coach")
-            elif not terrain1 and not terrain2:
-                st.error("Veuillez sélectionner au moins un terrain")
+            if erreur:
+                st.error(erreur)
             else:
-                # Créer l'identifiant d'entraînement
-                coach_info = f"ENTRAINEMENT|{coach}|{genre}|{niveau}"
-                
-                # Vérifier les conflits avant d'ajouter
-                success, conflits = appliquer_entrainement_annee(
-                    jour,
-                    heure_debut.strftime("%H:%M"),
-                    heure_fin.strftime("%H:%M"),
-                    coach_info,
-                    terrain1,
-                    terrain2
-                )
+                # Vérifier les conflits puis enregistrer la règle
+                success, conflits = ajouter_entrainement(stockage, ligne_entrainement)
                 
                 if not success:
-                    st.error("❌ **ATTENTION : Impossible d'ajouter cet entraînement !**")
-                    st.error("Les créneaux suivants sont déjà occupés sur le terrain sélectionné :")
-                    with st.expander("📋 Voir la liste complète des conflits", expanded=True):
-                        for conflit in conflits:
-                            st.write(f"• {conflit}")
+                    _afficher_conflits(conflits, "cet entraînement")
                     st.info("💡 Veuillez modifier l'heure ou le jour de l'entraînement pour éviter ces conflits.")
                 else:
-                    # Ajouter au CSV
-                    nouvelle_ligne = pd.DataFrame([{
-                        "jour": jour,
-                        "heure_debut": heure_debut.strftime("%H:%M"),
-                        "heure_fin": heure_fin.strftime("%H:%M"),
-                        "coach": coach,
-                        "niveau": niveau,
-                        "genre": genre,
-                        "terrain1": "oui" if terrain1 else "non",
-                        "terrain2": "oui" if terrain2 else "non"
-                    }])
-                    
-                    df_entrainements = pd.concat([df_entrainements, nouvelle_ligne], ignore_index=True)
-                    df_entrainements.to_csv(ENTRAINEMENTS_FILE, index=False)
-            
-                    st.success(f"✅ Entraînement ajouté avec succès pour tous les {jour}s de l'année 2026 !")
+                    st.success(
+                        f"✅ Entraînement ajouté avec succès pour tous les {ligne_entrainement['jour']}s "
+                        f"du {date.fromisoformat(ligne_entrainement['date_debut']).strftime('%d/%m/%Y')} "
+                        f"au {date.fromisoformat(ligne_entrainement['date_fin']).strftime('%d/%m/%Y')} !"
+                    )
                     st.rerun()
 
 # Formulaire d'ajout de tournoi dans un expander
 with st.expander("🏆 Ajouter un tournoi", expanded=False):
     with st.form("ajout_tournoi"):
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            date_tournoi = st.date_input(
-                "Date du tournoi",
-                value=datetime.now()
-            )
-            
-            heure_debut_tournoi = st.time_input(
-                "Heure de début",
-                value=datetime.strptime("09:00", "%H:%M").time()
-            )
-            
-            heure_fin_tournoi = st.time_input(
-                "Heure de fin",
-                value=datetime.strptime("18:00", "%H:%M").time()
-            )
-        
-        with col2:
-            niveau_tournoi = st.selectbox(
-                "Niveau",
-                ["S1", "S2", "S3", "Loisir"]
-            )
-            
-            genre_tournoi = st.selectbox(
-                "Genre",
-                ["Mixte", "Féminin", "Masculin"],
-                key="genre_tournoi"
-            )
-            
-            col_t1, col_t2 = st.columns(2)
-            with col_t1:
-                terrain1_tournoi = st.checkbox("Terrain 1", value=True, key="terrain1_tournoi")
-            with col_t2:
-                terrain2_tournoi = st.checkbox("Terrain 2", value=True, key="terrain2_tournoi")
-        
+        ligne_tournoi, erreur_tournoi = champs_tournoi("tournoi")
         submitted_tournoi = st.form_submit_button("Ajouter le tournoi", use_container_width=True)
         
         if submitted_tournoi:
-            if not terrain1_tournoi and not terrain2_tournoi:
-                st.error("Veuillez sélectionner au moins un terrain")
+            if erreur_tournoi:
+                st.error(erreur_tournoi)
             else:
-                # Vérifier les conflits avant d'ajouter
+                # Vérifier les conflits, bloquer les créneaux et ajouter la ligne (sans réécrire la table)
                 success, conflits = bloquer_tournoi(
-                    date_tournoi,
-                    heure_debut_tournoi.strftime("%H:%M"),
-                    heure_fin_tournoi.strftime("%H:%M"),
-                    niveau_tournoi,
-                    genre_tournoi,
-                    terrain1_tournoi,
-                    terrain2_tournoi
+                    stockage,
+                    date.fromisoformat(ligne_tournoi["date"]),
+                    ligne_tournoi["heure_debut"],
+                    ligne_tournoi["heure_fin"],
+                    ligne_tournoi["niveau"],
+                    ligne_tournoi["genre"],
+                    terrains_ligne(ligne_tournoi),
+                    ligne_tournoi,
                 )
                 
                 if not success:
-                    st.error("❌ **ATTENTION : Impossible d'ajouter ce tournoi !**")
-                    st.error("Les créneaux suivants sont déjà occupés sur le terrain sélectionné :")
-                    with st.expander("📋 Voir la liste complète des conflits", expanded=True):
-                        for conflit in conflits:
-                            st.write(f"• {conflit}")
+                    _afficher_conflits(conflits, "ce tournoi")
                     st.info("💡 Veuillez modifier l'heure ou la date du tournoi pour éviter ces conflits.")
                 else:
-                    # Ajouter au CSV
-                    nouvelle_ligne_tournoi = pd.DataFrame([{
-                        "date": date_tournoi.strftime("%Y-%m-%d"),
-                        "heure_debut": heure_debut_tournoi.strftime("%H:%M"),
-                        "heure_fin": heure_fin_tournoi.strftime("%H:%M"),
-                        "niveau": niveau_tournoi,
-                        "genre": genre_tournoi,
-                        "terrain1": "oui" if terrain1_tournoi else "non",
-                        "terrain2": "oui" if terrain2_tournoi else "non"
-                    }])
-                    
-                    df_tournois = pd.concat([df_tournois, nouvelle_ligne_tournoi], ignore_index=True)
-                    os.makedirs("data", exist_ok=True)
-                    df_tournois.to_csv(TOURNOIS_FILE, index=False)
-                    
-                    st.success(f"✅ Tournoi ajouté avec succès pour le {date_tournoi.strftime('%d/%m/%Y')} !")
+                    st.success(f"✅ Tournoi ajouté avec succès pour le {date.fromisoformat(ligne_tournoi['date']).strftime('%d/%m/%Y')} !")
+                    st.rerun()
+
+# Modification et suppression : seuls les créneaux de l'entraînement ou du tournoi choisi sont touchés
+with st.expander("✏️ Modifier ou supprimer un entraînement", expanded=False):
+    lignes_entrainements = {int(ligne["id"]): ligne for ligne in df_entrainements.to_dict("records")}
+    if not lignes_entrainements:
+        st.info("Aucun entraînement récurrent pour le moment.")
+    else:
+        id_entrainement = st.selectbox(
+            "Entraînement",
+            list(lignes_entrainements),
+            format_func=lambda i: _decrire_entrainement(lignes_entrainements[i]),
+            key="choix_entrainement"
+        )
+        with st.form("modification_entrainement"):
+            # Clés propres à l'entraînement choisi : les champs sont préremplis à chaque changement
+            ligne_modifiee, erreur = champs_entrainement(f"modification_entrainement_{id_entrainement}", lignes_entrainements[id_entrainement])
+            col_m1, col_m2 = st.columns(2)
+            with col_m1:
+                enregistrer = st.form_submit_button("Enregistrer les modifications", use_container_width=True)
+            with col_m2:
+                supprimer = st.form_submit_button("Supprimer l'entraînement", use_container_width=True)
+        
+        if enregistrer:
+            if erreur:
+                st.error(erreur)
+            else:
+                success, conflits = modifier_entrainement(stockage, id_entrainement, ligne_modifiee)
+                if not success:
+                    _afficher_conflits(conflits, "cet entraînement")
+                else:
+                    st.success("✅ Entraînement modifié !")
+                    st.rerun()
+        if supprimer:
+            supprimer_entrainement(stockage, id_entrainement)
+            st.success("✅ Entraînement supprimé !")
+            st.rerun()
+
+with st.expander("✏️ Modifier ou supprimer un tournoi", expanded=False):
+    lignes_tournois = {int(ligne["id"]): ligne for ligne in df_tournois.to_dict("records")}
+    if not lignes_tournois:
+        st.info("Aucun tournoi programmé pour le moment.")
+    else:
+        id_tournoi = st.selectbox(
+            "Tournoi",
+            list(lignes_tournois),
+            format_func=lambda i: _decrire_tournoi(lignes_tournois[i]),
+            key="choix_tournoi"
+        )
+        with st.form("modification_tournoi"):
+            ligne_modifiee, erreur = champs_tournoi(f"modification_tournoi_{id_tournoi}", lignes_tournois[id_tournoi])
+            col_m1, col_m2 = st.columns(2)
+            with col_m1:
+                enregistrer = st.form_submit_button("Enregistrer les modifications", use_container_width=True)
+            with col_m2:
+                supprimer = st.form_submit_button("Supprimer le tournoi", use_container_width=True)
+        
+        if enregistrer:
+            if erreur:
+                st.error(erreur)
+            else:
+                success, conflits = modifier_tournoi(stockage, id_tournoi, ligne_modifiee)
+                if not success:
+                    _afficher_conflits(conflits, "ce tournoi")
+                else:
+                    st.success("✅ Tournoi modifié !")
                     st.rerun()
+        if supprimer:
+            supprimer_tournoi(stockage, id_tournoi)
+            st.success("✅ Tournoi supprimé !")
+            st.rerun()
 
 st.divider()
 
@@ -379,51 +401,61 @@ st.header("🔄 Gestion")
 col1, col2 = st.columns(2)
 
 with col1:
-    if st.button("Réappliquer tous les entraînements sur l'année 2026", use_container_width=True):
+    if st.button("Retirer les copies date par date des entraînements", use_container_width=True):
         try:
-            df_entrainements = pd.read_csv(ENTRAINEMENTS_FILE)
-            count = 0
-            for _, row in df_entrainements.iterrows():
-                terrain1 = row["terrain1"] == "oui"
-                terrain2 = row["terrain2"] == "oui"
-                # Créer un identifiant d'entraînement au format: "ENTRAINEMENT|coach|genre|niveau"
-                coach_info = f"ENTRAINEMENT|{row['coach']}|{row.get('genre', 'Mixte')}|{row['niveau']}"
-                success, conflits = appliquer_entrainement_annee(
-                    row["jour"],
-                    row["heure_debut"],
-                    row["heure_fin"],
-                    coach_info,
-                    terrain1,
-                    terrain2
-                )
-                if success:
-                    count += 1
-            st.success(f"✅ {count} entraînements réappliqués avec succès !")
-            st.info("💡 Retournez sur la page Calendrier pour voir les entraînements apparaître en violet.")
+            # Les entraînements sont calculés depuis leurs règles : les copies enregistrées
+            # par les anciennes versions ne font qu'alourdir le stockage
+            regles = stockage.regles_entrainements()
+            grille = stockage.charger_grille(avec_regles=False)
+            count = dematerialiser(grille, regles)
+            stockage.enregistrer_grille(grille)
+            st.success(f"✅ {count} créneau(x) recopié(s) retiré(s), {len(regles)} entraînement(s) récurrent(s) conservé(s) !")
+            st.info("💡 Les entraînements restent affichés en violet sur la page Calendrier.")
         except Exception as e:
             st.error(f"Erreur : {e}")
 
 with col2:
     if st.button("Réappliquer tous les tournois", use_container_width=True):
         try:
-            df_tournois = pd.read_csv(TOURNOIS_FILE)
-            count = 0
-            for _, row in df_tournois.iterrows():
-                terrain1 = row["terrain1"] == "oui"
-                terrain2 = row["terrain2"] == "oui"
-                date_tournoi = datetime.strptime(row["date"], "%Y-%m-%d")
-                success, conflits = bloquer_tournoi(
-                    date_tournoi,
-                    row["heure_debut"],
-                    row["heure_fin"],
-                    row["niveau"],
-                    row["genre"],
-                    terrain1,
-                    terrain2
-                )
-                if success:
-                    count += 1
-            st.success(f"✅ {count} tournoi(s) reprogrammé(s) !")
-            st.info("💡 Retournez sur la page Calendrier pour voir les tournois.")
+            # Une lecture, une vérification de tous les tournois, une écriture, sous le verrou
+            # de programmation (un import ou un entraînement modifié ne s'intercale pas)
+            with stockage.verrou_programmation():
+                demandes = [demande_tournoi(ligne) for ligne in stockage.lire_table("tournois").to_dict("records")]
+                grille, rapport = appliquer_demandes(stockage, demandes)
+                rejetes = stockage.enregistrer_grille(grille, tout_ou_rien=True) if grille is not None else []
+            if rejetes:
+                st.error("Le planning a été modifié pendant l'opération : rien n'a été enregistré, veuillez réessayer.")
+            else:
+                count = sum(statut == APPLIQUE for statut, _ in rapport)
+                deja = sum(statut == DEJA_APPLIQUE for statut, _ in rapport)
+                st.success(f"✅ {count} tournoi(s) reprogrammé(s), {deja} déjà en place !")
+                if any(statut != APPLIQUE for statut, _ in rapport):
+                    _afficher_rapport(demandes, rapport)
+                st.info("💡 Retournez sur la page Calendrier pour voir les tournois.")
+        except FileNotFoundError:
+            st.info("Aucun tournoi programmé pour le moment.")
+        except Exception as e:
+            st.error(f"Erreur : {e}")
+
+# Import groupé d'entraînements (début de saison)
+with st.expander("📥 Importer des entraînements (CSV)", expanded=False):
+    st.caption(
+        "Colonnes attendues : " + ", ".join(c for c in COLONNES["entrainements"] if c != "id")
+        + ". Les dates sont au format AAAA-MM-JJ ; date_debut, date_fin et exceptions sont facultatives."
+    )
+    fichier_import = st.file_uploader("Fichier CSV", type="csv")
+    if fichier_import is not None and st.button("Importer les entraînements", use_container_width=True):
+        try:
+            lignes = pd.read_csv(fichier_import, dtype=str, keep_default_na=False).to_dict("records")
+            # Chaque ligne est vérifiée contre le planning et contre les lignes précédentes du fichier ;
+            # vérification et ajout sous le verrou de programmation (voir planning.programmation)
+            demandes = [demande_entrainement(ligne) for ligne in lignes]
+            with stockage.verrou_programmation():
+                _, rapport = appliquer_demandes(stockage, demandes)
+                acceptees = [ligne for ligne, (statut, _) in zip(lignes, rapport) if statut == APPLIQUE]
+                stockage.ajouter_lignes("entrainements", acceptees)
+            nb_conflits = sum(statut == CONFLIT for statut, _ in rapport)
+            st.success(f"✅ {len(acceptees)} entraînement(s) importé(s), {nb_conflits} en conflit !")
+            _afficher_rapport(demandes, rapport)
         except Exception as e:
             st.error(f"Erreur : {e}")
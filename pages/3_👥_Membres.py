@@ -1,10 +1,11 @@
 import streamlit as st
-import pandas as pd
+
+from planning.stockage import get_stockage
 
 st.title("👥 Membres du Club")
 
 try:
-    df = pd.read_csv("data/membres.csv")
+    df = get_stockage().annuaire_membres().table
     st.dataframe(df, use_container_width=True, hide_index=True)
 except FileNotFoundError:
     st.error("Fichier membres.csv introuvable.")
@@ -0,0 +1,17 @@
+"""Stockage partagé du planning des créneaux (calendrier, entraînements, tournois)"""
+from planning.grille import (
+    CAPACITE_TERRAIN,
+    DUREE_CRENEAU,
+    MINUTES_OUVERTURE,
+    NB_CRENEAUX,
+    PREFIXE_ENTRAINEMENT,
+    PREFIXE_TOURNOI,
+    TERRAINS,
+    Grille,
+    TableLibelles,
+    creneaux_horaires,
+    heure_creneau,
+    libelle_heure,
+    ordinaux_jour_semaine,
+)
+from planning.store import RESPONSABLES_FILE, load_grille, save_grille
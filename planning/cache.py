@@ -0,0 +1,77 @@
+"""Cache des événements du calendrier, jour par jour"""
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from planning.evenements import evenements_jour
+
+# Nombre de jours conservés (environ 3 saisons)
+TAILLE_MAX = 1200
+
+
+class CacheEvenements:
+    """Mémorise les événements de chaque jour selon l'empreinte de son contenu
+
+    Une écriture sur un jour change son empreinte : seul ce jour est reconstruit,
+    les autres restent servis depuis le cache même si la grille a été rechargée.
+    """
+
+    def __init__(self, taille_max=TAILLE_MAX):
+        self.taille_max = taille_max
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def evenements_plage(self, grille, debut, fin):
+        """Événements des jours de la plage [debut, fin[, reconstruits si besoin"""
+        events = []
+        empreintes = grille.empreintes_plage(debut, fin)
+        jour = debut
+        while jour < fin:
+            empreinte = empreintes.get(jour)
+            if empreinte is not None:
+                events.extend(self._evenements_jour(grille, jour, empreinte))
+            jour += timedelta(days=1)
+        return events
+
+    def prechauffer(self, grille, debut, fin):
+        """Calcule à l'avance les événements d'une plage (période voisine)"""
+        for jour, empreinte in grille.empreintes_plage(debut, fin).items():
+            self._evenements_jour(grille, jour, empreinte, compter=False)
+
+    def _evenements_jour(self, grille, jour, empreinte, compter=True):
+        with self._verrou:
+            entree = self._entrees.get(jour)
+            if entree is not None and entree[0] == empreinte:
+                self._entrees.move_to_end(jour)
+                if compter:
+                    self.hits += 1
+                return entree[1]
+        events = evenements_jour(grille, jour)
+        with self._verrou:
+            if compter:
+                self.misses += 1
+            self._entrees[jour] = (empreinte, events)
+            self._entrees.move_to_end(jour)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+        return events
+
+    def stats(self):
+        """Compteurs du cache (succès, échecs, nombre de jours mémorisés)"""
+        with self._verrou:
+            return {"hits": self.hits, "misses": self.misses, "jours": len(self._entrees)}
+
+
+_cache = None
+_verrou_cache = threading.Lock()
+
+
+def get_cache_evenements():
+    """Cache des événements partagé par toutes les sessions (créé une seule fois par processus)"""
+    global _cache
+    with _verrou_cache:
+        if _cache is None:
+            _cache = CacheEvenements()
+        return _cache
@@ -0,0 +1,85 @@
+"""Codec JSON du stockage des créneaux
+
+orjson ou msgspec sont utilisés s'ils sont installés, sinon le module json
+de la bibliothèque standard ; la variable d'environnement ``BNR_JSON``
+(``orjson``, ``msgspec`` ou ``json``) force le choix. Tous produisent le même
+JSON compact en UTF-8 : un fichier écrit avec l'un se relit avec les autres.
+"""
+import json
+import os
+
+# Ordre de préférence quand BNR_JSON n'est pas défini
+CODECS = ("orjson", "msgspec", "json")
+
+
+class Codec:
+    """Encodage en octets (JSON compact) et décodage depuis des octets ou du texte
+
+    ``erreurs`` regroupe les exceptions levées sur un JSON invalide.
+    """
+
+    def __init__(self, nom, decoder, encoder, encoder_lisible, erreurs):
+        self.nom = nom
+        self.decoder = decoder
+        self.encoder = encoder
+        self.encoder_lisible = encoder_lisible
+        self.erreurs = erreurs
+
+
+def _codec_json():
+    return Codec(
+        "json",
+        json.loads,
+        lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        lambda obj: json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8"),
+        (ValueError,),
+    )
+
+
+def _codec_orjson():
+    import orjson
+
+    return Codec(
+        "orjson",
+        orjson.loads,
+        orjson.dumps,
+        lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2),
+        (ValueError,),
+    )
+
+
+def _codec_msgspec():
+    import msgspec
+
+    encodeur = msgspec.json.Encoder()
+    return Codec(
+        "msgspec",
+        msgspec.json.decode,
+        encodeur.encode,
+        lambda obj: msgspec.json.format(encodeur.encode(obj), indent=2),
+        (ValueError, msgspec.DecodeError),
+    )
+
+
+_FABRIQUES = {"json": _codec_json, "orjson": _codec_orjson, "msgspec": _codec_msgspec}
+
+
+def charger_codec(nom=None):
+    """Codec demandé, ou le premier codec installé dans l'ordre de ``CODECS``
+
+    Lève ValueError pour un nom inconnu et ImportError si le codec demandé
+    n'est pas installé.
+    """
+    if nom:
+        if nom not in _FABRIQUES:
+            raise ValueError(f"Codec JSON inconnu : {nom} (attendu : {', '.join(CODECS)})")
+        return _FABRIQUES[nom]()
+    for candidat in CODECS:
+        try:
+            return _FABRIQUES[candidat]()
+        except ImportError:
+            continue
+    return _codec_json()
+
+
+CODEC = charger_codec(os.environ.get("BNR_JSON"))
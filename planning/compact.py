@@ -0,0 +1,287 @@
+"""Format compact de l'instantané des créneaux (format 2)
+
+Le format historique est un dictionnaire plat ``{"Y-M-D-creneau-champ": valeur}``
+qui répète chaque libellé en entier. Le format compact regroupe les cellules
+par date (clés ISO, triables) et remplace les libellés et les noms des joueurs
+par leur indice dans une table de chaînes :
+
+    {
+      "format": 2,
+      "ouverture": "08:00", "duree_creneau": 60, "creneaux": 14,
+      "champs": ["terrain1", "terrain2"],
+      "chaines": ["", "Jean Dupont", "ENTRAINEMENT|Coach|Mixte|Avancé", "Léa Simon"],
+      "jours": {
+        "2026-03-14": {"t": {"10": [2, 2], "11": [1, 0]}, "c": {"11": 6}, "j": {"11": [3]}}
+      },
+      "autres": {}
+    }
+
+``t`` donne, par créneau, l'indice du libellé de chaque terrain (dans l'ordre de
+``champs``), ``c`` les capacités choisies et ``j`` les joueurs inscrits. Les
+clés non reconnues sont conservées telles quelles dans ``autres``.
+
+Le fichier est écrit avec l'en-tête sur la première ligne puis un jour par
+ligne, dans l'ordre des dates (voir ``encoder_compact``) : il reste un JSON
+valide, et une plage de dates se lit sans décoder les autres jours.
+
+Le format ``mois`` découpe cet instantané en un fichier compact par mois (voir
+``planning.store``). Conversion d'un fichier existant entre les formats :
+
+    python -m planning.migration data/responsables.json --format compact
+    python -m planning.migration data/responsables.json --format historique
+    python -m planning.migration data/responsables.json --format mois
+"""
+from datetime import date
+
+import numpy as np
+
+from planning.codec import CODEC
+from planning.grille import (
+    DUREE_CRENEAU,
+    NB_CRENEAUX,
+    TERRAINS,
+    Grille,
+    _as_date,
+    format_cle,
+    heure_creneau,
+    parse_cle,
+)
+
+FORMAT_COMPACT = 2
+
+# Fin de la première ligne d'un instantané écrit un jour par ligne
+_DEBUT_JOURS = b',"jours":{'
+
+
+def est_compact(donnees):
+    """True si le contenu lu est au format compact"""
+    return isinstance(donnees, dict) and donnees.get("format") == FORMAT_COMPACT
+
+
+def vers_compact(responsables):
+    """Convertit le dictionnaire historique au format compact"""
+    chaines = [""]
+    indices = {"": 0}
+
+    def indice(chaine):
+        i = indices.get(chaine)
+        if i is None:
+            i = indices[chaine] = len(chaines)
+            chaines.append(chaine)
+        return i
+
+    champs = list(TERRAINS)
+    jours = {}
+    autres = {}
+    for cle, valeur in responsables.items():
+        parsed = parse_cle(cle)
+        if parsed is None or valeur in ("", [], None):
+            if parsed is None:
+                autres[cle] = valeur
+            continue
+        jour, creneau, champ = parsed
+        if champ.startswith("terrain") and champ not in champs and isinstance(valeur, str):
+            champs.append(champ)
+        if champ in champs and isinstance(valeur, str):
+            entree = jours.setdefault(jour.isoformat(), {}).setdefault("t", {})
+            ligne = entree.setdefault(str(creneau), [0] * len(champs))
+            ligne.extend([0] * (len(champs) - len(ligne)))
+            ligne[champs.index(champ)] = valeur
+        elif champ == "max_places" and isinstance(valeur, int):
+            jours.setdefault(jour.isoformat(), {}).setdefault("c", {})[str(creneau)] = valeur
+        elif champ == "joueurs" and isinstance(valeur, list) and all(isinstance(j, str) for j in valeur):
+            jours.setdefault(jour.isoformat(), {}).setdefault("j", {})[str(creneau)] = valeur
+        else:
+            autres[cle] = valeur
+
+    # Les chaînes sont numérotées dans l'ordre des dates pour un fichier stable
+    jours = {jour: jours[jour] for jour in sorted(jours)}
+    for entree in jours.values():
+        for creneau, ligne in entree.get("t", {}).items():
+            ligne.extend([0] * (len(champs) - len(ligne)))
+            entree["t"][creneau] = [indice(libelle) if libelle else 0 for libelle in ligne]
+        for creneau, joueurs in entree.get("j", {}).items():
+            entree["j"][creneau] = [indice(joueur) for joueur in joueurs]
+        for partie in ("t", "c", "j"):
+            if partie in entree:
+                entree[partie] = dict(sorted(entree[partie].items(), key=lambda item: int(item[0])))
+
+    return {
+        "format": FORMAT_COMPACT,
+        "ouverture": heure_creneau(0),
+        "duree_creneau": DUREE_CRENEAU,
+        "creneaux": NB_CRENEAUX,
+        "champs": champs,
+        "chaines": chaines,
+        "jours": jours,
+        "autres": autres,
+    }
+
+
+def encoder_compact(donnees):
+    """Instantané compact en octets : l'en-tête sur la première ligne, puis un jour par ligne"""
+    entete = CODEC.encoder({cle: valeur for cle, valeur in donnees.items() if cle != "jours"})
+    jours = [CODEC.encoder(jour) + b":" + CODEC.encoder(entree) for jour, entree in donnees["jours"].items()]
+    return entete[:-1] + _DEBUT_JOURS + b"\n" + b",\n".join(jours) + b"\n}}\n"
+
+
+def lire_instantane(flux, debut=None, fin=None):
+    """Lit un instantané depuis un flux binaire, en ne décodant que les jours de [debut, fin[
+
+    Un instantané écrit un jour par ligne est lu ligne à ligne et la lecture
+    s'arrête après le dernier jour de la plage ; sans plage, ou pour tout autre
+    contenu (format historique, compact sur une seule ligne), le fichier est
+    décodé en entier.
+    """
+    if debut is None and fin is None:
+        return CODEC.decoder(flux.read())
+    premiere = flux.readline()
+    if not premiere.rstrip().endswith(_DEBUT_JOURS):
+        return CODEC.decoder(premiere + flux.read())
+    donnees = CODEC.decoder(premiere.rstrip()[:-len(_DEBUT_JOURS)] + b"}")
+    debut_iso = _as_date(debut).isoformat() if debut is not None else None
+    fin_iso = _as_date(fin).isoformat() if fin is not None else None
+    jours = {}
+    for ligne in flux:
+        # Ligne "AAAA-MM-JJ":{...}, (sans virgule pour le dernier jour)
+        ligne = ligne.rstrip().rstrip(b",")
+        if not ligne:
+            continue
+        if ligne == b"}}":
+            break
+        jour = ligne[1:11].decode("ascii")
+        if debut_iso is not None and jour < debut_iso:
+            continue
+        if fin_iso is not None and jour >= fin_iso:
+            break
+        jours[jour] = CODEC.decoder(ligne[13:])
+    donnees["jours"] = jours
+    return donnees
+
+
+def _verifier_creneaux(donnees):
+    """Refuse un fichier écrit avec d'autres horaires ou une autre durée de créneau"""
+    if donnees.get("ouverture", heure_creneau(0)) != heure_creneau(0) or \
+            donnees.get("duree_creneau", DUREE_CRENEAU) != DUREE_CRENEAU:
+        raise ValueError(
+            f"Créneaux enregistrés à partir de {donnees.get('ouverture')} par pas de "
+            f"{donnees.get('duree_creneau')} min, incompatibles avec la configuration du club"
+        )
+
+
+def cellules_compactes(donnees, debut=None, fin=None):
+    """Quadruplets (date, creneau, champ, valeur) du format compact, limités à [debut, fin["""
+    _verifier_creneaux(donnees)
+    chaines = donnees["chaines"]
+    champs = donnees["champs"]
+    debut = _as_date(debut).isoformat() if debut is not None else None
+    fin = _as_date(fin).isoformat() if fin is not None else None
+    for jour_iso, entree in donnees["jours"].items():
+        # Les dates ISO se comparent comme des chaînes
+        if (debut is not None and jour_iso < debut) or (fin is not None and jour_iso >= fin):
+            continue
+        jour = date.fromisoformat(jour_iso)
+        for creneau, ligne in entree.get("t", {}).items():
+            for champ, i in zip(champs, ligne):
+                if i:
+                    yield jour, int(creneau), champ, chaines[i]
+        for creneau, capacite in entree.get("c", {}).items():
+            yield jour, int(creneau), "max_places", capacite
+        for creneau, joueurs in entree.get("j", {}).items():
+            yield jour, int(creneau), "joueurs", [chaines[i] for i in joueurs]
+
+
+def depuis_compact(donnees):
+    """Convertit le format compact en dictionnaire historique"""
+    responsables = {
+        format_cle(jour, creneau, champ): valeur
+        for jour, creneau, champ, valeur in cellules_compactes(donnees)
+    }
+    responsables.update(donnees.get("autres", {}))
+    return responsables
+
+
+def grille_compacte(donnees, modifications, debut=None, fin=None):
+    """Grille des jours [debut, fin[ d'un instantané compact, journal appliqué
+
+    ``donnees`` est un instantané compact ou une liste d'instantanés (un par
+    mois, chacun avec sa table de chaînes). ``modifications`` est le journal
+    rejoué : {clé historique: valeur, ou None si la cellule a été vidée}.
+    Seuls les jours de la plage sont décodés, et directement dans les
+    tableaux de la grille.
+    """
+    instantanes = [donnees] if isinstance(donnees, dict) else list(donnees)
+    debut_iso = _as_date(debut).isoformat() if debut is not None else None
+    fin_iso = _as_date(fin).isoformat() if fin is not None else None
+    grille = Grille()
+    jours_instantanes = []
+    for instantane in instantanes:
+        _verifier_creneaux(instantane)
+        grille.autres.update(instantane.get("autres", {}))
+        jours_instantanes.append([
+            (date.fromisoformat(jour_iso), entree)
+            for jour_iso, entree in instantane["jours"].items()
+            if (debut_iso is None or jour_iso >= debut_iso) and (fin_iso is None or jour_iso < fin_iso)
+        ])
+
+    journal = []
+    for cle, valeur in modifications.items():
+        parsed = parse_cle(cle)
+        if parsed is None:
+            if valeur is None:
+                grille.autres.pop(cle, None)
+            else:
+                grille.autres[cle] = valeur
+        elif (debut_iso is None or parsed[0].isoformat() >= debut_iso) and (fin_iso is None or parsed[0].isoformat() < fin_iso):
+            journal.append(parsed + (valeur,))
+
+    dates = [jour for jours in jours_instantanes for jour, _ in jours] + [cellule[0] for cellule in journal]
+    if not dates:
+        return grille
+    grille._reserver(min(dates), max(dates))
+    for instantane, jours in zip(instantanes, jours_instantanes):
+        _decoder_jours(grille, instantane, jours)
+
+    # Le journal passe après l'instantané
+    for jour, creneau, champ, valeur in journal:
+        grille._ecrire_cellule(jour, creneau, champ, valeur)
+    grille._resumer(0, grille.nb_jours)
+    return grille
+
+
+def _decoder_jours(grille, donnees, jours):
+    """Écrit dans la grille les jours (date, entrée) d'un instantané compact"""
+    chaines = donnees["chaines"]
+    # Lignes de terrains de tous les jours, décodées d'un bloc
+    lignes_jour, lignes_creneau, lignes = [], [], []
+    for jour, entree in jours:
+        idx = jour.toordinal() - grille.origine
+        for creneau, ligne in entree.get("t", {}).items():
+            lignes_jour.append(idx)
+            lignes_creneau.append(int(creneau))
+            lignes.append(ligne)
+        for creneau, capacite in entree.get("c", {}).items():
+            grille._ecrire_cellule(jour, int(creneau), "max_places", capacite)
+        for creneau, joueurs in entree.get("j", {}).items():
+            grille._ecrire_cellule(jour, int(creneau), "joueurs", [chaines[i] for i in joueurs])
+    if not lignes:
+        return
+    lignes = np.array(lignes, dtype=np.int64)
+    lignes_jour = np.array(lignes_jour)
+    lignes_creneau = np.array(lignes_creneau)
+    # Indice dans la table de chaînes -> identifiant de libellé de la grille
+    identifiants = np.zeros(len(chaines), dtype=np.int32)
+    for i in np.unique(lignes).tolist():
+        if i:
+            identifiants[i] = grille.libelles.intern(chaines[i])
+    valeurs = identifiants[lignes]
+    dans_grille = lignes_creneau < NB_CRENEAUX
+    for k, champ in enumerate(donnees["champs"]):
+        # Terrains absents de la configuration et créneaux hors journée : conservés dans "autres"
+        hors = np.nonzero((lignes[:, k] != 0) & (~dans_grille if champ in TERRAINS else True))[0]
+        for n in hors.tolist():
+            jour = grille.date_index(int(lignes_jour[n]))
+            grille.autres[format_cle(jour, int(lignes_creneau[n]), champ)] = chaines[lignes[n, k]]
+        if champ in TERRAINS:
+            grille.terrains[lignes_jour[dans_grille], lignes_creneau[dans_grille], TERRAINS.index(champ)] = \
+                valeurs[dans_grille, k]
@@ -0,0 +1,55 @@
+"""Configuration du club : nombre de terrains, horaires d'ouverture et durée des créneaux
+
+Lue au démarrage depuis ``data/club.json`` (ou le fichier indiqué par la
+variable d'environnement ``BNR_CONFIG``) ; le fichier est facultatif et les
+valeurs absentes gardent leur valeur par défaut, par exemple :
+
+    {"terrains": 3, "ouverture": "08:00", "fermeture": "22:00", "duree_creneau": 30}
+
+Les créneaux enregistrés sont repérés par leur numéro depuis l'ouverture :
+changer l'ouverture ou la durée des créneaux change leur signification, à
+faire avant de saisir des données. Ajouter un terrain est sans risque.
+"""
+import json
+import os
+
+CONFIG_FILE = "data/club.json"
+
+DEFAUTS = {
+    "terrains": 2,
+    "ouverture": "08:00",
+    "fermeture": "22:00",
+    "duree_creneau": 60,  # minutes
+    "capacite_terrain": 8,
+}
+
+
+def minutes(heure):
+    """Nombre de minutes depuis minuit d'une heure "HH:MM" (ou "HH")"""
+    heures, _, mins = heure.partition(":")
+    return int(heures) * 60 + int(mins or 0)
+
+
+def charger_config(fichier=None):
+    """Configuration du club, complétée par les valeurs par défaut
+
+    Lève ValueError si la configuration est incohérente.
+    """
+    fichier = fichier or os.environ.get("BNR_CONFIG", CONFIG_FILE)
+    config = dict(DEFAUTS)
+    try:
+        with open(fichier, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+
+    ouverture, fermeture = minutes(config["ouverture"]), minutes(config["fermeture"])
+    duree = int(config["duree_creneau"])
+    if int(config["terrains"]) < 1:
+        raise ValueError(f"{fichier} : il faut au moins un terrain")
+    if duree <= 0 or not 0 <= ouverture < fermeture < 24 * 60 or (fermeture - ouverture) % duree:
+        raise ValueError(
+            f"{fichier} : l'amplitude {config['ouverture']}-{config['fermeture']} "
+            f"doit être un multiple de la durée des créneaux ({duree} min)"
+        )
+    return config
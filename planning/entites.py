@@ -0,0 +1,79 @@
+"""Entraînements et tournois repérés par leur identifiant
+
+Chaque ligne des tables ``entrainements`` et ``tournois`` porte un
+identifiant stable (colonne ``id``). L'index {id: entité} donne directement
+les créneaux occupés par chaque entraînement ou tournoi (dates, créneaux,
+terrains, libellé) : le modifier ou le supprimer ne touche que ces créneaux,
+sans parcourir la grille ni tout réappliquer.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from planning.grille import PREFIXE_TOURNOI, _as_date, creneaux_horaires
+from planning.regles import identifiant, regles_depuis_lignes, terrains_ligne
+
+
+def libelle_tournoi(niveau, genre):
+    """Libellé au format "TOURNOI|niveau|genre" """
+    return f"{PREFIXE_TOURNOI}{niveau}|{genre}"
+
+
+class Tournoi:
+    """Tournoi d'une journée : une plage horaire sur des terrains"""
+
+    def __init__(self, jour, creneaux, terrains, libelle, id=None):
+        self.id = id
+        self.jour = _as_date(jour)
+        self.creneaux = list(creneaux)
+        self.terrains = list(terrains)
+        self.libelle = libelle
+
+    @classmethod
+    def depuis_ligne(cls, ligne):
+        """Tournoi décrit par une ligne de la table des tournois (None si invalide)"""
+        try:
+            return cls(
+                date.fromisoformat(ligne["date"]),
+                creneaux_horaires(ligne["heure_debut"], ligne["heure_fin"]),
+                terrains_ligne(ligne),
+                libelle_tournoi(ligne["niveau"], ligne["genre"]),
+                identifiant(ligne),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+
+    @property
+    def debut(self):
+        return self.jour
+
+    @property
+    def fin(self):
+        return self.jour
+
+    def ordinaux(self, debut=None, fin=None):
+        """Ordinal de la date du tournoi s'il est dans [debut, fin["""
+        if (debut is not None and self.jour < _as_date(debut)) or \
+                (fin is not None and self.jour >= _as_date(fin)):
+            return np.array([], dtype=np.int64)
+        return np.array([self.jour.toordinal()], dtype=np.int64)
+
+
+def index_entrainements(lignes):
+    """Règles des entraînements récurrents par identifiant"""
+    return {regle.id: regle for regle in regles_depuis_lignes(lignes)}
+
+
+def index_tournois(lignes):
+    """Tournois valides par identifiant"""
+    tournois = {}
+    for ligne in lignes:
+        tournoi = Tournoi.depuis_ligne(ligne)
+        if tournoi is not None:
+            tournois[tournoi.id] = tournoi
+    return tournois
+
+
+def plage_entites(*entites):
+    """Plage [début, fin[ couvrant toutes les dates des entités"""
+    return min(e.debut for e in entites), max(e.fin for e in entites) + timedelta(days=1)
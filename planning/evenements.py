@@ -0,0 +1,124 @@
+"""Construction des événements du calendrier à partir de la grille des créneaux"""
+from datetime import date, timedelta
+
+from planning.grille import (
+    NB_CRENEAUX,
+    PREFIXE_ENTRAINEMENT,
+    PREFIXES_BLOQUES,
+    TERRAINS,
+    _as_date,
+    heure_creneau,
+)
+
+VUE_MOIS = "dayGridMonth"
+VUE_SEMAINE = "timeGridWeek"
+
+COULEUR_ENTRAINEMENT = "#E9D5FF"  # Lavande pastel
+COULEUR_TOURNOI = "#FED7AA"  # Pêche pastel
+COULEUR_TEXTE = "#1f2937"  # Texte noir
+
+# Heure ISO du début de chaque créneau (le dernier élément est la fermeture)
+_HEURES_ISO = [f"T{heure_creneau(c)}:00" for c in range(NB_CRENEAUX + 1)]
+
+
+def plage_visible(ancre, vue):
+    """Plage [début, fin[ affichée par le calendrier pour la date d'ancrage"""
+    if vue == VUE_SEMAINE:
+        debut = ancre - timedelta(days=ancre.weekday())
+        return debut, debut + timedelta(days=7)
+    # Vue mois : 6 semaines à partir du lundi précédant le 1er du mois
+    premier = ancre.replace(day=1)
+    debut = premier - timedelta(days=premier.weekday())
+    return debut, debut + timedelta(days=42)
+
+
+def decaler_ancre(ancre, vue, pas):
+    """Date d'ancrage de la période précédente (pas=-1) ou suivante (pas=1)"""
+    if vue == VUE_SEMAINE:
+        return ancre + timedelta(days=7 * pas)
+    # Décalage en mois calendaires (et non par pas de 30 jours)
+    mois = ancre.year * 12 + ancre.month - 1 + pas
+    return date(mois // 12, mois % 12 + 1, 1)
+
+
+def _titre_bloc(libelle, terrains):
+    """Titre d'un entraînement ou d'un tournoi, préfixé des terrains s'il ne les occupe pas tous"""
+    parts = libelle.split("|")
+    if libelle.startswith(PREFIXE_ENTRAINEMENT):
+        emoji, nom = "🏐", "Entrainement"
+        detail = f"{parts[2]} - {parts[3]}" if len(parts) == 4 else ""
+    else:
+        emoji, nom = "🏆", "Tournoi"
+        detail = f"{parts[1]} - {parts[2]}" if len(parts) == 3 else ""
+    if len(terrains) == len(TERRAINS):
+        return f"{emoji} {nom} {detail}".rstrip()
+    if not detail:
+        pluriel = "s" if len(terrains) > 1 else ""
+        return f"{emoji} Terrain{pluriel} " + "+".join(str(t + 1) for t in terrains)
+    return f"{emoji} " + "+".join(f"T{t + 1}" for t in terrains) + f": {detail}"
+
+
+def _couleur_remplissage(pourcentage):
+    if pourcentage >= 100:
+        return "#D1D5DB"  # Gris clair - plein
+    if pourcentage <= 25:
+        return "#BBF7D0"  # Vert menthe pastel
+    if pourcentage < 50:
+        return "#FEF3C7"  # Jaune pastel
+    if pourcentage < 75:
+        return "#FDBA74"  # Orange pastel
+    return "#FECACA"  # Rose pastel
+
+
+def evenements_jour(grille, jour):
+    """Génère les événements d'une journée en un seul parcours des créneaux
+
+    Les créneaux consécutifs portant le même entraînement (ou tournoi) sur
+    les mêmes terrains forment un seul événement ; les créneaux ouverts par
+    des responsables donnent un événement chacun, coloré selon le remplissage
+    (lu dans le résumé tenu à jour par la grille).
+    """
+    events = []
+    # Libellés de la journée, indexés par [créneau][terrain]
+    libelles = grille.libelles_jour(jour)
+    occupees, totales = grille.places_jour(jour)
+    date_iso = _as_date(jour).isoformat()
+
+    # Blocs en cours : (libellé, terrains) -> créneau de début
+    en_cours = {}
+    for creneau in range(NB_CRENEAUX + 1):
+        blocs = {}
+        for t, libelle in enumerate(libelles[creneau] if creneau < NB_CRENEAUX else ()):
+            if libelle.startswith(PREFIXES_BLOQUES):
+                blocs.setdefault(libelle, []).append(t)
+        blocs = [(libelle, tuple(terrains)) for libelle, terrains in blocs.items()]
+
+        # Clore les blocs qui ne continuent pas sur ce créneau
+        for bloc in [b for b in en_cours if b not in blocs]:
+            libelle, terrains = bloc
+            events.append({
+                "title": _titre_bloc(libelle, terrains),
+                "start": date_iso + _HEURES_ISO[en_cours.pop(bloc)],
+                "end": date_iso + _HEURES_ISO[creneau],
+                "color": COULEUR_ENTRAINEMENT if libelle.startswith(PREFIXE_ENTRAINEMENT) else COULEUR_TOURNOI,
+                "textColor": COULEUR_TEXTE
+            })
+        for bloc in blocs:
+            en_cours.setdefault(bloc, creneau)
+
+        # Créneau ouvert (un responsable, ni entraînement ni tournoi)
+        if creneau == NB_CRENEAUX or not totales[creneau]:
+            continue
+
+        pourcentage_creneau = occupees[creneau] / totales[creneau] * 100
+        events.append({
+            "title": f"({occupees[creneau]}/{totales[creneau]})",
+            "start": date_iso + _HEURES_ISO[creneau],
+            "end": date_iso + _HEURES_ISO[creneau + 1],
+            "color": _couleur_remplissage(pourcentage_creneau),
+            "textColor": COULEUR_TEXTE,
+            # Un clic sur le créneau ouvre son inscription rapide
+            "extendedProps": {"creneau": creneau}
+        })
+
+    return events
@@ -0,0 +1,559 @@
+"""Grille dense des créneaux du club (jour × créneau × terrain)"""
+from datetime import date, datetime
+
+import numpy as np
+
+from planning.config import charger_config, minutes
+
+# Paramètres des créneaux, lus depuis la configuration du club (voir planning.config)
+_CONFIG = charger_config()
+TERRAINS = tuple(f"terrain{n}" for n in range(1, int(_CONFIG["terrains"]) + 1))
+MINUTES_OUVERTURE = minutes(_CONFIG["ouverture"])
+DUREE_CRENEAU = int(_CONFIG["duree_creneau"])
+NB_CRENEAUX = (minutes(_CONFIG["fermeture"]) - MINUTES_OUVERTURE) // DUREE_CRENEAU
+CAPACITE_TERRAIN = int(_CONFIG["capacite_terrain"])
+
+# Marge ajoutée quand la grille doit s'agrandir (évite de réallouer à chaque jour)
+MARGE_JOURS = 62
+
+PREFIXE_ENTRAINEMENT = "ENTRAINEMENT|"
+PREFIXE_TOURNOI = "TOURNOI|"
+
+# Libellés qui bloquent un terrain (pas de responsable ni d'inscription)
+PREFIXES_BLOQUES = (PREFIXE_ENTRAINEMENT, PREFIXE_TOURNOI)
+
+
+def _as_date(jour):
+    """Convertit un datetime/date en date"""
+    if isinstance(jour, datetime):
+        return jour.date()
+    return jour
+
+
+def heure_creneau(creneau):
+    """Heure "HH:MM" du début du créneau (creneau=NB_CRENEAUX donne la fermeture)"""
+    debut = MINUTES_OUVERTURE + creneau * DUREE_CRENEAU
+    return f"{debut // 60:02d}:{debut % 60:02d}"
+
+
+def libelle_heure(creneau):
+    """Heure du début du créneau pour l'affichage, (ex. 18h ou 18h30)"""
+    debut = MINUTES_OUVERTURE + creneau * DUREE_CRENEAU
+    return f"{debut // 60}h{debut % 60:02d}" if debut % 60 else f"{debut // 60}h"
+
+
+def creneaux_horaires(heure_debut, heure_fin):
+    """Indices des créneaux qui chevauchent la plage horaire (heures "HH:MM")"""
+    debut = minutes(heure_debut) - MINUTES_OUVERTURE
+    fin = minutes(heure_fin) - MINUTES_OUVERTURE
+    premier = max(debut // DUREE_CRENEAU, 0)
+    dernier = min(-(-fin // DUREE_CRENEAU), NB_CRENEAUX)
+    return list(range(premier, dernier))
+
+
+def parse_cle(cle):
+    """Décompose une clé 'Y-M-D-creneau-champ' en (date, creneau, champ)"""
+    try:
+        annee, mois, jour, creneau, champ = cle.split("-", 4)
+        return date(int(annee), int(mois), int(jour)), int(creneau), champ
+    except ValueError:
+        return None
+
+
+def format_cle(jour, creneau, champ):
+    """Construit la clé historique 'Y-M-D-creneau-champ'"""
+    return f"{jour.year}-{jour.month}-{jour.day}-{creneau}-{champ}"
+
+
+def ordinaux_jour_semaine(debut, fin, jour_semaine):
+    """Ordinaux des dates d'un jour de semaine (0=lundi) entre debut et fin inclus"""
+    o0 = _as_date(debut).toordinal()
+    o1 = _as_date(fin).toordinal()
+    # L'ordinal 1 (1er janvier de l'an 1) est un lundi
+    premier = o0 + (jour_semaine + 1 - o0) % 7
+    return np.arange(premier, o1 + 1, 7)
+
+
+class TableLibelles:
+    """Table des libellés internés (l'identifiant 0 est le libellé vide)"""
+
+    def __init__(self):
+        self.libelles = [""]
+        self.ids = {"": 0}
+        # bloques[i] : le libellé i est un entraînement ou un tournoi
+        self.bloques = [False]
+
+    def intern(self, libelle):
+        """Retourne l'identifiant du libellé, en l'ajoutant si besoin"""
+        libelle = libelle or ""
+        ident = self.ids.get(libelle)
+        if ident is None:
+            ident = len(self.libelles)
+            self.libelles.append(libelle)
+            self.ids[libelle] = ident
+            self.bloques.append(libelle.startswith(PREFIXES_BLOQUES))
+        return ident
+
+    def get_id(self, libelle):
+        """Retourne l'identifiant du libellé ou None s'il n'existe pas"""
+        return self.ids.get(libelle or "")
+
+    def __getitem__(self, ident):
+        return self.libelles[ident]
+
+    def __len__(self):
+        return len(self.libelles)
+
+    def copie(self):
+        """Copie indépendante (les libellés ajoutés à l'une n'apparaissent pas dans l'autre)"""
+        table = TableLibelles()
+        table.libelles = list(self.libelles)
+        table.ids = dict(self.ids)
+        table.bloques = list(self.bloques)
+        return table
+
+
+class Grille:
+    """Stockage des créneaux sous forme de tableaux NumPy
+
+    - ``terrains`` : (jours, créneaux, terrains) -> identifiant de libellé
+    - ``capacites`` : (jours, créneaux) -> capacité choisie, -1 si non définie
+    - ``joueurs`` : {(indice jour, créneau): [noms]}
+
+    Un résumé du remplissage de chaque créneau est tenu à jour à chaque
+    écriture (voir ``_resumer``) :
+
+    - ``nb_joueurs`` : (jours, créneaux) -> nombre de joueurs inscrits
+    - ``places_totales`` : (jours, créneaux) -> places du créneau, 0 s'il n'est
+      pas ouvert (aucun responsable, ou un entraînement/tournoi)
+    - ``places_occupees`` : (jours, créneaux) -> responsables distincts + joueurs
+    """
+
+    def __init__(self):
+        self.origine = None
+        self.terrains = np.zeros((0, NB_CRENEAUX, len(TERRAINS)), dtype=np.int32)
+        self.capacites = np.full((0, NB_CRENEAUX), -1, dtype=np.int16)
+        self.joueurs = {}
+        self.nb_joueurs = np.zeros((0, NB_CRENEAUX), dtype=np.int16)
+        self.places_totales = np.zeros((0, NB_CRENEAUX), dtype=np.int16)
+        self.places_occupees = np.zeros((0, NB_CRENEAUX), dtype=np.int16)
+        self.libelles = TableLibelles()
+        # Clés inconnues conservées telles quelles pour ne rien perdre à la sauvegarde
+        self.autres = {}
+        # Cellules modifiées depuis le chargement : {(date, creneau, champ)}
+        self.modifies = set()
+        # Valeur de chaque cellule modifiée au moment du chargement (pour les écritures concurrentes)
+        self.origines = {}
+        # Cellules lues dont la valeur conditionne l'enregistrement : {(date, creneau, champ): valeur}
+        self.exigees = {}
+        # Version du stockage au moment du chargement
+        self.version = None
+        # Position de lecture du stockage au chargement (voir ``modifications_depuis``)
+        self.position = None
+
+    # ---------------------------
+    # Indexation des jours
+    # ---------------------------
+    @property
+    def nb_jours(self):
+        return self.terrains.shape[0]
+
+    def index_jour(self, jour):
+        """Indice du jour dans la grille, ou None s'il est hors de la grille"""
+        if self.origine is None:
+            return None
+        idx = _as_date(jour).toordinal() - self.origine
+        if 0 <= idx < self.nb_jours:
+            return idx
+        return None
+
+    def date_index(self, idx):
+        """Date correspondant à un indice de la grille"""
+        return date.fromordinal(self.origine + idx)
+
+    def indices_plage(self, debut, fin):
+        """Indices (début, fin exclue) de la plage de dates, bornés à la grille"""
+        if self.origine is None:
+            return 0, 0
+        i0 = _as_date(debut).toordinal() - self.origine
+        i1 = _as_date(fin).toordinal() - self.origine
+        return max(i0, 0), min(max(i1, 0), self.nb_jours)
+
+    def _reserver(self, debut, fin):
+        """Agrandit la grille pour couvrir [debut, fin] et retourne les indices"""
+        o0 = _as_date(debut).toordinal()
+        o1 = _as_date(fin).toordinal()
+        if self.origine is None:
+            self.origine = o0
+        avant = max(0, self.origine - o0)
+        apres = max(0, o1 - (self.origine + self.nb_jours - 1))
+        if avant:
+            avant += MARGE_JOURS
+        if apres:
+            apres += MARGE_JOURS
+        if avant or apres:
+            self.terrains = np.pad(self.terrains, ((avant, apres), (0, 0), (0, 0)))
+            self.capacites = np.pad(self.capacites, ((avant, apres), (0, 0)), constant_values=-1)
+            self.nb_joueurs = np.pad(self.nb_joueurs, ((avant, apres), (0, 0)))
+            self.places_totales = np.pad(self.places_totales, ((avant, apres), (0, 0)))
+            self.places_occupees = np.pad(self.places_occupees, ((avant, apres), (0, 0)))
+            if avant:
+                self.joueurs = {(j + avant, c): v for (j, c), v in self.joueurs.items()}
+                self.origine -= avant
+        return o0 - self.origine, o1 - self.origine
+
+    def _index_ecriture(self, jour):
+        return self._reserver(jour, jour)[0]
+
+    def copie(self):
+        """Copie indépendante des cellules (sans les modifications en cours), pour la modifier à part
+
+        Les listes de joueurs sont partagées : elles sont remplacées, jamais modifiées en place.
+        """
+        copie = Grille()
+        copie.origine = self.origine
+        copie.terrains = self.terrains.copy()
+        copie.capacites = self.capacites.copy()
+        copie.joueurs = dict(self.joueurs)
+        copie.nb_joueurs = self.nb_joueurs.copy()
+        copie.places_totales = self.places_totales.copy()
+        copie.places_occupees = self.places_occupees.copy()
+        copie.libelles = self.libelles.copie()
+        copie.autres = dict(self.autres)
+        copie.version = self.version
+        copie.position = self.position
+        return copie
+
+    # ---------------------------
+    # Accès unitaires
+    # ---------------------------
+    def get(self, jour, creneau, terrain):
+        """Libellé affecté au terrain (indice 0..n) sur le créneau"""
+        idx = self.index_jour(jour)
+        if idx is None:
+            return ""
+        return self.libelles[self.terrains[idx, creneau, terrain]]
+
+    def set(self, jour, creneau, terrain, valeur):
+        if self.get(jour, creneau, terrain) == (valeur or ""):
+            return
+        self._marquer(jour, creneau, TERRAINS[terrain])
+        idx = self._index_ecriture(jour)
+        self.terrains[idx, creneau, terrain] = self.libelles.intern(valeur)
+        self._resumer(idx, idx + 1)
+
+    def get_capacite(self, jour, creneau, defaut):
+        idx = self.index_jour(jour)
+        if idx is None:
+            return defaut
+        capacite = int(self.capacites[idx, creneau])
+        return defaut if capacite < 0 else capacite
+
+    def set_capacite(self, jour, creneau, capacite):
+        if self.get_capacite(jour, creneau, -1) == capacite:
+            return
+        self._marquer(jour, creneau, "max_places")
+        idx = self._index_ecriture(jour)
+        self.capacites[idx, creneau] = capacite
+        self._resumer(idx, idx + 1)
+
+    def get_joueurs(self, jour, creneau):
+        idx = self.index_jour(jour)
+        if idx is None:
+            return []
+        return self.joueurs.get((idx, creneau), [])
+
+    def set_joueurs(self, jour, creneau, joueurs):
+        if list(self.get_joueurs(jour, creneau)) == list(joueurs):
+            return
+        self._marquer(jour, creneau, "joueurs")
+        idx = self._index_ecriture(jour)
+        if joueurs:
+            self.joueurs[(idx, creneau)] = list(joueurs)
+        else:
+            self.joueurs.pop((idx, creneau), None)
+        self.nb_joueurs[idx, creneau] = len(joueurs)
+        self._resumer(idx, idx + 1)
+
+    def places(self, jour, creneau):
+        """(places occupées, places totales) du créneau ; (0, 0) s'il n'est pas ouvert"""
+        idx = self.index_jour(jour)
+        if idx is None:
+            return 0, 0
+        return int(self.places_occupees[idx, creneau]), int(self.places_totales[idx, creneau])
+
+    def places_jour(self, jour):
+        """Listes (places occupées, places totales) de chaque créneau de la journée"""
+        idx = self.index_jour(jour)
+        if idx is None:
+            return [0] * NB_CRENEAUX, [0] * NB_CRENEAUX
+        return self.places_occupees[idx].tolist(), self.places_totales[idx].tolist()
+
+    def places_libres(self, debut, fin):
+        """Créneaux ouverts non complets de [debut, fin[ : liste de (date, créneau, places libres)"""
+        i0, i1 = self.indices_plage(debut, fin)
+        libres = self.places_totales[i0:i1] - self.places_occupees[i0:i1]
+        return [
+            (self.date_index(i0 + int(j)), int(c), int(libres[j, c]))
+            for j, c in zip(*np.nonzero(libres > 0))
+        ]
+
+    def _resumer(self, i0, i1):
+        """Recalcule le résumé de remplissage des jours [i0, i1[ (créneaux ouverts, places)"""
+        if i0 >= i1:
+            return
+        bloc = self.terrains[i0:i1]
+        bloques = np.asarray(self.libelles.bloques)[bloc].any(axis=2)
+        # Terrains ouverts et responsables distincts (un même responsable compte une fois)
+        ouverts = np.count_nonzero(bloc, axis=2)
+        tries = np.sort(bloc, axis=2)
+        distincts = np.count_nonzero(
+            (tries != 0) & np.concatenate([np.ones_like(tries[:, :, :1], dtype=bool), tries[:, :, 1:] != tries[:, :, :-1]], axis=2),
+            axis=2,
+        )
+        capacite_max = ouverts * CAPACITE_TERRAIN
+        capacites = self.capacites[i0:i1]
+        totales = np.maximum(distincts, np.minimum(np.where(capacites < 0, capacite_max, capacites), capacite_max))
+        ouvert = (ouverts > 0) & ~bloques
+        self.places_totales[i0:i1] = np.where(ouvert, totales, 0)
+        self.places_occupees[i0:i1] = np.where(ouvert, distincts + self.nb_joueurs[i0:i1], 0)
+
+    def _marquer(self, jour, creneau, champ):
+        """Note la cellule comme modifiée en conservant sa valeur d'origine"""
+        cellule = (_as_date(jour), creneau, champ)
+        if cellule not in self.modifies:
+            self.origines[cellule] = self.valeur(*cellule)
+            self.modifies.add(cellule)
+
+    def exiger_inchangee(self, jour, creneau, champ):
+        """Conditionne le prochain enregistrement à la valeur actuelle d'une cellule lue
+
+        La cellule n'est pas écrite : enregistrée en tout-ou-rien, la grille est
+        rejetée si une autre session l'a changée entre-temps (voir ``fusionner``).
+        """
+        cellule = (_as_date(jour), creneau, champ)
+        self.exigees.setdefault(cellule, self.valeur(*cellule))
+
+    def exigences(self):
+        """Quadruplets (date, creneau, champ, valeur attendue) des cellules exigées non modifiées"""
+        return [
+            (*cellule, valeur)
+            for cellule, valeur in sorted(self.exigees.items())
+            if cellule not in self.modifies
+        ]
+
+    def marquer_enregistre(self):
+        """Oublie les modifications une fois enregistrées"""
+        self.modifies.clear()
+        self.origines.clear()
+        self.exigees.clear()
+
+    def libelles_jour(self, jour):
+        """Tableau (créneaux, terrains) des libellés d'une journée"""
+        idx = self.index_jour(jour)
+        if idx is None:
+            return [["" for _ in TERRAINS] for _ in range(NB_CRENEAUX)]
+        return [[self.libelles[i] for i in ligne] for ligne in self.terrains[idx].tolist()]
+
+    # ---------------------------
+    # Opérations vectorisées
+    # ---------------------------
+    def empreintes_plage(self, debut, fin):
+        """Empreinte du contenu de chaque jour occupé de la plage [debut, fin[
+
+        L'empreinte ne dépend que des libellés, capacités et nombres de joueurs :
+        elle change dès qu'une écriture touche le jour, et seulement dans ce cas.
+        """
+        i0, i1 = self.indices_plage(debut, fin)
+        if i0 >= i1:
+            return {}
+        hash_libelles = np.array([hash(libelle) for libelle in self.libelles.libelles], dtype=np.int64)
+        bloc = self.terrains[i0:i1]
+        indices = np.nonzero(bloc.any(axis=(1, 2)))[0]
+        contenus = hash_libelles[bloc[indices]]
+        capacites = self.capacites[i0:i1][indices]
+        nb_joueurs = self.nb_joueurs[i0:i1][indices]
+        empreintes = {}
+        for k, j in enumerate(indices.tolist()):
+            empreintes[self.date_index(i0 + j)] = contenus[k].tobytes() + capacites[k].tobytes() + nb_joueurs[k].tobytes()
+        return empreintes
+
+    def occupes(self, ordinaux, creneaux, terrains):
+        """Liste des (date, creneau, terrain) déjà occupés parmi la sélection"""
+        if self.origine is None or len(ordinaux) == 0:
+            return []
+        idx = np.asarray(ordinaux) - self.origine
+        dans_grille = (idx >= 0) & (idx < self.nb_jours)
+        idx = idx[dans_grille]
+        bloc = self.terrains[np.ix_(idx, creneaux, terrains)]
+        return [
+            (self.date_index(int(idx[j])), creneaux[c], terrains[t])
+            for j, c, t in zip(*np.nonzero(bloc))
+        ]
+
+    def remplir(self, ordinaux, creneaux, terrains, valeur):
+        """Affecte le même libellé à tous les créneaux de la sélection"""
+        if len(ordinaux) == 0:
+            return
+        ordinaux = np.asarray(ordinaux)
+        self._reserver(date.fromordinal(int(ordinaux.min())), date.fromordinal(int(ordinaux.max())))
+        for o in ordinaux.tolist():
+            for c in creneaux:
+                for t in terrains:
+                    self._marquer(date.fromordinal(o), c, TERRAINS[t])
+        idx = ordinaux - self.origine
+        self.terrains[np.ix_(idx, creneaux, terrains)] = self.libelles.intern(valeur)
+        self._resumer(int(idx.min()), int(idx.max()) + 1)
+
+    def liberer(self, ordinaux, creneaux, terrains, valeur):
+        """Vide les créneaux de la sélection qui portent encore le libellé ; retourne leur nombre"""
+        ident = self.libelles.get_id(valeur)
+        if self.origine is None or not ident or len(ordinaux) == 0:
+            return 0
+        idx = np.asarray(ordinaux) - self.origine
+        idx = idx[(idx >= 0) & (idx < self.nb_jours)]
+        cellules = [
+            (self.date_index(int(idx[j])), creneaux[c], terrains[t])
+            for j, c, t in zip(*np.nonzero(self.terrains[np.ix_(idx, creneaux, terrains)] == ident))
+        ]
+        for jour, creneau, terrain in cellules:
+            self.set(jour, creneau, terrain, "")
+        return len(cellules)
+
+    def superposer(self, ordinaux, creneaux, terrains, valeur):
+        """Affecte le libellé aux cellules vides de la sélection, sans les marquer modifiées
+
+        Sert aux entraînements récurrents : calculés au chargement, jamais enregistrés.
+        """
+        if len(ordinaux) == 0 or not creneaux or not terrains:
+            return
+        ordinaux = np.asarray(ordinaux)
+        self._reserver(date.fromordinal(int(ordinaux.min())), date.fromordinal(int(ordinaux.max())))
+        selection = np.ix_(ordinaux - self.origine, creneaux, terrains)
+        bloc = self.terrains[selection]
+        self.terrains[selection] = np.where(bloc == 0, self.libelles.intern(valeur), bloc)
+        self._resumer(int(ordinaux.min()) - self.origine, int(ordinaux.max()) - self.origine + 1)
+
+    def valeur(self, jour, creneau, champ):
+        """Valeur d'une cellule au format historique (None si vide)"""
+        if champ in TERRAINS:
+            return self.get(jour, creneau, TERRAINS.index(champ)) or None
+        if champ == "max_places":
+            capacite = self.get_capacite(jour, creneau, -1)
+            return None if capacite < 0 else capacite
+        if champ == "joueurs":
+            return list(self.get_joueurs(jour, creneau)) or None
+        return None
+
+    def cellules_modifiees(self):
+        """Quadruplets (date, creneau, champ, valeur ou None) des cellules modifiées"""
+        return [
+            (jour, creneau, champ, self.valeur(jour, creneau, champ))
+            for jour, creneau, champ in sorted(self.modifies)
+        ]
+
+    # ---------------------------
+    # Conversion depuis/vers le format JSON historique
+    # ---------------------------
+    @classmethod
+    def from_cellules(cls, cellules):
+        """Construit la grille depuis des quadruplets (date, creneau, champ, valeur)"""
+        grille = cls()
+        grille.appliquer(cellules)
+        return grille
+
+    def appliquer(self, cellules):
+        """Écrit des quadruplets (date, creneau, champ, valeur ou None) déjà enregistrés
+
+        Contrairement à ``set``, les cellules ne sont pas marquées modifiées.
+        """
+        cellules = list(cellules)
+        if not cellules:
+            return
+        i0, i1 = self._reserver(min(c[0] for c in cellules), max(c[0] for c in cellules))
+        for jour, creneau, champ, valeur in cellules:
+            self._ecrire_cellule(jour, creneau, champ, valeur)
+        self._resumer(i0, i1 + 1)
+
+    def copier_jour(self, source, jour):
+        """Remplace une journée par son contenu dans une autre grille, sans la marquer modifiée"""
+        idx = self._index_ecriture(jour)
+        for creneau, ligne in enumerate(source.libelles_jour(jour)):
+            self.terrains[idx, creneau] = [self.libelles.intern(libelle) for libelle in ligne]
+            self.capacites[idx, creneau] = source.get_capacite(jour, creneau, -1)
+            joueurs = source.get_joueurs(jour, creneau)
+            if joueurs:
+                self.joueurs[(idx, creneau)] = list(joueurs)
+            else:
+                self.joueurs.pop((idx, creneau), None)
+            self.nb_joueurs[idx, creneau] = len(joueurs)
+        self._resumer(idx, idx + 1)
+
+    def _ecrire_cellule(self, jour, creneau, champ, valeur):
+        """Écriture directe dans les tableaux (chargement : pas une modification, pas de résumé)
+
+        Le jour doit être dans la grille ; une valeur vide ("", [] ou None) vide la cellule.
+        """
+        idx = jour.toordinal() - self.origine
+        if not 0 <= creneau < NB_CRENEAUX or (champ not in TERRAINS and champ not in ("max_places", "joueurs")):
+            if valeur is None:
+                self.autres.pop(format_cle(jour, creneau, champ), None)
+            else:
+                self.autres[format_cle(jour, creneau, champ)] = valeur
+        elif champ in TERRAINS:
+            self.terrains[idx, creneau, TERRAINS.index(champ)] = self.libelles.intern(valeur)
+        elif champ == "max_places":
+            self.capacites[idx, creneau] = -1 if valeur in ("", None) else int(valeur)
+        elif valeur:
+            self.joueurs[(idx, creneau)] = list(valeur)
+            self.nb_joueurs[idx, creneau] = len(valeur)
+        else:
+            self.joueurs.pop((idx, creneau), None)
+            self.nb_joueurs[idx, creneau] = 0
+
+    @classmethod
+    def from_dict(cls, responsables, debut=None, fin=None):
+        """Construit la grille depuis le dictionnaire {clé: valeur} du JSON
+
+        Si ``debut``/``fin`` sont fournis, seuls les jours de [debut, fin[ sont chargés.
+        """
+        cellules = []
+        autres = {}
+        debut = _as_date(debut) if debut is not None else None
+        fin = _as_date(fin) if fin is not None else None
+        for cle, valeur in responsables.items():
+            parsed = parse_cle(cle)
+            if parsed is None:
+                autres[cle] = valeur
+                continue
+            jour, creneau, champ = parsed
+            if (debut is not None and jour < debut) or (fin is not None and jour >= fin):
+                continue
+            cellules.append((jour, creneau, champ, valeur))
+        grille = cls.from_cellules(cellules)
+        grille.autres.update(autres)
+        return grille
+
+    def to_dict(self):
+        """Reconstruit le dictionnaire {clé: valeur} au format JSON historique"""
+        responsables = {}
+        if self.origine is not None:
+            jours_utilises = np.nonzero(
+                self.terrains.any(axis=(1, 2)) | (self.capacites >= 0).any(axis=1)
+            )[0].tolist()
+            jours_utilises = sorted(set(jours_utilises) | {j for j, _ in self.joueurs})
+            for idx in jours_utilises:
+                jour = self.date_index(idx)
+                terrains = self.terrains[idx].tolist()
+                capacites = self.capacites[idx].tolist()
+                for creneau in range(NB_CRENEAUX):
+                    for t, champ in enumerate(TERRAINS):
+                        if terrains[creneau][t]:
+                            responsables[format_cle(jour, creneau, champ)] = self.libelles[terrains[creneau][t]]
+                    if capacites[creneau] >= 0:
+                        responsables[format_cle(jour, creneau, "max_places")] = capacites[creneau]
+                    joueurs = self.joueurs.get((idx, creneau))
+                    if joueurs:
+                        responsables[format_cle(jour, creneau, "joueurs")] = joueurs
+        responsables.update(self.autres)
+        return responsables
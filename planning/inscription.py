@@ -0,0 +1,57 @@
+"""Inscription rapide d'un membre à un seul créneau
+
+Seul le jour du créneau est chargé : le temps de réponse ne dépend pas du
+remplissage du reste de la journée ou du planning. La place libre est vérifiée
+puis l'inscription enregistrée en tout-ou-rien, avec la capacité et les
+responsables lus : si une autre session a changé le créneau entre-temps
+(inscription à la dernière place, capacité réduite, terrain fermé), il est
+relu et la vérification recommencée.
+"""
+from datetime import timedelta
+
+from planning.grille import TERRAINS
+
+INSCRIT = "inscrit"
+DEJA_INSCRIT = "déjà inscrit"
+COMPLET = "complet"
+FERME = "fermé"
+# Le créneau a changé à chaque tentative (affluence) : l'inscription n'est pas faite
+ENCOMBRE = "encombré"
+
+# Relectures du créneau avant d'abandonner
+TENTATIVES = 5
+
+
+def etat_creneau(grille, jour, creneau):
+    """(responsables, joueurs inscrits, places occupées, places totales) du créneau"""
+    responsables = [r for r in (grille.get(jour, creneau, t) for t in range(len(TERRAINS))) if r]
+    occupees, totales = grille.places(jour, creneau)
+    return responsables, list(grille.get_joueurs(jour, creneau)), occupees, totales
+
+
+def ajouter_joueur(grille, jour, creneau, nom):
+    """Ajoute le joueur au créneau de la grille s'il est ouvert et a une place libre ; retourne le statut"""
+    responsables, joueurs, occupees, totales = etat_creneau(grille, jour, creneau)
+    # Places totales nulles : aucun responsable, entraînement ou tournoi
+    if not totales:
+        return FERME
+    if nom in joueurs or nom.lower() in (r.strip().lower() for r in responsables):
+        return DEJA_INSCRIT
+    if occupees >= totales:
+        return COMPLET
+    grille.set_joueurs(jour, creneau, joueurs + [nom])
+    # La place a été comptée avec cette capacité et ces responsables
+    grille.exiger_inchangee(jour, creneau, "max_places")
+    for champ in TERRAINS:
+        grille.exiger_inchangee(jour, creneau, champ)
+    return INSCRIT
+
+
+def inscrire(stockage, jour, creneau, nom, tentatives=TENTATIVES):
+    """Inscrit ``nom`` au créneau ; retourne le statut (``INSCRIT`` si l'inscription est enregistrée)"""
+    for _ in range(tentatives):
+        grille = stockage.charger_grille(jour, jour + timedelta(days=1))
+        statut = ajouter_joueur(grille, jour, creneau, nom)
+        if statut != INSCRIT or not stockage.enregistrer_grille(grille, tout_ou_rien=True):
+            return statut
+    return ENCOMBRE
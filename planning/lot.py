@@ -0,0 +1,56 @@
+"""Application groupée d'entraînements et de tournois
+
+La grille est chargée une seule fois pour tout le lot ; chaque demande est
+vérifiée contre la grille et contre les demandes déjà acceptées du lot,
+puis le tout est enregistré en une seule écriture.
+"""
+from datetime import date
+
+import numpy as np
+
+from planning.occupation import regrouper_conflits
+
+APPLIQUE = "appliqué"
+DEJA_APPLIQUE = "déjà appliqué"
+CONFLIT = "conflit"
+INVALIDE = "invalide"
+
+
+def appliquer_lot(grille, demandes):
+    """Applique une liste de demandes (ordinaux, creneaux, terrains, libellé) sur la grille
+
+    Une demande déjà présente à l'identique est ignorée ; une demande qui
+    chevauche un créneau pris (par la grille ou une demande précédente du
+    lot) n'est pas appliquée. Retourne, dans l'ordre des demandes, des
+    couples (statut, conflits regroupés en plages).
+    """
+    rapport = []
+    for ordinaux, creneaux, terrains, libelle in demandes:
+        ordinaux = np.asarray(ordinaux, dtype=np.int64)
+        total = len(ordinaux) * len(creneaux) * len(terrains)
+        if total == 0:
+            rapport.append((INVALIDE, []))
+            continue
+        identiques, conflits = 0, []
+        for jour, creneau, terrain in grille.occupes(ordinaux, creneaux, terrains):
+            if grille.get(jour, creneau, terrain) == libelle:
+                identiques += 1
+            else:
+                conflits.append((jour, creneau, terrain))
+        if conflits:
+            rapport.append((CONFLIT, regrouper_conflits(conflits, ordinaux)))
+        elif identiques == total:
+            rapport.append((DEJA_APPLIQUE, []))
+        else:
+            grille.remplir(
+                [o for o in ordinaux.tolist() if _incomplet(grille, o, creneaux, terrains, libelle)],
+                creneaux, terrains, libelle,
+            )
+            rapport.append((APPLIQUE, []))
+    return rapport
+
+
+def _incomplet(grille, ordinal, creneaux, terrains, libelle):
+    """True si un des créneaux du jour n'a pas encore le libellé"""
+    jour = date.fromordinal(ordinal)
+    return any(grille.get(jour, c, t) != libelle for c in creneaux for t in terrains)
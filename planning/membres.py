@@ -0,0 +1,36 @@
+"""Annuaire des membres du club (listes et index précalculés)"""
+
+
+class AnnuaireMembres:
+    """Membres du club, avec les listes par rôle et les index par nom
+
+    Construit une fois par version de la table des membres et partagé entre
+    les sessions : ne pas le modifier.
+    """
+
+    def __init__(self, lignes):
+        self.lignes = lignes
+        self._table = None
+        self.noms = [f"{ligne['prenom']} {ligne['nom']}" for ligne in lignes]
+        self.ensemble_noms = set(self.noms)
+        self.coachs = [nom for nom, ligne in zip(self.noms, lignes) if ligne["coach"] == "Oui"]
+        self.staffers = [nom for nom, ligne in zip(self.noms, lignes) if ligne["staffer"] == "Oui"]
+        self.licences = dict(zip(self.noms, (ligne["numero_licence"] for ligne in lignes)))
+
+    @property
+    def table(self):
+        """Table des membres (DataFrame), construite au premier affichage
+
+        pandas n'est importé que par les pages qui affichent la table.
+        """
+        if self._table is None:
+            import pandas as pd
+
+            self._table = pd.DataFrame(self.lignes)
+        return self._table
+
+    def __contains__(self, nom):
+        return nom in self.ensemble_noms
+
+    def __len__(self):
+        return len(self.noms)
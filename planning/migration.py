@@ -0,0 +1,64 @@
+"""Conversion de l'instantané des créneaux entre ses formats, archivage des mois passés
+
+    python -m planning.migration data/responsables.json --format compact
+    python -m planning.migration data/responsables.json --format historique
+    python -m planning.migration data/responsables.json --format mois
+    python -m planning.migration data/responsables.json --format mois --archiver 2026-09-01
+
+Le journal est intégré à l'instantané converti (voir ``planning.compact`` et
+``planning.store``). Avec ``--archiver``, les mois antérieurs à la date sont
+passés en lecture seule (format ``mois`` uniquement).
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+from planning.store import (
+    FORMATS,
+    RESPONSABLES_FILE,
+    archiver_mois,
+    convertir_instantane,
+    dossier_mois,
+    lire_index,
+)
+
+
+def taille_instantane(fichier):
+    """Taille (octets) de l'instantané, fichier unique ou dossier des mois"""
+    if lire_index(fichier) is not None:
+        dossier = dossier_mois(fichier)
+        return sum(os.path.getsize(os.path.join(dossier, nom)) for nom in os.listdir(dossier))
+    return os.path.getsize(fichier)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m planning.migration",
+        description="Convertit l'instantané des créneaux entre le format historique, compact et découpé par mois",
+    )
+    parser.add_argument("fichier", nargs="?", default=RESPONSABLES_FILE)
+    parser.add_argument("--format", choices=FORMATS, default="compact")
+    parser.add_argument(
+        "--archiver", type=date.fromisoformat, metavar="AAAA-MM-JJ",
+        help="passer en lecture seule les mois antérieurs à cette date (format mois)",
+    )
+    options = parser.parse_args(arguments)
+
+    if not os.path.exists(options.fichier) and lire_index(options.fichier) is None:
+        print(f"{options.fichier} introuvable", file=sys.stderr)
+        return 1
+    if options.archiver and options.format != "mois":
+        parser.error("--archiver demande --format mois")
+    avant = taille_instantane(options.fichier)
+    convertir_instantane(options.fichier, options.format)
+    apres = taille_instantane(options.fichier)
+    print(f"{options.fichier} : {avant} -> {apres} octets (format {options.format})")
+    if options.archiver:
+        archives = archiver_mois(options.archiver, options.fichier)
+        print(f"{len(archives)} mois archivé(s) en lecture seule : {', '.join(archives) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Index des créneaux occupés pour la détection de conflits
+
+Pour chaque (terrain, créneau, jour de semaine), les dates occupées sont
+gardées triées : savoir si une plage horaire chevauche quelque chose entre
+deux dates revient à quelques recherches dichotomiques, sans parcourir les
+jours un par un.
+
+L'index est construit à chaque vérification depuis la grille qui vient
+d'être chargée (un parcours de toute la grille, comme son chargement) : il
+accélère les recherches, pas la vérification de bout en bout.
+"""
+from datetime import date
+
+import numpy as np
+
+from planning.grille import NB_CRENEAUX, _as_date
+
+
+def _jour_semaine(ordinaux):
+    """Jour de semaine (0=lundi) d'ordinaux de dates (l'ordinal 1 est un lundi)"""
+    return (np.asarray(ordinaux) - 1) % 7
+
+
+class IndexOccupation:
+    """Ordinaux occupés triés par (terrain, créneau, jour de semaine)"""
+
+    def __init__(self, grille):
+        if grille.origine is None:
+            self.cles = np.array([], dtype=np.int64)
+            self.ordinaux = np.array([], dtype=np.int64)
+            return
+        jours, creneaux, terrains = np.nonzero(grille.terrains)
+        ordinaux = jours.astype(np.int64) + grille.origine
+        cles = self._cle(terrains, creneaux, _jour_semaine(ordinaux))
+        ordre = np.lexsort((ordinaux, cles))
+        self.cles = cles[ordre]
+        self.ordinaux = ordinaux[ordre]
+
+    @staticmethod
+    def _cle(terrain, creneau, jour_semaine):
+        return (np.asarray(terrain, dtype=np.int64) * NB_CRENEAUX + creneau) * 7 + jour_semaine
+
+    def occupes(self, terrain, creneau, debut, fin, jour_semaine=None):
+        """Ordinaux occupés sur le terrain et le créneau entre debut et fin inclus"""
+        o0, o1 = _as_date(debut).toordinal(), _as_date(fin).toordinal()
+        jours = range(7) if jour_semaine is None else (jour_semaine,)
+        morceaux = []
+        for j in jours:
+            cle = self._cle(terrain, creneau, j)
+            g0 = np.searchsorted(self.cles, cle, "left")
+            g1 = np.searchsorted(self.cles, cle, "right")
+            groupe = self.ordinaux[g0:g1]
+            morceaux.append(groupe[np.searchsorted(groupe, o0, "left"):np.searchsorted(groupe, o1, "right")])
+        if len(morceaux) == 1:
+            return morceaux[0]
+        return np.sort(np.concatenate(morceaux))
+
+    def conflits(self, ordinaux, creneaux, terrains):
+        """Conflits de la sélection regroupés en plages (voir ``regrouper_conflits``)"""
+        ordinaux = np.asarray(ordinaux, dtype=np.int64)
+        if len(ordinaux) == 0:
+            return []
+        debut, fin = date.fromordinal(int(ordinaux.min())), date.fromordinal(int(ordinaux.max()))
+        jours_semaine = np.unique(_jour_semaine(ordinaux))
+        jour_semaine = int(jours_semaine[0]) if len(jours_semaine) == 1 else None
+        occupes = []
+        for t in terrains:
+            for c in creneaux:
+                pris = self.occupes(t, c, debut, fin, jour_semaine)
+                occupes.extend((o, c, t) for o in pris[np.isin(pris, ordinaux)].tolist())
+        return regrouper_conflits(occupes, ordinaux)
+
+
+def regrouper_conflits(occupes, ordinaux=None):
+    """Regroupe des créneaux occupés (date ou ordinal, creneau, terrain) en plages
+
+    Les dates qui se suivent dans ``ordinaux`` (par défaut, les dates en
+    conflit triées) et qui ont les mêmes créneaux occupés sur le même terrain
+    forment une plage. Retourne des quintuplets
+    (terrain, créneaux, première date, dernière date, nombre de dates).
+    """
+    par_terrain = {}
+    for jour, creneau, terrain in occupes:
+        o = jour if isinstance(jour, (int, np.integer)) else _as_date(jour).toordinal()
+        par_terrain.setdefault(terrain, {}).setdefault(int(o), set()).add(creneau)
+    sequence = sorted({int(o) for o in ordinaux}) if ordinaux is not None else None
+    plages = []
+    for terrain in sorted(par_terrain):
+        jours = par_terrain[terrain]
+        rangs = {o: i for i, o in enumerate(sequence if sequence is not None else sorted(jours))}
+        plage = None
+        for o in sorted(jours):
+            creneaux = tuple(sorted(jours[o]))
+            if plage is not None and plage[1] == creneaux and rangs[o] == rangs[plage[3]] + 1:
+                plage[3] = o
+                plage[4] += 1
+            else:
+                if plage is not None:
+                    plages.append(plage)
+                plage = [terrain, creneaux, o, o, 1]
+        plages.append(plage)
+    return [
+        (terrain, creneaux, date.fromordinal(premier), date.fromordinal(dernier), nb)
+        for terrain, creneaux, premier, dernier, nb in plages
+    ]
@@ -0,0 +1,226 @@
+"""Grille des créneaux partagée par toutes les sessions d'un processus serveur
+
+Une seule grille complète est gardée en mémoire par processus (voir
+``get_grille_partagee``) : les sessions la lisent directement au lieu de
+charger et décoder chacune sa copie. Pour modifier des créneaux, une session
+passe par une ``VueGrille`` : les jours modifiés sont recopiés dans une petite
+grille privée (copie sur écriture), seule enregistrée, puis reportés dans la
+grille partagée.
+
+La grille partagée ne couvre que les dates à partir de ``FENETRE_MOIS`` mois
+avant le chargement : une plage plus ancienne (saisons passées) est chargée
+à la demande dans une grille à part, non conservée. La mémoire reste ainsi
+proportionnelle à la période utile, pas à tout l'historique.
+
+Chaque lecture compare le numéro de version du stockage à celui de la grille.
+S'il a changé (écriture d'un autre processus), seules les cellules écrites
+depuis sont relues ; si les entraînements récurrents ont changé, seules les
+dates des entraînements ajoutés, modifiés ou supprimés sont rechargées.
+
+Une grille partagée rendue aux sessions n'est plus jamais modifiée : les
+mises à jour sont faites sur une copie, qui la remplace sous le verrou. Une
+session lit donc sans verrou un état cohérent, éventuellement un peu ancien.
+"""
+import threading
+from datetime import date, timedelta
+
+from planning.entites import plage_entites
+from planning.grille import Grille, _as_date
+from planning.regles import appliquer_regles
+from planning.stockage import get_stockage
+
+# Mois passés gardés dans la grille partagée
+FENETRE_MOIS = 6
+
+
+def debut_fenetre(aujourdhui=None, mois=FENETRE_MOIS):
+    """Premier jour du mois situé ``mois`` mois avant aujourd'hui"""
+    aujourdhui = aujourdhui or date.today()
+    rang = aujourdhui.year * 12 + aujourdhui.month - 1 - mois
+    return date(rang // 12, rang % 12 + 1, 1)
+
+
+class VueGrille:
+    """Grille vue par une session : la grille partagée, plus une copie privée des jours modifiés
+
+    Les lectures d'un jour non modifié vont à la grille partagée ; la première
+    écriture qui change un jour le recopie dans ``prive``.
+    """
+
+    def __init__(self, grille):
+        self.grille = grille
+        self.prive = Grille()
+        self.prive.version = grille.version
+        self._jours = set()
+
+    @property
+    def version(self):
+        return self.prive.version
+
+    @property
+    def modifies(self):
+        return self.prive.modifies
+
+    def _lecture(self, jour):
+        return self.prive if _as_date(jour) in self._jours else self.grille
+
+    def _ecriture(self, jour):
+        jour = _as_date(jour)
+        if jour not in self._jours:
+            self.prive.copier_jour(self.grille, jour)
+            self._jours.add(jour)
+        return self.prive
+
+    def get(self, jour, creneau, terrain):
+        return self._lecture(jour).get(jour, creneau, terrain)
+
+    def get_capacite(self, jour, creneau, defaut):
+        return self._lecture(jour).get_capacite(jour, creneau, defaut)
+
+    def get_joueurs(self, jour, creneau):
+        return self._lecture(jour).get_joueurs(jour, creneau)
+
+    def places(self, jour, creneau):
+        return self._lecture(jour).places(jour, creneau)
+
+    def places_jour(self, jour):
+        return self._lecture(jour).places_jour(jour)
+
+    def libelles_jour(self, jour):
+        return self._lecture(jour).libelles_jour(jour)
+
+    def valeur(self, jour, creneau, champ):
+        return self._lecture(jour).valeur(jour, creneau, champ)
+
+    # Une écriture sans effet ne recopie pas le jour
+    def set(self, jour, creneau, terrain, valeur):
+        if self.get(jour, creneau, terrain) != (valeur or ""):
+            self._ecriture(jour).set(jour, creneau, terrain, valeur)
+
+    def set_capacite(self, jour, creneau, capacite):
+        if self.get_capacite(jour, creneau, -1) != capacite:
+            self._ecriture(jour).set_capacite(jour, creneau, capacite)
+
+    def set_joueurs(self, jour, creneau, joueurs):
+        if list(self.get_joueurs(jour, creneau)) != list(joueurs):
+            self._ecriture(jour).set_joueurs(jour, creneau, joueurs)
+
+
+class GrillePartagee:
+    """Grille complète d'un stockage (entraînements récurrents superposés), chargée une fois"""
+
+    def __init__(self, stockage):
+        self.stockage = stockage
+        self.debut = None
+        self._grille = None
+        self._regles = None
+        self._verrou = threading.Lock()
+
+    def grille(self, debut=None, fin=None, attendre=True):
+        """Grille à jour couvrant [debut, fin[, à lire sans la modifier (``VueGrille`` pour écrire)
+
+        Une plage qui commence avant la fenêtre partagée est chargée à part.
+        Avec ``attendre=False``, une grille partagée pas encore chargée
+        (démarrage, préchauffage en cours) ne l'est pas pour autant : la plage
+        est lue seule, à part.
+        """
+        if debut is not None and _as_date(debut) < (self.debut or debut_fenetre()):
+            return self.stockage.charger_grille(debut, fin)
+        if debut is not None and not attendre and self._grille is None:
+            return self.stockage.charger_grille(debut, fin)
+        regles = self.stockage.entrainements()
+        version = self.stockage.lire_version()
+        with self._verrou:
+            if self._grille is None or (self._grille.version != version and not self._rafraichir()):
+                self._charger(regles)
+            # Les règles sont mises en cache par le stockage : un nouvel objet signale un changement
+            elif self._regles is not regles:
+                self._changer_regles(regles)
+            return self._grille
+
+    def _charger(self, regles):
+        self.debut = debut_fenetre()
+        self._grille = self.stockage.charger_grille(self.debut)
+        self._regles = regles
+
+    def _rafraichir(self):
+        """Applique les cellules écrites depuis le chargement ; False s'il faut tout recharger"""
+        changements = self.stockage.modifications_depuis(self._grille.position)
+        if changements is None:
+            return False
+        version, position, cellules = changements
+        cellules = [cellule for cellule in cellules if cellule[0] >= self.debut]
+        grille = self._grille.copie()
+        if cellules:
+            grille.appliquer(cellules)
+            # Une cellule vidée peut être couverte par un entraînement récurrent
+            jours = [cellule[0] for cellule in cellules]
+            appliquer_regles(grille, self._regles.values(), min(jours), max(jours) + timedelta(days=1))
+        grille.version, grille.position = version, position
+        self._grille = grille
+        return True
+
+    def _changer_regles(self, regles):
+        """Recharge les dates des entraînements ajoutés, modifiés ou supprimés"""
+        anciennes, self._regles = self._regles, regles
+        changees = [
+            regle
+            for avant, apres in ((anciennes, regles), (regles, anciennes))
+            for id, regle in avant.items()
+            if id not in apres or vars(apres[id]) != vars(regle)
+        ]
+        if not changees:
+            return
+        debut, fin = plage_entites(*changees)
+        debut = max(debut, self.debut)
+        if debut >= fin:
+            return
+        partielle = self.stockage.charger_grille(debut, fin)
+        if partielle.version != self._grille.version:
+            # Créneaux écrits entre-temps : la plage ne correspond plus au reste de la grille
+            self._charger(regles)
+            return
+        grille = self._grille.copie()
+        for ordinal in range(debut.toordinal(), fin.toordinal()):
+            grille.copier_jour(partielle, date.fromordinal(ordinal))
+        self._grille = grille
+
+    def enregistrer(self, vue, tout_ou_rien=False):
+        """Enregistre les modifications de la vue et les reporte dans la grille partagée
+
+        Retourne les cellules rejetées (voir ``enregistrer_grille`` du stockage).
+        Si une autre session a écrit entre-temps, la grille partagée n'est pas
+        modifiée : elle sera mise à jour à la prochaine lecture.
+        """
+        prive = vue.prive
+        if not prive.modifies:
+            return []
+        version_lue = prive.version
+        cellules = prive.cellules_modifiees()
+        rejetees = self.stockage.enregistrer_grille(prive, tout_ou_rien)
+        if rejetees and tout_ou_rien:
+            return rejetees
+        if prive.version is not None:
+            with self._verrou:
+                if self._grille is vue.grille and self._grille.version == version_lue:
+                    # La position de lecture n'avance pas : ces cellules seront relues, sans effet.
+                    # Les cellules rejetées (mois archivés) gardent leur valeur enregistrée
+                    rejet = set(rejetees)
+                    grille = self._grille.copie()
+                    grille.appliquer([cellule for cellule in cellules if cellule[:3] not in rejet])
+                    grille.version = prive.version
+                    self._grille = grille
+        return rejetees
+
+
+_partagee = None
+_verrou_partagee = threading.Lock()
+
+
+def get_grille_partagee():
+    """Grille partagée par toutes les sessions (créée une seule fois par processus)"""
+    global _partagee
+    with _verrou_partagee:
+        if _partagee is None:
+            _partagee = GrillePartagee(get_stockage())
+        return _partagee
@@ -0,0 +1,34 @@
+"""Préchauffage des ressources partagées, une fois par processus serveur
+
+Lancé en arrière-plan au premier affichage (voir ``app.py``) : pandas, le
+stockage, les données dérivées des tables, la grille partagée et les
+événements des mois autour d'aujourd'hui sont prêts avant la première visite
+du calendrier.
+"""
+from datetime import date
+
+from planning.cache import get_cache_evenements
+from planning.evenements import VUE_MOIS, decaler_ancre, plage_visible
+from planning.partage import get_grille_partagee
+from planning.stockage import get_stockage
+
+
+def prechauffer(ancre=None):
+    """Charge les ressources partagées et calcule les événements du mois courant et de ses voisins"""
+    # Importé par Streamlit à l'appel du composant calendrier, et par les pages de tables
+    import pandas  # noqa: F401
+
+    stockage = get_stockage()
+    stockage.tournois()
+    try:
+        stockage.annuaire_membres()
+    except FileNotFoundError:
+        pass
+
+    ancre = ancre or date.today()
+    plages = [plage_visible(decaler_ancre(ancre, VUE_MOIS, pas), VUE_MOIS) for pas in (-1, 0, 1)]
+    # Grille lue par la page calendrier (les règles sont lues au passage)
+    grille = get_grille_partagee().grille()
+    cache = get_cache_evenements()
+    for debut, fin in plages:
+        cache.prechauffer(grille, debut, fin)
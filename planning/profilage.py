@@ -0,0 +1,155 @@
+"""Profilage optionnel d'un affichage : durée et mémoire allouée par phase
+
+Inactif par défaut (aucune mesure, aucun surcoût). Activé avec ``?debug=1``
+dans l'URL ou la variable d'environnement ``BNR_PROFILAGE=1`` ; chaque
+affichage profilé est alors ajouté à un journal de métriques tournant.
+
+tracemalloc, qui ralentit toutes les allocations du processus, n'est actif
+que pendant les affichages profilés : le dernier profileur terminé l'arrête.
+Son pic mémoire est commun au processus : les pics ne sont justes que si un
+seul affichage profilé s'exécute à la fois (``pics_fiables`` l'indique).
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+METRIQUES_FILE = "data/metriques.log"
+
+# Taille du journal de métriques au-delà de laquelle il est renommé en .1 (une seule archive)
+TAILLE_MAX_METRIQUES = 1024 * 1024
+
+_verrou = threading.Lock()
+
+# Profileurs en cours ; tracemalloc est arrêté quand il n'en reste plus (s'il a été démarré ici)
+_actifs = 0
+_trace_demarree = False
+_verrou_traces = threading.Lock()
+
+
+def _tracer():
+    global _actifs, _trace_demarree
+    with _verrou_traces:
+        if _actifs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _trace_demarree = True
+        _actifs += 1
+
+
+def _liberer():
+    global _actifs, _trace_demarree
+    with _verrou_traces:
+        _actifs -= 1
+        if _actifs == 0 and _trace_demarree:
+            tracemalloc.stop()
+            _trace_demarree = False
+
+
+def profilage_demande(parametre_debug=None):
+    """True si le profilage est demandé par l'URL (?debug=1) ou par BNR_PROFILAGE=1"""
+    return parametre_debug == "1" or os.environ.get("BNR_PROFILAGE") == "1"
+
+
+class Profileur:
+    """Cumule, pour chaque phase nommée, la durée et la mémoire allouée
+
+    - durée en millisecondes (horloge murale) ;
+    - mémoire nette : octets encore alloués en fin de phase ;
+    - pic : mémoire maximale allouée pendant la phase (phases imbriquées comprises).
+
+    ``terminer`` (appelé par ``enregistrer``) libère tracemalloc ; un
+    affichage interrompu avant le libère quand le profileur est détruit.
+    """
+
+    def __init__(self, actif=False, page=""):
+        self.actif = actif
+        self.page = page
+        # {phase: [ms, octets nets, octets pic, appels]}
+        self.phases = {}
+        self._pics = []
+        self._debut = time.perf_counter()
+        # Faux si un autre affichage profilé a remis à zéro le pic commun pendant celui-ci
+        self.pics_fiables = True
+        self._terminer = None
+        if actif:
+            _tracer()
+            self._terminer = weakref.finalize(self, _liberer)
+
+    def phase(self, nom):
+        """Contexte mesurant une phase (ne fait rien si le profilage est inactif ou terminé)"""
+        if not self.actif:
+            return nullcontext()
+        return self._mesurer(nom)
+
+    def terminer(self):
+        """Fin du profilage : les phases suivantes ne sont plus mesurées"""
+        self.actif = False
+        if self._terminer is not None:
+            self._terminer()
+
+    @contextmanager
+    def _mesurer(self, nom):
+        self.pics_fiables = self.pics_fiables and _actifs == 1
+        actuelle, pic = tracemalloc.get_traced_memory()
+        if self._pics:
+            # Conserver le pic de la phase englobante avant de le remettre à zéro
+            self._pics[-1] = max(self._pics[-1], pic)
+        tracemalloc.reset_peak()
+        self._pics.append(actuelle)
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = (time.perf_counter() - debut) * 1000
+            fin, pic = tracemalloc.get_traced_memory()
+            self.pics_fiables = self.pics_fiables and _actifs == 1
+            pic = max(self._pics.pop(), pic)
+            if self._pics:
+                self._pics[-1] = max(self._pics[-1], pic)
+            cumul = self.phases.setdefault(nom, [0.0, 0, 0, 0])
+            cumul[0] += duree
+            cumul[1] += fin - actuelle
+            cumul[2] = max(cumul[2], pic - actuelle)
+            cumul[3] += 1
+
+    def total_ms(self):
+        return (time.perf_counter() - self._debut) * 1000
+
+    def resume(self):
+        """Lignes {phase, ms, ko_net, ko_pic, appels} dans l'ordre des phases"""
+        return [
+            {
+                "phase": nom,
+                "ms": round(ms, 2),
+                "ko_net": round(net / 1024, 1),
+                "ko_pic": round(pic / 1024, 1),
+                "appels": appels,
+            }
+            for nom, (ms, net, pic, appels) in self.phases.items()
+        ]
+
+    def enregistrer(self, fichier=METRIQUES_FILE, taille_max=TAILLE_MAX_METRIQUES):
+        """Termine le profilage et ajoute l'affichage au journal de métriques (une ligne JSON), avec rotation"""
+        if not self.actif:
+            return
+        self.terminer()
+        ligne = json.dumps({
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "page": self.page,
+            "total_ms": round(self.total_ms(), 2),
+            "pics_fiables": self.pics_fiables,
+            "phases": self.resume(),
+        }, ensure_ascii=False)
+        with _verrou:
+            os.makedirs(os.path.dirname(fichier) or ".", exist_ok=True)
+            try:
+                if os.path.getsize(fichier) > taille_max:
+                    os.replace(fichier, fichier + ".1")
+            except OSError:
+                pass
+            with open(fichier, "a", encoding="utf-8") as f:
+                f.write(ligne + "\n")
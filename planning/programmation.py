@@ -0,0 +1,213 @@
+"""Programmation des entraînements et des tournois avec vérification des conflits
+
+Les conflits sont retournés regroupés en plages (voir ``regrouper_conflits``) ;
+leur mise en forme est laissée aux pages.
+
+Un entraînement ou un tournoi existant est désigné par son identifiant : sa
+modification ou sa suppression ne touche que les créneaux qu'il occupe
+(voir ``planning.entites``).
+
+La vérification des conflits et l'écriture qui la suit se font sous le verrou
+de programmation du stockage (``verrou_programmation``) : deux ajouts
+concurrents ne peuvent pas passer la vérification l'un sans l'autre.
+"""
+from datetime import date, timedelta
+
+from planning.entites import Tournoi, libelle_tournoi, plage_entites
+from planning.grille import TERRAINS, Grille, creneaux_horaires
+from planning.lot import appliquer_lot
+from planning.occupation import IndexOccupation, regrouper_conflits
+from planning.regles import RegleEntrainement, appliquer_regles
+
+# Demande invalide pour appliquer_lot (aucune date)
+DEMANDE_INVALIDE = ([], [], [], "")
+
+
+def terrains_selectionnes(coches):
+    """Indices des terrains cochés (une case par terrain)"""
+    return [t for t, actif in enumerate(coches) if actif]
+
+
+def colonnes_terrains(terrains):
+    """Colonnes oui/non de chaque terrain pour une ligne de table"""
+    return {champ: "oui" if t in terrains else "non" for t, champ in enumerate(TERRAINS)}
+
+
+def _cellules_vers_occupes(cellules):
+    """Convertit des cellules (date, creneau, champ) rejetées en créneaux occupés"""
+    return [(jour, creneau, TERRAINS.index(champ)) for jour, creneau, champ in cellules if champ in TERRAINS]
+
+
+def _verifier_regle(stockage, charger, regle):
+    """Grille chargée par ``charger()`` et conflits de la règle, vérifiés sur une version stable
+
+    Appelé verrou de programmation tenu : les autres entraînements et les
+    tournois ne changent pas, mais des créneaux peuvent être écrits pendant la
+    vérification (page jour) ; elle est alors refaite.
+    """
+    while True:
+        grille = charger()
+        conflits = IndexOccupation(grille).conflits(regle.ordinaux(), regle.creneaux, regle.terrains)
+        if conflits or stockage.lire_version() == grille.version:
+            return grille, conflits
+
+
+def ajouter_entrainement(stockage, ligne):
+    """Enregistre un entraînement récurrent (une règle) après vérification des conflits
+
+    Aucun créneau n'est écrit : la règle est évaluée à chaque chargement de la grille.
+    """
+    regle = RegleEntrainement.depuis_ligne(ligne)
+    if regle is None:
+        return False, []
+
+    with stockage.verrou_programmation():
+        # Créneaux déjà occupés (y compris par les autres entraînements) sur les dates de la saison
+        _, conflits = _verifier_regle(
+            stockage, lambda: stockage.charger_grille(regle.debut, regle.fin + timedelta(days=1)), regle
+        )
+        if conflits:
+            return False, conflits
+        stockage.ajouter_ligne("entrainements", ligne)
+    return True, []
+
+
+def _retirer_entrainement(stockage, regle, debut, fin):
+    """Grille de [debut, fin[ sans l'entraînement, ses copies date par date retirées
+
+    Les autres entraînements sont superposés ; les copies retirées (laissées
+    par les anciennes versions) sont à enregistrer.
+    """
+    grille = stockage.charger_grille(debut, fin, avec_regles=False)
+    grille.liberer(regle.ordinaux(), regle.creneaux, regle.terrains, regle.libelle)
+    autres = [r for i, r in stockage.entrainements().items() if i != regle.id]
+    appliquer_regles(grille, autres, debut, fin)
+    return grille
+
+
+def modifier_entrainement(stockage, id, ligne):
+    """Remplace l'entraînement ``id`` après vérification des conflits (hors lui-même)
+
+    Lève KeyError si l'entraînement n'existe pas.
+    """
+    regle = RegleEntrainement.depuis_ligne(ligne)
+    if regle is None:
+        return False, []
+    with stockage.verrou_programmation():
+        ancienne = stockage.entrainements()[id]
+        grille, conflits = _verifier_regle(
+            stockage, lambda: _retirer_entrainement(stockage, ancienne, *plage_entites(ancienne, regle)), regle
+        )
+        if conflits:
+            return False, conflits
+        stockage.enregistrer_grille(grille)
+        stockage.remplacer_ligne("entrainements", id, ligne)
+    return True, []
+
+
+def supprimer_entrainement(stockage, id):
+    """Supprime l'entraînement ``id`` (lève KeyError s'il n'existe pas)"""
+    with stockage.verrou_programmation():
+        regle = stockage.entrainements()[id]
+        grille = _retirer_entrainement(stockage, regle, *plage_entites(regle))
+        stockage.enregistrer_grille(grille)
+        stockage.supprimer_ligne("entrainements", id)
+
+
+def bloquer_tournoi(stockage, jour, heure_debut, heure_fin, niveau, genre, terrains, ligne=None):
+    """Bloque les créneaux d'un tournoi sur les terrains (indices) à une date donnée
+
+    Les conflits sont vérifiés avant d'écrire. Avec ``ligne``, le tournoi est
+    ajouté à la table sous le même verrou ; si l'ajout échoue, ses créneaux
+    sont libérés (aucun créneau bloqué sans tournoi pour le modifier).
+    """
+    creneaux = creneaux_horaires(heure_debut, heure_fin)
+    jours = [jour.toordinal()]
+    libelle = libelle_tournoi(niveau, genre)
+
+    # Sous le verrou : un entraînement ajouté en même temps n'écrit aucun créneau
+    with stockage.verrou_programmation():
+        grille = stockage.charger_grille(jour, jour + timedelta(days=1))
+        conflits = IndexOccupation(grille).conflits(jours, creneaux, terrains)
+        if conflits:
+            return False, conflits
+
+        grille.remplir(jours, creneaux, terrains, libelle)
+        resultat = _enregistrer_tournoi(stockage, grille)
+        if resultat[0] and ligne is not None:
+            try:
+                stockage.ajouter_ligne("tournois", ligne)
+            except BaseException:
+                grille = stockage.charger_grille(jour, jour + timedelta(days=1))
+                grille.liberer(jours, creneaux, terrains, libelle)
+                stockage.enregistrer_grille(grille)
+                raise
+        return resultat
+
+
+def _enregistrer_tournoi(stockage, grille):
+    """Rien n'est écrit si un créneau a été pris entre-temps par une autre session"""
+    rejetes = stockage.enregistrer_grille(grille, tout_ou_rien=True)
+    if rejetes:
+        return False, regrouper_conflits(_cellules_vers_occupes(rejetes))
+    return True, []
+
+
+def modifier_tournoi(stockage, id, ligne):
+    """Déplace ou modifie le tournoi ``id`` : ses anciens créneaux sont libérés, les nouveaux bloqués
+
+    Lève KeyError si le tournoi n'existe pas.
+    """
+    tournoi = Tournoi.depuis_ligne(ligne)
+    if tournoi is None or not tournoi.terrains:
+        return False, []
+    with stockage.verrou_programmation():
+        ancien = stockage.tournois()[id]
+        grille = stockage.charger_grille(*plage_entites(ancien, tournoi))
+        grille.liberer(ancien.ordinaux(), ancien.creneaux, ancien.terrains, ancien.libelle)
+        conflits = IndexOccupation(grille).conflits(tournoi.ordinaux(), tournoi.creneaux, tournoi.terrains)
+        if conflits:
+            return False, conflits
+        grille.remplir(tournoi.ordinaux(), tournoi.creneaux, tournoi.terrains, tournoi.libelle)
+        succes, conflits = _enregistrer_tournoi(stockage, grille)
+        if succes:
+            stockage.remplacer_ligne("tournois", id, ligne)
+    return succes, conflits
+
+
+def supprimer_tournoi(stockage, id):
+    """Supprime le tournoi ``id`` et libère ses créneaux (lève KeyError s'il n'existe pas)"""
+    with stockage.verrou_programmation():
+        tournoi = stockage.tournois()[id]
+        grille = stockage.charger_grille(*plage_entites(tournoi))
+        grille.liberer(tournoi.ordinaux(), tournoi.creneaux, tournoi.terrains, tournoi.libelle)
+        stockage.enregistrer_grille(grille)
+        stockage.supprimer_ligne("tournois", id)
+
+
+def demande_tournoi(ligne):
+    """Demande (ordinaux, créneaux, terrains, libellé) pour une ligne de la table des tournois"""
+    tournoi = Tournoi.depuis_ligne(ligne)
+    if tournoi is None:
+        return DEMANDE_INVALIDE
+    return tournoi.ordinaux(), tournoi.creneaux, tournoi.terrains, tournoi.libelle
+
+
+def demande_entrainement(ligne):
+    """Demande (ordinaux, créneaux, terrains, libellé) pour une ligne d'entraînement"""
+    regle = RegleEntrainement.depuis_ligne(ligne)
+    if regle is None:
+        return DEMANDE_INVALIDE
+    return regle.ordinaux(), regle.creneaux, regle.terrains, regle.libelle
+
+
+def appliquer_demandes(stockage, demandes):
+    """Charge une seule fois la grille couvrant toutes les demandes et les applique (voir appliquer_lot)
+
+    Retourne (grille, rapport) ; la grille vaut None si aucune demande n'est valide.
+    """
+    jours = [int(o) for ordinaux, _, _, _ in demandes for o in ordinaux]
+    if not jours:
+        return None, appliquer_lot(Grille(), demandes)
+    grille = stockage.charger_grille(date.fromordinal(min(jours)), date.fromordinal(max(jours) + 1))
+    return grille, appliquer_lot(grille, demandes)
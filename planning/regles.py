@@ -0,0 +1,152 @@
+"""Entraînements récurrents décrits par des règles, évalués à la demande
+
+Un entraînement n'est plus recopié date par date dans la grille : il est
+décrit par une règle (jour de semaine, horaires, terrains, bornes de saison,
+dates exclues) et superposé à la grille au chargement, uniquement sur la
+plage de dates chargée.
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from planning.grille import (
+    PREFIXE_ENTRAINEMENT,
+    TERRAINS,
+    _as_date,
+    creneaux_horaires,
+    ordinaux_jour_semaine,
+)
+
+JOURS_SEMAINE = ("Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche")
+
+# Saison des entraînements enregistrés avant l'ajout des bornes de saison
+SAISON_DEFAUT = (date(2026, 1, 1), date(2026, 12, 31))
+
+# Séparateur des dates exclues dans la colonne "exceptions"
+SEPARATEUR_EXCEPTIONS = ";"
+
+
+def libelle_entrainement(coach, genre, niveau):
+    """Libellé au format "ENTRAINEMENT|coach|genre|niveau" """
+    return f"{PREFIXE_ENTRAINEMENT}{coach}|{genre}|{niveau}"
+
+
+def terrains_ligne(ligne):
+    """Indices des terrains marqués "oui" dans une ligne de table (colonnes terrain1, terrain2...)"""
+    return [t for t, champ in enumerate(TERRAINS) if ligne.get(champ) == "oui"]
+
+
+def identifiant(ligne):
+    """Identifiant stable d'une ligne de table (colonne "id"), None s'il manque"""
+    try:
+        return int(ligne.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _texte(valeur):
+    """Valeur texte d'une cellule de table (None si vide ou manquante)"""
+    if isinstance(valeur, str) and valeur.strip():
+        return valeur.strip()
+    return None
+
+
+def _lire_date(valeur, defaut):
+    texte = _texte(valeur)
+    return date.fromisoformat(texte) if texte else defaut
+
+
+def format_exceptions(dates):
+    """Colonne "exceptions" à partir d'une liste de dates"""
+    return SEPARATEUR_EXCEPTIONS.join(sorted(_as_date(d).isoformat() for d in dates))
+
+
+class RegleEntrainement:
+    """Entraînement récurrent : un jour de semaine, une plage horaire et des terrains"""
+
+    def __init__(self, jour_semaine, creneaux, terrains, libelle, debut=None, fin=None, exceptions=(), id=None):
+        self.id = id
+        self.jour_semaine = jour_semaine
+        self.creneaux = list(creneaux)
+        self.terrains = list(terrains)
+        self.libelle = libelle
+        self.debut = debut or SAISON_DEFAUT[0]
+        self.fin = fin or SAISON_DEFAUT[1]
+        self.exceptions = {_as_date(d) for d in exceptions}
+
+    @classmethod
+    def depuis_ligne(cls, ligne):
+        """Règle décrite par une ligne de la table des entraînements (None si invalide)"""
+        try:
+            jour = _texte(ligne.get("jour"))
+            if jour is None or jour.capitalize() not in JOURS_SEMAINE:
+                return None
+            exceptions = [
+                date.fromisoformat(d.strip())
+                for d in (_texte(ligne.get("exceptions")) or "").split(SEPARATEUR_EXCEPTIONS)
+                if d.strip()
+            ]
+            return cls(
+                JOURS_SEMAINE.index(jour.capitalize()),
+                creneaux_horaires(ligne["heure_debut"], ligne["heure_fin"]),
+                terrains_ligne(ligne),
+                libelle_entrainement(ligne["coach"], _texte(ligne.get("genre")) or "Mixte", ligne["niveau"]),
+                _lire_date(ligne.get("date_debut"), None),
+                _lire_date(ligne.get("date_fin"), None),
+                exceptions,
+                identifiant(ligne),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+
+    def ordinaux(self, debut=None, fin=None):
+        """Ordinaux des dates de la règle dans la saison, limitées à [debut, fin["""
+        premier = self.debut if debut is None else max(self.debut, _as_date(debut))
+        dernier = self.fin if fin is None else min(self.fin, _as_date(fin) - timedelta(days=1))
+        if premier > dernier:
+            return np.array([], dtype=np.int64)
+        ordinaux = ordinaux_jour_semaine(premier, dernier, self.jour_semaine)
+        if self.exceptions:
+            ordinaux = np.setdiff1d(ordinaux, [d.toordinal() for d in self.exceptions])
+        return ordinaux
+
+
+def regles_depuis_lignes(lignes):
+    """Règles des lignes valides d'une table d'entraînements (dictionnaires)"""
+    regles = []
+    for ligne in lignes:
+        regle = RegleEntrainement.depuis_ligne(ligne)
+        if regle is not None:
+            regles.append(regle)
+    return regles
+
+
+def appliquer_regles(grille, regles, debut=None, fin=None):
+    """Superpose les entraînements récurrents à la grille sur [debut, fin["""
+    for regle in regles:
+        grille.superposer(regle.ordinaux(debut, fin), regle.creneaux, regle.terrains, regle.libelle)
+    return grille
+
+
+def dematerialiser(grille, regles):
+    """Vide les cellules recopiées date par date qui sont couvertes par une règle
+
+    La grille doit avoir été chargée sans les règles. Retourne le nombre de
+    cellules vidées (à enregistrer ensuite).
+    """
+    nb = 0
+    for regle in regles:
+        for o in regle.ordinaux().tolist():
+            jour = date.fromordinal(o)
+            for c in regle.creneaux:
+                for t in regle.terrains:
+                    if grille.get(jour, c, t) == regle.libelle:
+                        grille.set(jour, c, t, "")
+                        nb += 1
+    return nb
+
+
+def saison_courante():
+    """Bornes par défaut d'une nouvelle règle : l'année civile en cours"""
+    annee = datetime.now().year
+    return date(annee, 1, 1), date(annee, 12, 31)
@@ -0,0 +1,577 @@
+"""Couche de stockage du club : créneaux, entraînements, tournois et membres
+
+Deux implémentations partagent la même interface :
+
+- ``StockageFichiers`` (par défaut) : instantané + journal JSON pour les
+  créneaux, fichiers CSV pour les tables ;
+- ``StockageSQLite`` : une base ``data/club.sqlite`` indexée par
+  (date, créneau, terrain) et par numéro de licence.
+
+Les entraînements récurrents sont stockés comme des règles (une ligne de la
+table ``entrainements``) et superposés à la grille à chaque chargement.
+Les lignes des entraînements et des tournois ont un identifiant stable
+(colonne ``id``) qui permet de les modifier ou de les supprimer. Les fichiers
+CSV antérieurs aux identifiants sont mis à niveau une fois, à la création du
+stockage (``StockageFichiers.mettre_a_niveau``) ; les lectures n'écrivent jamais.
+
+Le choix se fait avec la variable d'environnement ``BNR_STOCKAGE``
+(``fichiers`` ou ``sqlite``).
+
+Les données dérivées des tables (règles, tournois, annuaire) sont construites
+à partir de lignes simples (``lire_lignes``) ; pandas n'est importé que pour
+lire une table entière en DataFrame (``lire_table``), à l'affichage.
+"""
+import csv
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+from planning.codec import CODEC
+from planning.entites import index_entrainements, index_tournois
+from planning.grille import TERRAINS, Grille, parse_cle
+from planning.membres import AnnuaireMembres
+from planning.regles import appliquer_regles
+from planning.store import (
+    RESPONSABLES_FILE,
+    fusionner,
+    load_grille,
+    load_responsables,
+    lire_version,
+    modifications_depuis,
+    save_grille,
+    verrouiller,
+)
+
+ENTRAINEMENTS_FILE = "data/entrainements.csv"
+TOURNOIS_FILE = "data/tournois.csv"
+MEMBRES_FILE = "data/membres.csv"
+SQLITE_FILE = "data/club.sqlite"
+
+# Nombre de versions dont les cellules écrites restent connues (SQLite, voir ``modifications_depuis``)
+HISTORIQUE_VERSIONS = 1000
+
+COLONNES = {
+    "entrainements": [
+        "id", "jour", "heure_debut", "heure_fin", "coach", "niveau", "genre", *TERRAINS,
+        "date_debut", "date_fin", "exceptions",
+    ],
+    # Une colonne oui/non par terrain (terrain1, terrain2...)
+    "tournois": ["id", "date", "heure_debut", "heure_fin", "niveau", "genre", *TERRAINS],
+    "membres": ["prenom", "nom", "numero_licence", "niveau", "joueur", "coach", "staffer"],
+}
+
+
+def _valeur_sql(valeur):
+    """Convertit les scalaires NumPy/pandas en types Python acceptés par sqlite3"""
+    if hasattr(valeur, "item"):
+        return valeur.item()
+    return valeur
+
+
+class _StockageBase:
+    """Données dérivées des tables, partagées entre sessions et recalculées quand la table change"""
+
+    def __init__(self):
+        # {nom de table: (signature, valeur dérivée)}
+        self._caches = {}
+
+    def _en_cache(self, nom, construire):
+        signature = self._signature(nom)
+        entree = self._caches.get(nom)
+        if entree is None or entree[0] != signature:
+            entree = (signature, construire(self.lire_lignes(nom)))
+            self._caches[nom] = entree
+        return entree[1]
+
+    def entrainements(self):
+        """Règles des entraînements récurrents par identifiant"""
+        try:
+            return self._en_cache("entrainements", index_entrainements)
+        except FileNotFoundError:
+            return {}
+
+    def regles_entrainements(self):
+        """Règles des entraînements récurrents"""
+        return list(self.entrainements().values())
+
+    def tournois(self):
+        """Tournois par identifiant (voir ``planning.entites``)"""
+        try:
+            return self._en_cache("tournois", index_tournois)
+        except FileNotFoundError:
+            return {}
+
+    def annuaire_membres(self):
+        """Annuaire des membres (lève FileNotFoundError si la table n'existe pas)"""
+        return self._en_cache("membres", AnnuaireMembres)
+
+    def verrou_programmation(self):
+        """Verrou exclusif (entre sessions et processus) d'une vérification de conflits suivie de son écriture
+
+        Les entraînements récurrents ne sont pas des créneaux : leur ajout
+        n'avance pas la version du stockage, seul ce verrou empêche deux
+        programmations concurrentes de se chevaucher.
+        """
+        return verrouiller(os.path.join(self.dossier, "programmation"))
+
+
+class StockageFichiers(_StockageBase):
+    """Stockage historique : JSON (instantané + journal) et fichiers CSV"""
+
+    def __init__(self, responsables_file=RESPONSABLES_FILE, fichiers_tables=None):
+        super().__init__()
+        self.responsables_file = responsables_file
+        self.dossier = os.path.dirname(responsables_file)
+        self.fichiers_tables = fichiers_tables or {
+            "entrainements": ENTRAINEMENTS_FILE,
+            "tournois": TOURNOIS_FILE,
+            "membres": MEMBRES_FILE,
+        }
+
+    def charger_grille(self, debut=None, fin=None, avec_regles=True):
+        grille = load_grille(self.responsables_file, debut, fin)
+        if avec_regles:
+            appliquer_regles(grille, self.regles_entrainements(), debut, fin)
+        return grille
+
+    def _signature(self, nom):
+        """Signature du fichier de la table (lève FileNotFoundError s'il n'existe pas)"""
+        stat = os.stat(self.fichiers_tables[nom])
+        return stat.st_mtime_ns, stat.st_size
+
+    def enregistrer_grille(self, grille, tout_ou_rien=False):
+        """Enregistre les cellules modifiées ; retourne les cellules rejetées (conflits)"""
+        return save_grille(grille, self.responsables_file, tout_ou_rien)
+
+    def lire_version(self):
+        return lire_version(self.responsables_file)
+
+    def modifications_depuis(self, position):
+        """(version, position, cellules) écrites depuis le chargement d'une grille, None s'il faut tout recharger"""
+        return modifications_depuis(self.responsables_file, position)
+
+    def _verrou_table(self, nom, partage=False):
+        """Verrou du fichier de la table (partagé pour les lectures, exclusif pour les écritures)"""
+        return verrouiller(self.fichiers_tables[nom], partage)
+
+    def lire_table(self, nom):
+        """Lit une table en DataFrame (lève FileNotFoundError si le fichier n'existe pas)"""
+        import pandas as pd
+
+        # Test préalable : le verrou crée son fichier, pas celui de la table
+        if not os.path.exists(self.fichiers_tables[nom]):
+            raise FileNotFoundError(self.fichiers_tables[nom])
+        with self._verrou_table(nom, partage=True):
+            return pd.read_csv(self.fichiers_tables[nom])
+
+    def lire_lignes(self, nom):
+        """Lignes d'une table en dictionnaires de textes, sans pandas (FileNotFoundError si absente)"""
+        if not os.path.exists(self.fichiers_tables[nom]):
+            raise FileNotFoundError(self.fichiers_tables[nom])
+        with self._verrou_table(nom, partage=True):
+            with open(self.fichiers_tables[nom], "r", encoding="utf-8", newline="") as f:
+                return list(csv.DictReader(f))
+
+    def mettre_a_niveau(self):
+        """Numérote les lignes et ajoute les colonnes manquantes des CSV antérieurs (une fois)"""
+        for nom, fichier in self.fichiers_tables.items():
+            if os.path.exists(fichier) and os.path.getsize(fichier):
+                with self._verrou_table(nom):
+                    self._mettre_a_niveau(nom)
+
+    def ajouter_ligne(self, nom, ligne):
+        """Ajoute une ligne à la fin du CSV sans réécrire le fichier"""
+        self.ajouter_lignes(nom, [ligne])
+
+    def ajouter_lignes(self, nom, lignes):
+        """Ajoute des lignes à la fin du CSV en une seule écriture"""
+        if not lignes:
+            return
+        # Prochain identifiant lu et lignes ajoutées sous le même verrou : deux sessions n'ont pas le même
+        with self._verrou_table(nom):
+            self._ajouter_lignes(nom, lignes)
+
+    def _ajouter_lignes(self, nom, lignes):
+        fichier = self.fichiers_tables[nom]
+        nouveau = not os.path.exists(fichier) or os.path.getsize(fichier) == 0
+        colonnes, prochain = (COLONNES[nom], 1) if nouveau else self._mettre_a_niveau(nom)
+        if "id" in colonnes:
+            # Les identifiants sont attribués ici, jamais repris des lignes fournies
+            lignes = [{**ligne, "id": prochain + i} for i, ligne in enumerate(lignes)]
+        prefixe = ""
+        if not nouveau:
+            with open(fichier, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    prefixe = "\n"
+        with open(fichier, "a", encoding="utf-8", newline="") as f:
+            f.write(prefixe)
+            writer = csv.writer(f, lineterminator="\n")
+            if nouveau:
+                writer.writerow(COLONNES[nom])
+            writer.writerows([ligne.get(colonne, "") for colonne in colonnes] for ligne in lignes)
+
+    def _mettre_a_niveau(self, nom):
+        """Ajoute au CSV les colonnes manquantes et numérote les lignes sans identifiant
+
+        Appelé verrou de la table tenu ; le fichier est réécrit au plus une
+        fois. Retourne son en-tête et le prochain identifiant libre (None si la
+        table n'a pas d'identifiant).
+        """
+        fichier = self.fichiers_tables[nom]
+        with open(fichier, "r", encoding="utf-8", newline="") as f:
+            lecteur = csv.reader(f)
+            entete = next(lecteur, [])
+            ids = []
+            if "id" in entete:
+                colonne = entete.index("id")
+                ids = [ligne[colonne].strip() if colonne < len(ligne) else "" for ligne in lecteur if ligne]
+        manquantes = [colonne for colonne in COLONNES[nom] if colonne not in entete]
+        prochain = max((int(i) for i in ids if i), default=0) + 1 if "id" in COLONNES[nom] else None
+        if manquantes or "" in ids:
+            import pandas as pd
+
+            df = pd.read_csv(fichier, dtype=str, keep_default_na=False)
+            if manquantes:
+                # L'identifiant en première colonne, les autres à la fin
+                entete = [c for c in manquantes if c == "id"] + entete + [c for c in manquantes if c != "id"]
+                df = df.reindex(columns=entete, fill_value="")
+            if prochain is not None:
+                sans_id = df["id"].str.strip() == ""
+                df.loc[sans_id, "id"] = [str(prochain + i) for i in range(int(sans_id.sum()))]
+                prochain += int(sans_id.sum())
+            self._reecrire(nom, df)
+        return entete, prochain
+
+    def _reecrire(self, nom, df):
+        """Remplace le CSV de façon atomique (fichier temporaire + renommage)"""
+        fichier = self.fichiers_tables[nom]
+        temporaire = fichier + ".tmp"
+        df.to_csv(temporaire, index=False, lineterminator="\n")
+        os.replace(temporaire, fichier)
+
+    def _lignes_id(self, nom, id):
+        """Table lue en texte et masque de la ligne portant l'identifiant (KeyError si absente)
+
+        Appelé verrou de la table tenu, jusqu'à la réécriture.
+        """
+        import pandas as pd
+
+        self._mettre_a_niveau(nom)
+        df = pd.read_csv(self.fichiers_tables[nom], dtype=str, keep_default_na=False)
+        masque = df["id"] == str(int(id))
+        if not masque.any():
+            raise KeyError(f"{nom} : aucune ligne d'identifiant {id}")
+        return df, masque
+
+    def remplacer_ligne(self, nom, id, ligne):
+        """Remplace le contenu de la ligne d'identifiant ``id`` (l'identifiant est conservé)"""
+        with self._verrou_table(nom):
+            df, masque = self._lignes_id(nom, id)
+            for colonne in df.columns:
+                if colonne != "id":
+                    valeur = ligne.get(colonne, "")
+                    df.loc[masque, colonne] = "" if valeur is None else str(valeur)
+            self._reecrire(nom, df)
+
+    def supprimer_ligne(self, nom, id):
+        """Supprime la ligne d'identifiant ``id``"""
+        with self._verrou_table(nom):
+            df, masque = self._lignes_id(nom, id)
+            self._reecrire(nom, df[~masque])
+
+
+class StockageSQLite(_StockageBase):
+    """Stockage dans une base SQLite, initialisée depuis les fichiers existants"""
+
+    # Les colonnes des terrains suivent la configuration du club
+    SCHEMA = f"""
+        -- terrain vaut terrain1, terrain2..., ou max_places/joueurs ; valeur est encodée en JSON
+        CREATE TABLE IF NOT EXISTS creneaux (
+            date TEXT NOT NULL,
+            creneau INTEGER NOT NULL,
+            terrain TEXT NOT NULL,
+            valeur TEXT NOT NULL,
+            PRIMARY KEY (date, creneau, terrain)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS entrainements (
+            id INTEGER PRIMARY KEY,
+            jour TEXT, heure_debut TEXT, heure_fin TEXT, coach TEXT,
+            niveau TEXT, genre TEXT, {", ".join(f"{t} TEXT" for t in TERRAINS)},
+            date_debut TEXT, date_fin TEXT, exceptions TEXT
+        );
+        CREATE TABLE IF NOT EXISTS tournois (
+            id INTEGER PRIMARY KEY,
+            date TEXT, heure_debut TEXT, heure_fin TEXT,
+            niveau TEXT, genre TEXT, {", ".join(f"{t} TEXT" for t in TERRAINS)}
+        );
+        CREATE INDEX IF NOT EXISTS tournois_date ON tournois (date);
+        CREATE TABLE IF NOT EXISTS membres (
+            id INTEGER PRIMARY KEY,
+            prenom TEXT, nom TEXT, numero_licence INTEGER, niveau TEXT,
+            joueur TEXT, coach TEXT, staffer TEXT
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            cle TEXT PRIMARY KEY,
+            valeur INTEGER NOT NULL
+        );
+        -- Cellules écrites par chaque version, pour mettre à jour une grille déjà chargée
+        CREATE TABLE IF NOT EXISTS historique_creneaux (
+            version INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            creneau INTEGER NOT NULL,
+            terrain TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS historique_creneaux_version ON historique_creneaux (version);
+    """
+
+    def __init__(self, fichier=SQLITE_FILE, import_depuis=None):
+        super().__init__()
+        self.fichier = fichier
+        self.dossier = os.path.dirname(fichier)
+        os.makedirs(os.path.dirname(fichier) or ".", exist_ok=True)
+        nouvelle_base = not os.path.exists(fichier)
+        with self._connexion() as conn:
+            conn.executescript(self.SCHEMA)
+            self._ajouter_colonnes_manquantes(conn)
+            # Base antérieure à l'historique : les versions déjà écrites n'y figurent pas
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('historique_purge', ?)", (self._lire_version(conn),))
+        if nouvelle_base:
+            self.importer(import_depuis or StockageFichiers())
+
+    @contextmanager
+    def _connexion(self):
+        """Connexion dans une transaction, validée puis fermée en sortie"""
+        conn = sqlite3.connect(self.fichier, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _ajouter_colonnes_manquantes(conn):
+        """Met à niveau une base créée avant l'ajout de colonnes aux tables"""
+        for nom, colonnes in COLONNES.items():
+            existantes = {ligne[1] for ligne in conn.execute(f"PRAGMA table_info({nom})")}
+            for colonne in colonnes:
+                if colonne not in existantes:
+                    conn.execute(f"ALTER TABLE {nom} ADD COLUMN {colonne} TEXT")
+
+    def importer(self, source):
+        """Copie le contenu d'un autre stockage (migration initiale)"""
+        cellules = []
+        for cle, valeur in load_responsables(source.responsables_file).items():
+            parsed = parse_cle(cle)
+            if parsed is not None and valeur not in ("", [], None):
+                jour, creneau, champ = parsed
+                cellules.append((jour.isoformat(), creneau, champ, CODEC.encoder(valeur).decode("utf-8")))
+        with self._connexion() as conn:
+            conn.executemany("INSERT OR REPLACE INTO creneaux VALUES (?, ?, ?, ?)", cellules)
+        # Les lignes importées doivent toutes avoir un identifiant
+        source.mettre_a_niveau()
+        for nom in COLONNES:
+            try:
+                lignes = source.lire_lignes(nom)
+            except FileNotFoundError:
+                continue
+            # Les identifiants des lignes sont conservés
+            self._inserer(nom, lignes, COLONNES[nom])
+
+    def charger_grille(self, debut=None, fin=None, avec_regles=True):
+        requete = "SELECT date, creneau, terrain, valeur FROM creneaux"
+        conditions, parametres = [], []
+        if debut is not None:
+            conditions.append("date >= ?")
+            parametres.append(debut.isoformat()[:10])
+        if fin is not None:
+            conditions.append("date < ?")
+            parametres.append(fin.isoformat()[:10])
+        if conditions:
+            requete += " WHERE " + " AND ".join(conditions)
+        with self._connexion() as conn:
+            # Version et créneaux lus dans la même transaction
+            conn.execute("BEGIN")
+            version = self._lire_version(conn)
+            lignes = conn.execute(requete, parametres).fetchall()
+        grille = Grille.from_cellules(
+            (date.fromisoformat(jour), creneau, terrain, CODEC.decoder(valeur))
+            for jour, creneau, terrain, valeur in lignes
+        )
+        grille.version = grille.position = version
+        if avec_regles:
+            appliquer_regles(grille, self.regles_entrainements(), debut, fin)
+        return grille
+
+    def modifications_depuis(self, position):
+        """(version, position, cellules) écrites depuis le chargement d'une grille, None s'il faut tout recharger
+
+        Les cellules sont lues dans ``historique_creneaux`` avec leur valeur actuelle.
+        """
+        with self._connexion() as conn:
+            conn.execute("BEGIN")
+            version = self._lire_version(conn)
+            purge = conn.execute("SELECT valeur FROM meta WHERE cle = 'historique_purge'").fetchone()
+            if position is None or position < (purge[0] if purge else 0) or position > version:
+                return None
+            lignes = conn.execute(
+                """
+                SELECT h.date, h.creneau, h.terrain, c.valeur
+                FROM (SELECT DISTINCT date, creneau, terrain FROM historique_creneaux WHERE version > ?) AS h
+                LEFT JOIN creneaux AS c ON c.date = h.date AND c.creneau = h.creneau AND c.terrain = h.terrain
+                """,
+                (position,),
+            ).fetchall()
+        cellules = [
+            (date.fromisoformat(jour), creneau, terrain, None if valeur is None else CODEC.decoder(valeur))
+            for jour, creneau, terrain, valeur in lignes
+        ]
+        return version, version, cellules
+
+    def _signature(self, nom):
+        """Signature de la table : lignes ajoutées (nombre, dernier id) et compteur de modifications"""
+        with self._connexion() as conn:
+            return conn.execute(
+                f"SELECT count(*), max(id), (SELECT valeur FROM meta WHERE cle = ?) FROM {nom}",
+                (f"modifications_{nom}",),
+            ).fetchone()
+
+    @staticmethod
+    def _compter_modification(conn, nom):
+        conn.execute(
+            "INSERT INTO meta VALUES (?, 1) ON CONFLICT (cle) DO UPDATE SET valeur = valeur + 1",
+            (f"modifications_{nom}",),
+        )
+
+    @staticmethod
+    def _lire_version(conn):
+        ligne = conn.execute("SELECT valeur FROM meta WHERE cle = 'version'").fetchone()
+        return ligne[0] if ligne else 0
+
+    def lire_version(self):
+        with self._connexion() as conn:
+            return self._lire_version(conn)
+
+    def enregistrer_grille(self, grille, tout_ou_rien=False):
+        """Enregistre les cellules modifiées ; retourne les cellules rejetées (conflits)"""
+        if not grille.modifies:
+            return []
+        modifications = [
+            (jour, creneau, champ, valeur, grille.origines.get((jour, creneau, champ)))
+            for jour, creneau, champ, valeur in grille.cellules_modifiees()
+        ]
+        with self._connexion() as conn:
+            # Verrou d'écriture pris dès le début : lecture de version et écriture atomiques
+            conn.execute("BEGIN IMMEDIATE")
+            version = self._lire_version(conn)
+
+            def lire_actuelles(cellules):
+                actuelles = {}
+                for jour, creneau, champ in cellules:
+                    ligne = conn.execute(
+                        "SELECT valeur FROM creneaux WHERE date = ? AND creneau = ? AND terrain = ?",
+                        (jour.isoformat(), creneau, champ),
+                    ).fetchone()
+                    if ligne:
+                        actuelles[(jour, creneau, champ)] = CODEC.decoder(ligne[0])
+                return actuelles
+
+            acceptees, rejetees = fusionner(modifications, grille.version, version, lire_actuelles, grille.exigences())
+            if rejetees and tout_ou_rien:
+                return rejetees
+            if not acceptees:
+                # Ni écriture ni nouvelle version (les autres sessions n'ont rien à relire)
+                grille.version = version if grille.version == version else None
+                grille.marquer_enregistre()
+                return rejetees
+            for jour, creneau, champ, valeur in acceptees:
+                if valeur is None:
+                    conn.execute(
+                        "DELETE FROM creneaux WHERE date = ? AND creneau = ? AND terrain = ?",
+                        (jour.isoformat(), creneau, champ),
+                    )
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO creneaux VALUES (?, ?, ?, ?)",
+                        (jour.isoformat(), creneau, champ, CODEC.encoder(valeur).decode("utf-8")),
+                    )
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version + 1,))
+            conn.executemany(
+                "INSERT INTO historique_creneaux VALUES (?, ?, ?, ?)",
+                [(version + 1, jour.isoformat(), creneau, champ) for jour, creneau, champ, _ in acceptees],
+            )
+            purge = version + 1 - HISTORIQUE_VERSIONS
+            if purge > 0:
+                conn.execute("DELETE FROM historique_creneaux WHERE version <= ?", (purge,))
+                conn.execute(
+                    "UPDATE meta SET valeur = max(valeur, ?) WHERE cle = 'historique_purge'", (purge,)
+                )
+        grille.version = version + 1 if grille.version == version else None
+        grille.marquer_enregistre()
+        return rejetees
+
+    def lire_table(self, nom):
+        import pandas as pd
+
+        colonnes = ", ".join(COLONNES[nom])
+        with self._connexion() as conn:
+            return pd.read_sql_query(f"SELECT {colonnes} FROM {nom} ORDER BY id", conn)
+
+    def lire_lignes(self, nom):
+        colonnes = ", ".join(COLONNES[nom])
+        with self._connexion() as conn:
+            conn.row_factory = sqlite3.Row
+            return [dict(ligne) for ligne in conn.execute(f"SELECT {colonnes} FROM {nom} ORDER BY id")]
+
+    def ajouter_ligne(self, nom, ligne):
+        self.ajouter_lignes(nom, [ligne])
+
+    def ajouter_lignes(self, nom, lignes):
+        """Ajoute des lignes dans une seule transaction (identifiants attribués par la base)"""
+        self._inserer(nom, lignes, [colonne for colonne in COLONNES[nom] if colonne != "id"])
+
+    def _inserer(self, nom, lignes, colonnes):
+        with self._connexion() as conn:
+            conn.executemany(
+                f"INSERT INTO {nom} ({', '.join(colonnes)}) VALUES ({', '.join('?' * len(colonnes))})",
+                [[_valeur_sql(ligne.get(colonne)) for colonne in colonnes] for ligne in lignes],
+            )
+
+    def remplacer_ligne(self, nom, id, ligne):
+        """Remplace le contenu de la ligne d'identifiant ``id`` (l'identifiant est conservé)"""
+        colonnes = [colonne for colonne in COLONNES[nom] if colonne != "id"]
+        with self._connexion() as conn:
+            curseur = conn.execute(
+                f"UPDATE {nom} SET {', '.join(f'{c} = ?' for c in colonnes)} WHERE id = ?",
+                [_valeur_sql(ligne.get(colonne)) for colonne in colonnes] + [int(id)],
+            )
+            if curseur.rowcount == 0:
+                raise KeyError(f"{nom} : aucune ligne d'identifiant {id}")
+            self._compter_modification(conn, nom)
+
+    def supprimer_ligne(self, nom, id):
+        """Supprime la ligne d'identifiant ``id``"""
+        with self._connexion() as conn:
+            if conn.execute(f"DELETE FROM {nom} WHERE id = ?", (int(id),)).rowcount == 0:
+                raise KeyError(f"{nom} : aucune ligne d'identifiant {id}")
+            self._compter_modification(conn, nom)
+
+
+_stockage = None
+_verrou = threading.Lock()
+
+
+def get_stockage():
+    """Stockage configuré par BNR_STOCKAGE (créé une seule fois par processus)"""
+    global _stockage
+    with _verrou:
+        if _stockage is None:
+            if os.environ.get("BNR_STOCKAGE", "fichiers") == "sqlite":
+                _stockage = StockageSQLite()
+            else:
+                _stockage = StockageFichiers()
+                _stockage.mettre_a_niveau()
+        return _stockage
@@ -0,0 +1,572 @@
+"""Chargement et sauvegarde de la grille des créneaux
+
+Les créneaux sont stockés dans un instantané (``data/responsables.json``) et
+un journal en ajout seul (``data/responsables.journal``, une ligne JSON par
+modification). Chaque sauvegarde ajoute quelques lignes au journal ; quand il
+devient trop gros, il est compacté en arrière-plan dans un nouvel instantané.
+
+Plusieurs sessions pouvant écrire en même temps, chaque sauvegarde se fait
+sous verrou de fichier et incrémente un numéro de version
+(``data/responsables.version``). Si le stockage a changé depuis le chargement
+de la grille, chaque cellule modifiée n'est écrite que si sa valeur actuelle
+est encore celle lue au chargement ; sinon la modification est rejetée.
+Une grille chargée retient sa position de lecture : ``modifications_depuis``
+ne relit ensuite que la fin du journal pour la mettre à jour.
+
+L'instantané est au format compact (voir ``planning.compact``), au format
+historique, ou découpé par mois : un instantané compact par mois dans
+``data/responsables.mois/`` et un index (voir ``save_responsables``). Une
+plage de dates n'ouvre alors que les fichiers de ses mois, et les mois des
+saisons terminées peuvent être archivés en lecture seule (``archiver_mois``).
+Une sauvegarde conserve le format existant. Le JSON est lu et écrit avec le
+codec de ``planning.codec`` (orjson s'il est installé).
+"""
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité au processus
+    fcntl = None
+
+from planning.codec import CODEC
+from planning.compact import (
+    depuis_compact,
+    encoder_compact,
+    est_compact,
+    grille_compacte,
+    lire_instantane,
+    vers_compact,
+)
+from planning.grille import Grille, _as_date, format_cle, parse_cle
+
+RESPONSABLES_FILE = "data/responsables.json"
+
+# Formats de l'instantané
+FORMATS = ("compact", "historique", "mois")
+
+# Taille du journal (en octets) au-delà de laquelle il est compacté
+TAILLE_MAX_JOURNAL = 256 * 1024
+
+_verrou_compaction = threading.Lock()
+_verrou_local = threading.RLock()
+
+
+def fichier_journal(fichier=RESPONSABLES_FILE):
+    """Chemin du journal associé à un instantané"""
+    return os.path.splitext(fichier)[0] + ".journal"
+
+
+def _fichier_compaction(fichier):
+    """Journal en cours de compaction (renommé pour libérer le journal principal)"""
+    return fichier_journal(fichier) + ".compaction"
+
+
+def _fichier_version(fichier):
+    return os.path.splitext(fichier)[0] + ".version"
+
+
+@contextmanager
+def verrouiller(fichier=RESPONSABLES_FILE, partage=False):
+    """Verrou de fichier entre processus/sessions (partagé pour les lectures)"""
+    os.makedirs(os.path.dirname(fichier) or ".", exist_ok=True)
+    with open(os.path.splitext(fichier)[0] + ".lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if partage else fcntl.LOCK_EX)
+        else:
+            _verrou_local.acquire()
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                _verrou_local.release()
+
+
+def lire_version(fichier=RESPONSABLES_FILE):
+    """Numéro de version du stockage (0 s'il n'a jamais été modifié)"""
+    try:
+        with open(_fichier_version(fichier), "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _ecrire_version(fichier, version):
+    temporaire = _fichier_version(fichier) + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        f.write(str(version))
+    os.replace(temporaire, _fichier_version(fichier))
+
+
+def _lire_instantane_strict(fichier, debut=None, fin=None):
+    """Instantané lu, limité aux jours de [debut, fin[ s'il est compact
+
+    Découpé par mois, c'est la liste de l'index et des mois de la plage ;
+    vide s'il n'existe pas. Lève OSError ou l'erreur du codec si
+    l'instantané existe mais ne peut pas être lu.
+    """
+    index = lire_index(fichier)
+    if index is not None:
+        return [index] + _lire_mois(fichier, index, debut, fin)
+    if os.path.exists(fichier):
+        with open(fichier, "rb") as f:
+            return lire_instantane(f, debut, fin)
+    return {}
+
+
+def _lire_instantane(fichier, debut=None, fin=None):
+    """Instantané lu (voir ``_lire_instantane_strict``), vide s'il est illisible"""
+    try:
+        return _lire_instantane_strict(fichier, debut, fin)
+    except (OSError, *CODEC.erreurs):
+        return {}
+
+
+def _en_dict(instantane):
+    """Dictionnaire historique {clé: valeur} d'un instantané lu (compact, historique ou par mois)"""
+    if isinstance(instantane, list):
+        responsables = {}
+        for partie in instantane:
+            responsables.update(depuis_compact(partie))
+        return responsables
+    return depuis_compact(instantane) if est_compact(instantane) else instantane
+
+
+def _appliquer_entrees(responsables, lignes, garder_suppressions=False):
+    """Applique des lignes de journal sur le dictionnaire
+
+    Avec ``garder_suppressions``, une cellule vidée est notée None au lieu d'être retirée.
+    """
+    for ligne in lignes:
+        try:
+            entree = CODEC.decoder(ligne)
+        except CODEC.erreurs:
+            # Dernière ligne tronquée par un arrêt brutal : on l'ignore
+            continue
+        if entree.get("op") == "set":
+            responsables[entree["cle"]] = entree["valeur"]
+        elif entree.get("op") == "unset":
+            if garder_suppressions:
+                responsables[entree["cle"]] = None
+            else:
+                responsables.pop(entree["cle"], None)
+
+
+def _rejouer(responsables, journal, garder_suppressions=False):
+    """Applique les enregistrements d'un journal sur le dictionnaire"""
+    if not os.path.exists(journal):
+        return
+    with open(journal, "rb") as f:
+        _appliquer_entrees(responsables, f, garder_suppressions)
+
+
+def _taille(chemin):
+    try:
+        return os.path.getsize(chemin)
+    except OSError:
+        return -1
+
+
+def _position(fichier):
+    """Position de lecture : identité de l'instantané, tailles du journal en compaction et du journal"""
+    try:
+        # L'index d'un instantané découpé par mois est réécrit à chaque compaction
+        stat = os.stat(_fichier_index(fichier) if os.path.exists(_fichier_index(fichier)) else fichier)
+        instantane = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        instantane = None
+    return instantane, _taille(_fichier_compaction(fichier)), _taille(fichier_journal(fichier))
+
+
+def load_responsables(fichier=RESPONSABLES_FILE, debut=None, fin=None):
+    """Charge le dictionnaire des responsables (instantané + journal)
+
+    Avec ``debut``/``fin``, seuls les jours de [debut, fin[ d'un instantané
+    compact sont décodés ; le dictionnaire peut contenir d'autres jours.
+    """
+    responsables = _en_dict(_lire_instantane(fichier, debut, fin))
+    _rejouer(responsables, _fichier_compaction(fichier))
+    _rejouer(responsables, fichier_journal(fichier))
+    return responsables
+
+
+def _ecrire_atomique(chemin, contenu):
+    """Écrit un fichier de façon atomique (fichier temporaire + renommage)"""
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(contenu)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+
+
+def save_responsables(responsables, fichier=RESPONSABLES_FILE, format="compact"):
+    """Écrit un instantané complet de façon atomique
+
+    ``format`` : "compact" (par défaut), "historique" (JSON plat indenté) ou
+    "mois" (un instantané compact par mois et un index, dans ``dossier_mois``).
+    """
+    if format == "mois":
+        _ecrire_par_mois(responsables, fichier)
+    elif format == "compact":
+        _ecrire_atomique(fichier, encoder_compact(vers_compact(responsables)))
+    else:
+        _ecrire_atomique(fichier, CODEC.encoder_lisible(responsables))
+
+
+def ajouter_au_journal(modifications, fichier=RESPONSABLES_FILE):
+    """Ajoute des couples (clé, valeur ou None) à la fin du journal"""
+    if not modifications:
+        return
+    os.makedirs(os.path.dirname(fichier) or ".", exist_ok=True)
+    lignes = []
+    for cle, valeur in modifications:
+        if valeur is None:
+            entree = {"op": "unset", "cle": cle}
+        else:
+            entree = {"op": "set", "cle": cle, "valeur": valeur}
+        lignes.append(CODEC.encoder(entree) + b"\n")
+    contenu = b"".join(lignes)
+    with open(fichier_journal(fichier), "a+b") as f:
+        # Isoler une éventuelle ligne tronquée par un arrêt brutal
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                contenu = b"\n" + contenu
+        f.write(contenu)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def compacter(fichier=RESPONSABLES_FILE):
+    """Intègre le journal dans un nouvel instantané puis le vide
+
+    Le journal est d'abord renommé : en cas d'arrêt brutal pendant la
+    compaction, le journal renommé est rejoué au prochain chargement.
+    """
+    if not _verrou_compaction.acquire(blocking=False):
+        return False
+    try:
+        with verrouiller(fichier):
+            journal = fichier_journal(fichier)
+            compaction = _fichier_compaction(fichier)
+            if os.path.exists(journal) and not os.path.exists(compaction):
+                os.replace(journal, compaction)
+            index = lire_index(fichier)
+            if index is not None:
+                # Découpé par mois : seuls les mois présents dans le journal sont réécrits
+                _compacter_mois(fichier, index, compaction)
+            else:
+                # Un instantané illisible n'est jamais remplacé par le seul journal :
+                # l'erreur remonte et le journal renommé est gardé
+                instantane = _lire_instantane_strict(fichier)
+                # Un nouvel instantané est compact ; un instantané existant garde son format
+                compact = est_compact(instantane) or not os.path.exists(fichier)
+                responsables = _en_dict(instantane)
+                _rejouer(responsables, compaction)
+                save_responsables(responsables, fichier, "compact" if compact else "historique")
+            if os.path.exists(compaction):
+                os.remove(compaction)
+        return True
+    finally:
+        _verrou_compaction.release()
+
+
+def convertir_instantane(fichier=RESPONSABLES_FILE, format="compact"):
+    """Réécrit l'instantané dans l'un des ``FORMATS`` (le journal est intégré)"""
+    with verrouiller(fichier):
+        responsables = load_responsables(fichier)
+        save_responsables(responsables, fichier, format)
+        # L'ancienne forme de l'instantané (fichier unique ou dossier des mois) est retirée
+        if format == "mois":
+            if os.path.exists(fichier):
+                os.remove(fichier)
+        elif os.path.isdir(dossier_mois(fichier)):
+            shutil.rmtree(dossier_mois(fichier))
+        for journal in (_fichier_compaction(fichier), fichier_journal(fichier)):
+            if os.path.exists(journal):
+                os.remove(journal)
+
+
+# ---------------------------
+# Instantané découpé par mois
+# ---------------------------
+def dossier_mois(fichier=RESPONSABLES_FILE):
+    """Dossier des instantanés mensuels (``data/responsables.mois``)"""
+    return os.path.splitext(fichier)[0] + ".mois"
+
+
+def _fichier_index(fichier):
+    return os.path.join(dossier_mois(fichier), "index.json")
+
+
+def _fichier_mois(fichier, mois):
+    return os.path.join(dossier_mois(fichier), f"{mois}.json")
+
+
+def _mois(jour):
+    """Mois "AAAA-MM" d'une date"""
+    return f"{jour.year:04d}-{jour.month:02d}"
+
+
+def lire_index(fichier=RESPONSABLES_FILE):
+    """Index des mois, ou None si l'instantané n'est pas découpé par mois
+
+    L'index est un instantané compact sans jours (il porte les clés non
+    reconnues) complété par ``mois`` : {"AAAA-MM": {"jours": n, "archive": bool}}.
+    """
+    try:
+        with open(_fichier_index(fichier), "rb") as f:
+            return CODEC.decoder(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def mois_archives(fichier=RESPONSABLES_FILE):
+    """Mois archivés (lecture seule) de l'instantané"""
+    index = lire_index(fichier)
+    if index is None:
+        return set()
+    return {mois for mois, entree in index["mois"].items() if entree.get("archive")}
+
+
+def _lire_mois(fichier, index, debut=None, fin=None):
+    """Instantanés compacts des mois de l'index qui coupent [debut, fin["""
+    premier = _mois(_as_date(debut)) if debut is not None else None
+    dernier = _mois(_as_date(fin) - timedelta(days=1)) if fin is not None else None
+    # Seuls le premier et le dernier mois sont lus en partie
+    return [
+        _lire_un_mois(fichier, mois, debut if mois == premier else None, fin if mois == dernier else None)
+        for mois in sorted(index["mois"])
+        if (premier is None or mois >= premier) and (dernier is None or mois <= dernier)
+    ]
+
+
+def _lire_un_mois(fichier, mois, debut=None, fin=None):
+    with open(_fichier_mois(fichier, mois), "rb") as f:
+        return lire_instantane(f, debut, fin)
+
+
+def _ecrire_mois(fichier, index, mois, responsables):
+    """Réécrit un mois (supprimé s'il est vide) et met son entrée de l'index à jour"""
+    chemin = _fichier_mois(fichier, mois)
+    donnees = vers_compact(responsables)
+    if donnees["jours"]:
+        _ecrire_atomique(chemin, encoder_compact(donnees))
+        index["mois"][mois] = {**index["mois"].get(mois, {}), "jours": len(donnees["jours"])}
+        if index["mois"][mois].get("archive"):
+            os.chmod(chemin, 0o444)
+    else:
+        if os.path.exists(chemin):
+            os.remove(chemin)
+        index["mois"].pop(mois, None)
+
+
+def _ecrire_index(fichier, index):
+    _ecrire_atomique(_fichier_index(fichier), CODEC.encoder(index))
+
+
+def _ecrire_par_mois(responsables, fichier):
+    """Écrit tous les mois et l'index ; les mois archivés le restent"""
+    par_mois, autres = {}, {}
+    for cle, valeur in responsables.items():
+        parsed = parse_cle(cle)
+        if parsed is None:
+            autres[cle] = valeur
+        else:
+            par_mois.setdefault(_mois(parsed[0]), {})[cle] = valeur
+    archives = mois_archives(fichier)
+    anciens = set((lire_index(fichier) or {"mois": {}})["mois"])
+    index = {**vers_compact(autres), "mois": {mois: {"archive": True} for mois in archives}}
+    for mois, contenu in sorted(par_mois.items()):
+        _ecrire_mois(fichier, index, mois, contenu)
+    for mois in anciens | archives:
+        if mois not in par_mois:
+            _ecrire_mois(fichier, index, mois, {})
+    _ecrire_index(fichier, index)
+
+
+def _compacter_mois(fichier, index, journal):
+    """Intègre un journal dans les seuls mois qu'il modifie, puis réécrit l'index"""
+    modifications = {}
+    _rejouer(modifications, journal, garder_suppressions=True)
+    par_mois = {}
+    for cle, valeur in modifications.items():
+        parsed = parse_cle(cle)
+        if parsed is not None:
+            par_mois.setdefault(_mois(parsed[0]), {})[cle] = valeur
+        elif valeur is None:
+            index["autres"].pop(cle, None)
+        else:
+            index["autres"][cle] = valeur
+    for mois, cellules in par_mois.items():
+        responsables = depuis_compact(_lire_un_mois(fichier, mois)) if mois in index["mois"] else {}
+        for cle, valeur in cellules.items():
+            if valeur is None:
+                responsables.pop(cle, None)
+            else:
+                responsables[cle] = valeur
+        _ecrire_mois(fichier, index, mois, responsables)
+    _ecrire_index(fichier, index)
+
+
+def archiver_mois(avant, fichier=RESPONSABLES_FILE):
+    """Passe en lecture seule les mois antérieurs à la date ``avant`` ; retourne les mois archivés
+
+    Les créneaux d'un mois archivé ne sont plus modifiables : ``save_grille``
+    les rejette. L'instantané doit être découpé par mois.
+    """
+    limite = _mois(_as_date(avant))
+    with verrouiller(fichier):
+        index = lire_index(fichier)
+        if index is None:
+            raise ValueError(f"{fichier} n'est pas découpé par mois (python -m planning.migration --format mois)")
+        archives = []
+        for mois, entree in sorted(index["mois"].items()):
+            if mois < limite and not entree.get("archive"):
+                entree["archive"] = True
+                os.chmod(_fichier_mois(fichier, mois), 0o444)
+                archives.append(mois)
+        _ecrire_index(fichier, index)
+    return archives
+
+
+def _compacter_si_necessaire(fichier):
+    try:
+        taille = os.path.getsize(fichier_journal(fichier))
+    except OSError:
+        return
+    if taille > TAILLE_MAX_JOURNAL and not _verrou_compaction.locked():
+        threading.Thread(target=compacter, args=(fichier,), daemon=True).start()
+
+
+def _normaliser(valeur):
+    """Valeur vide ("" ou []) ramenée à None pour comparer les cellules"""
+    return valeur if valeur not in ("", [], None) else None
+
+
+def fusionner(modifications, version_lue, version_actuelle, lire_actuelles, exigences=()):
+    """Sépare les modifications acceptées et rejetées (comparaison puis échange)
+
+    ``modifications`` contient des quintuplets (date, creneau, champ, valeur,
+    origine). Si personne n'a écrit depuis la lecture (même version), tout est
+    accepté. Sinon une cellule n'est acceptée que si sa valeur actuelle est
+    encore l'origine (ou déjà la nouvelle valeur) ; ``lire_actuelles`` retourne
+    les valeurs actuelles des cellules demandées. ``exigences`` contient des
+    quadruplets (date, creneau, champ, valeur attendue) de cellules comparées
+    sans être écrites : rejetées si leur valeur a changé (voir
+    ``Grille.exiger_inchangee``).
+    """
+    if version_lue == version_actuelle:
+        return [m[:4] for m in modifications], []
+    actuelles = lire_actuelles([m[:3] for m in modifications] + [e[:3] for e in exigences])
+    acceptees, rejetees = [], []
+    for jour, creneau, champ, valeur, origine in modifications:
+        actuelle = _normaliser(actuelles.get((jour, creneau, champ)))
+        if actuelle == _normaliser(origine) or actuelle == _normaliser(valeur):
+            acceptees.append((jour, creneau, champ, valeur))
+        else:
+            rejetees.append((jour, creneau, champ))
+    for jour, creneau, champ, attendue in exigences:
+        if _normaliser(actuelles.get((jour, creneau, champ))) != _normaliser(attendue):
+            rejetees.append((jour, creneau, champ))
+    return acceptees, rejetees
+
+
+def load_grille(fichier=RESPONSABLES_FILE, debut=None, fin=None):
+    """Charge la grille des créneaux (instantané + journal), éventuellement limitée à [debut, fin["""
+    with verrouiller(fichier, partage=True):
+        version = lire_version(fichier)
+        position = _position(fichier)
+        instantane = _lire_instantane(fichier, debut, fin)
+        modifications = {}
+        _rejouer(modifications, _fichier_compaction(fichier), garder_suppressions=True)
+        _rejouer(modifications, fichier_journal(fichier), garder_suppressions=True)
+    if isinstance(instantane, list) or est_compact(instantane):
+        # Seuls les jours de la plage sont décodés
+        grille = grille_compacte(instantane, modifications, debut, fin)
+    else:
+        instantane.update(modifications)
+        grille = Grille.from_dict({cle: v for cle, v in instantane.items() if v is not None}, debut, fin)
+    grille.version = version
+    grille.position = position
+    return grille
+
+
+def modifications_depuis(fichier, position):
+    """Cellules écrites depuis une position de lecture (``grille.position`` au chargement)
+
+    Seule la fin du journal est lue. Retourne (version, position, cellules),
+    les cellules étant des quadruplets (date, creneau, champ, valeur ou None),
+    ou None si l'instantané a été réécrit entre-temps (compaction) : il faut
+    alors tout recharger.
+    """
+    with verrouiller(fichier, partage=True):
+        version = lire_version(fichier)
+        actuelle = _position(fichier)
+        if position is None or actuelle[:2] != position[:2] or actuelle[2] < position[2]:
+            return None
+        contenu = b""
+        if actuelle[2] > max(position[2], 0):
+            with open(fichier_journal(fichier), "rb") as f:
+                f.seek(max(position[2], 0))
+                contenu = f.read(actuelle[2] - max(position[2], 0))
+    modifications = {}
+    _appliquer_entrees(modifications, contenu.splitlines(), garder_suppressions=True)
+    cellules = []
+    for cle, valeur in modifications.items():
+        parsed = parse_cle(cle)
+        if parsed is not None:
+            cellules.append((*parsed, valeur))
+    return version, actuelle, cellules
+
+
+def save_grille(grille, fichier=RESPONSABLES_FILE, tout_ou_rien=False):
+    """Enregistre les cellules modifiées de la grille dans le journal
+
+    Rien n'est écrit si la grille n'a pas changé. Les cellules modifiées
+    entre-temps par une autre session (voir ``fusionner``) et celles des mois
+    archivés sont rejetées ; avec ``tout_ou_rien``, un seul rejet annule
+    toute l'écriture.
+    Retourne la liste des cellules (date, creneau, champ) rejetées.
+    """
+    if not grille.modifies:
+        return []
+    modifications = [
+        (jour, creneau, champ, valeur, grille.origines.get((jour, creneau, champ)))
+        for jour, creneau, champ, valeur in grille.cellules_modifiees()
+    ]
+
+    def lire_actuelles(cellules):
+        # Seuls les jours modifiés sont relus
+        jours = [_as_date(cellule[0]) for cellule in cellules]
+        responsables = load_responsables(fichier, min(jours), max(jours) + timedelta(days=1))
+        return {cellule: responsables.get(format_cle(*cellule)) for cellule in cellules}
+
+    with verrouiller(fichier):
+        version = lire_version(fichier)
+        acceptees, rejetees = fusionner(modifications, grille.version, version, lire_actuelles, grille.exigences())
+        archives = mois_archives(fichier)
+        if archives:
+            # Mois archivés : lecture seule
+            rejetees += [cellule[:3] for cellule in acceptees if _mois(cellule[0]) in archives]
+            acceptees = [cellule for cellule in acceptees if _mois(cellule[0]) not in archives]
+        if rejetees and tout_ou_rien:
+            return rejetees
+        # Rien d'accepté : ni écriture ni nouvelle version (les autres sessions n'ont rien à relire)
+        nouvelle = version
+        if acceptees:
+            ajouter_au_journal([(format_cle(j, c, champ), v) for j, c, champ, v in acceptees], fichier)
+            nouvelle = version + 1
+            _ecrire_version(fichier, nouvelle)
+    # La grille n'est à jour que si personne d'autre n'avait écrit entre-temps
+    grille.version = nouvelle if grille.version == version else None
+    grille.marquer_enregistre()
+    _compacter_si_necessaire(fichier)
+    return rejetees